@@ -6,5 +6,5 @@ setup(name='hyperloop',
 	packages = find_packages('src'),
 	package_dir = {'': 'src'},
 	dependency_links = ['https://github.com/JustinSGray/pyCycle.git'],
-	install_requires = ['openmdao', 'scipy', 'matplotlib', 'numpy'],
+	install_requires = ['openmdao', 'scipy', 'matplotlib', 'numpy', 'futures; python_version < "3"'],
 	tests_require = ['pytest'])
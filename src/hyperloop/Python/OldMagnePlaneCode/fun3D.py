@@ -3,7 +3,6 @@
 # --- Python/system level imports
 import numpy as np
 from string import Template
-from scipy.optimize import fsolve
 
 # --- OpenMDAO main and library imports
 from openmdao.main.api import Component
@@ -11,31 +10,7 @@ from openmdao.lib.datatypes.api import Float
 
 # --- Local Python imports
 from StdAtm import Atmosphere
-
-
-def f(M, *data):
-    gamma, a_ratio = data
-    return (((gamma + 1) / 2)**(-(gamma + 1) / (2 * gamma - 2)) * (
-        (1 + (gamma - 1) / 2 * M**2)**(
-            (gamma + 1) / (2 * gamma - 2))) / M - a_ratio)
-
-
-def g(M2, *data):
-
-    pt2_ptL, tt2_ttL, ptL, ttL, gamma_inf, R, A2, mdot = data
-
-    pt2 = (pt2_ptL * ptL)  # Pa
-    tt2 = (tt2_ttL * ttL)  # K
-
-    ps2 = pt2 * ((1 + (gamma_inf - 1) / 2 * M2**2)**(-gamma_inf /
-                                                     (gamma_inf - 1)))  # Pa
-    ts2 = tt2 * ((1 + (gamma_inf - 1) / 2 * M2**2))** -1  # K
-
-    a2 = np.sqrt(gamma_inf * R * ts2)  # m/s
-    v2 = a2 * M2  # m/s
-    d2 = ps2 / (R * ts2)  # kg/m^3
-
-    return mdot - v2 * d2 * A2
+from hyperloop.Python.tools.isentropic import mach_from_area_ratio
 
 
 class Fun3D(Component):
@@ -113,15 +88,16 @@ class Fun3D(Component):
         # --- Assume total pressure adjustment to account for installation effects
         dP = -0.01
 
-        # Solve for adjusted engine face Mach #, pt2 and tt2
-        M2 = fsolve(g,
-                    self.M2,
-                    args=(self.pt2_ptL + dP, self.tt2_ttL, ptL, ttL, gamma_inf,
-                          self.R, self.A2, self.mdot))[0]
-
         pt2 = ((self.pt2_ptL + dP) * ptL)  # Pa
         tt2 = (self.tt2_ttL * ttL)  # K
 
+        # Solve for adjusted engine face Mach # (subsonic) from the mass flow,
+        # mdot = pt2*A2*sqrt(gamma/(R*tt2))*M2*(1+(gamma-1)/2*M2**2)**(-(gamma+1)/(2*gamma-2)),
+        # written as an area ratio A2/A*
+        a_star = self.mdot * np.sqrt(self.R * tt2 / gamma_inf) / pt2 * (
+            (gamma_inf + 1) / 2)**((gamma_inf + 1) / (2 * gamma_inf - 2))  # m^2
+        M2 = mach_from_area_ratio(self.A2 / a_star, gamma_inf)
+
         ps2 = pt2 * ((1 + (gamma_inf - 1) / 2 * M2**2)**
                      (-gamma_inf / (gamma_inf - 1)))  # Pa
         ts2 = tt2 * ((1 + (gamma_inf - 1) / 2 * M2**2))** -1  # K
@@ -177,10 +153,10 @@ class Fun3D(Component):
 
         # Calc area ratios
         ap_at = ap_m / at_m
-        Mp = fsolve(f, 0.5, args=(gamma_p, ap_at))[0]
+        Mp = mach_from_area_ratio(ap_at, gamma_p)
 
         ae_at = ae_m / at_m
-        Me = fsolve(f, 2.0, args=(gamma_e, ae_at))[0]
+        Me = mach_from_area_ratio(ae_at, gamma_e, supersonic=True)
 
         print("")
         print("Ap/A* = %f " % (ap_at))
@@ -24,6 +24,7 @@ from pycycle.constants import AIR_MIX
 
 from tube_structure import TubeStructural
 from inlet import InletGeom
+from hyperloop.Python.tools.isentropic import area_ratio, mach_from_area_ratio
 
 
 class AreaRatio(Component):
@@ -52,21 +53,16 @@ class AreaRatio(Component):
                         0.0,
                         desc='ratio between tube area and bypass area')
 
-        self.add_state('AR_resid', 0.0, desc='AR - target AR')
+        self.add_output('Mach_kant',
+                        0.0,
+                        desc='subsonic Mach at which the tube to bypass area ratio is the Kantrowitz limit')
 
     def solve_nonlinear(self, params, unknowns, resids):
-        self.apply_nonlinear(params, unknowns, resids)
-
-    def apply_nonlinear(self, params, unknowns, resids):
         tube_area = pi * (params['tube_r']**2)
         unknowns['bypass_area'] = tube_area - params['inlet_area']
         AR_target = tube_area / unknowns['bypass_area']
-        g = params['gamma']
-        g_exp = (g + 1.0) / (2.0 * (g - 1.0))
-        unknowns['AR'] = ((g + 1.0) / 2.0)**(-1.0 * g_exp) * (
-            (1.0 +
-             (g - 1.0) / 2.0 * params['Mach']**2)**g_exp) / params['Mach']
-        resids['AR_resid'] = unknowns['AR'] - AR_target
+        unknowns['AR'] = area_ratio(params['Mach'], params['gamma'])
+        unknowns['Mach_kant'] = mach_from_area_ratio(AR_target, params['gamma'])
 
 
 class TubeThermo(Component):
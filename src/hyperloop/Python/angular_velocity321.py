@@ -3,110 +3,142 @@ from __future__ import print_function
 import numpy as np
 from openmdao.api import IndepVarComp, Component, Group, Problem
 
+from hyperloop.Python.tools.partials import apply_diagonal
+
 class AngularVelocity321(Component):
     """
-	Notes
-	------
+    Notes
+    ------
+
+    Evaluates the body frame angular velocity from 321 Euler angles and their derivatives
+    Units are in radians and radians/s
 
-	Evaluates the body frame angular velocity from 321 Euler angles and their derivatives
-	Units are in radians and radians/s
+        omega = [[1, 0, -s(theta)], [0, c(phi), s(phi)*c(theta)], [0, -s(phi), c(phi)*c(theta)]] * [[phi_dot], [theta_dot], [psi_dot]]
+
+    at num_nodes attitudes at once, e.g. every node of a trajectory.  With num_nodes = 1 the
+    params are floats and omega_b has shape (3,); otherwise the params are arrays of length
+    num_nodes and omega_b has shape (num_nodes, 3).
 
     Params
     ------
     Yaw : float
-    	Yaw angle (3-axis rotation) of body frame with respect to the inertial NED frame. Default value is 0.0 rad
+        Yaw angle (3-axis rotation) of body frame with respect to the inertial NED frame. Default value is 0.0 rad
     Pitch : float
-    	Pitch angle (2-axis rotation) of body fram with respect to the inertial NED frame. Default value is 0.0 rad
+        Pitch angle (2-axis rotation) of body fram with respect to the inertial NED frame. Default value is 0.0 rad
     Roll : float
-    	Roll angle (1-axis rotation) of body fram with respect to the inertial NED frame. Default value is 0.0 rad
+        Roll angle (1-axis rotation) of body fram with respect to the inertial NED frame. Default value is 0.0 rad
     Yaw rate : float
-    	Yaw rate of pod body frame. Default value is .01 rad/s
+        Yaw rate of pod body frame. Default value is 0.0 rad/s
     Pitch rate : float
-    	Pitch rate of pod body frame. Default value is .01 rad/s
+        Pitch rate of pod body frame. Default value is 0.0 rad/s
     Roll rate : float
-    	Roll rate of pod body frame. Default value is 0.0 rad/s
-
+        Roll rate of pod body frame. Default value is 0.0 rad/s
 
     Returns
     -------
-    
+
     Angular velocity : float
-    	Returns the body fame angular velocity of the pod in rad/s
+        Returns the body fame angular velocity of the pod in rad/s
+
+    Args
+    ----
+    num_nodes : int
+        Number of attitudes
+    rate_format : str
+        Format of the rate param names from the angle names, e.g. 'dUdt:{}' for the control
+        rates of a pointer RHS. Default is '{}_dot'
     """
 
-    def __init__(self):
-    	super(AngularVelocity321, self).__init__()
+    def __init__(self, num_nodes=1, rate_format='{}_dot'):
+        super(AngularVelocity321, self).__init__()
 
-    	self.add_param('psi', val = 0.0, units = 'rad', desc = 'Pod yaw angle')
-    	self.add_param('theta', val = 0.0, units = 'rad', desc = 'Pod pitch angle')
-    	self.add_param('phi', val = 0.0, units = 'rad', desc = 'Pod roll angle')
-    	self.add_param('psi_dot', val = 0.0, units = 'rad', desc = 'Pod yaw rate')
-    	self.add_param('theta_dot', val = 0.0, units = 'rad', desc = 'Pod pitch rate')
-    	self.add_param('phi_dot', val = 0.0, units = 'rad', desc = 'Pod roll rate')
+        self.deriv_options['type'] = 'user'
 
-    	self.add_output('omega_b', val = np.matrix('0.0; 0.0; 0.0'), units = 'rad/s', desc = 'Angular velocity vector')
+        self.num_nodes = nn = num_nodes
+        self.rate_names = dict((name, rate_format.format(name)) for name in ('psi', 'theta', 'phi'))
 
-    def solve_nonlinear(self, p, u, r):
-    	"""
-		Notes
-		------
-
-		omega = [[s(psi)*s(theta), c(psi), 0], [c(psi)*s(theta), -s(psi), 0], [c(theta), 0,1]] * [[phi], [theta], [psi]]
-
-	    Params
-	    ------
-	    Yaw : float
-	    	Yaw angle (3-axis rotation) of body frame with respect to the inertial NED frame. Default value is 0.0 rad
-	    Pitch : float
-	    	Pitch angle (2-axis rotation) of body fram with respect to the inertial NED frame. Default value is 0.0 rad
-	    Roll : float
-	    	Roll angle (1-axis rotation) of body fram with respect to the inertial NED frame. Default value is 0.0 rad
-	    Yaw rate : float
-	    	Yaw rate of pod body frame. Default value is .01 rad/s
-	    Pitch rate : float
-	    	Pitch rate of pod body frame. Default value is .01 rad/s
-	    Roll rate : float
-	    	Roll rate of pod body frame. Default value is 0.0 rad/s
-
-
-	    Returns
-	    -------
-	    
-	    Angular velocity : float
-	    	Returns the body fame angular velocity of the pod in rad/s
-	    """
-
-    	psi = p['psi']
-    	theta = p['theta']
-    	phi = p['phi']
-    	psi_dot = p['psi_dot']
-    	theta_dot = p['theta_dot']
-    	phi_dot = p['phi_dot']
-
-    	B = np.matrix([[-np.sin(theta), 0.0, 1.0], [np.sin(phi)*np.cos(theta), np.cos(phi), 0.0], [np.cos(phi)*np.cos(theta), -np.sin(phi), 0]])
-
-    	u['omega_b'] = B * np.matrix([[phi_dot], [theta_dot], [psi_dot]])
+        val = 0.0 if nn == 1 else np.zeros(nn)
 
+        self.add_param('psi', val=val, units='rad', desc='Pod yaw angle')
+        self.add_param('theta', val=val, units='rad', desc='Pod pitch angle')
+        self.add_param('phi', val=val, units='rad', desc='Pod roll angle')
+        self.add_param(self.rate_names['psi'], val=val, units='rad/s', desc='Pod yaw rate')
+        self.add_param(self.rate_names['theta'], val=val, units='rad/s', desc='Pod pitch rate')
+        self.add_param(self.rate_names['phi'], val=val, units='rad/s', desc='Pod roll rate')
 
-if __name__ == '__main__':
-	top = Problem()
-	root = top.root = Group()
+        self.add_output('omega_b', val=np.zeros(3) if nn == 1 else np.zeros((nn, 3)), units='rad/s',
+                        desc='Angular velocity vector')
 
-	params = (
-		('psi', 0.0, {'units' : 'rad'}),
-		('theta', 0.0, {'units' : 'rad'}),
-		('phi', 0.0, {'units' : 'rad'}),
-		('psi_dot', 0.1, {'units' : 'rad'}),
-		('theta_dot', 0.1, {'units' : 'rad'}),
-		('phi_dot', 0.0, {'units' : 'rad'})
-		)
+        self._partials = {}
 
-	root.add('input_vars', IndepVarComp(params), promotes = ['psi', 'theta', 'phi', 'psi_dot', 'theta_dot', 'psi_dot'])
-	root.add('p', AngularVelocity321(), promotes = ['psi', 'theta', 'phi', 'psi_dot', 'theta_dot', 'psi_dot', 'omega_b'])
+    def _attitude(self, p):
+        theta = np.atleast_1d(p['theta'])
+        phi = np.atleast_1d(p['phi'])
+        rates = np.column_stack([np.atleast_1d(p[self.rate_names[name]]) * np.ones(self.num_nodes)
+                                 for name in ('phi', 'theta', 'psi')])
+        return theta, phi, rates
 
-	top.setup()
-	top.run()
+    def solve_nonlinear(self, p, u, r):
+        theta, phi, rates = self._attitude(p)
+
+        B = np.zeros((self.num_nodes, 3, 3))
+        B[:, 0, 0] = 1.0
+        B[:, 0, 2] = -np.sin(theta)
+        B[:, 1, 1] = np.cos(phi)
+        B[:, 1, 2] = np.sin(phi) * np.cos(theta)
+        B[:, 2, 1] = -np.sin(phi)
+        B[:, 2, 2] = np.cos(phi) * np.cos(theta)
+
+        omega_b = np.einsum('nij,nj->ni', B, rates)
+        u['omega_b'] = omega_b[0] if self.num_nodes == 1 else omega_b
+
+    def linearize(self, p, u, r):
+        theta, phi, rates = self._attitude(p)
+        phi_dot, theta_dot, psi_dot = rates.T
+        zero = np.zeros(self.num_nodes)
+        one = np.ones(self.num_nodes)
+
+        # columns of d omega_b / d param at each node, kept as (num_nodes, 3) arrays
+        d = {'psi': (zero, zero, zero),
+             'theta': (-psi_dot * np.cos(theta),
+                       -psi_dot * np.sin(phi) * np.sin(theta),
+                       -psi_dot * np.cos(phi) * np.sin(theta)),
+             'phi': (zero,
+                     -theta_dot * np.sin(phi) + psi_dot * np.cos(phi) * np.cos(theta),
+                     -theta_dot * np.cos(phi) - psi_dot * np.sin(phi) * np.cos(theta)),
+             self.rate_names['phi']: (one, zero, zero),
+             self.rate_names['theta']: (zero, np.cos(phi), -np.sin(phi)),
+             self.rate_names['psi']: (-np.sin(theta), np.sin(phi) * np.cos(theta),
+                                      np.cos(phi) * np.cos(theta))}
+
+        self._partials = {}
+        for name, cols in d.items():
+            val = np.column_stack(cols)
+            self._partials['omega_b', name] = val[0] if self.num_nodes == 1 else val
+        return {}
+
+    def apply_linear(self, p, u, dp, du, dr, mode):
+        apply_diagonal(self._partials, dp, dr, mode)
 
-	print('Bod frame angular velocity vector = ')
-	print(top['omega_b'])
 
+if __name__ == '__main__':
+    top = Problem()
+    root = top.root = Group()
+
+    params = (
+        ('psi', 0.0, {'units' : 'rad'}),
+        ('theta', 0.0, {'units' : 'rad'}),
+        ('phi', 0.0, {'units' : 'rad'}),
+        ('psi_dot', 0.1, {'units' : 'rad/s'}),
+        ('theta_dot', 0.1, {'units' : 'rad/s'}),
+        ('phi_dot', 0.0, {'units' : 'rad/s'})
+        )
+
+    root.add('input_vars', IndepVarComp(params), promotes = ['psi', 'theta', 'phi', 'psi_dot', 'theta_dot', 'phi_dot'])
+    root.add('p', AngularVelocity321(), promotes = ['psi', 'theta', 'phi', 'psi_dot', 'theta_dot', 'phi_dot', 'omega_b'])
+
+    top.setup()
+    top.run()
+
+    print('Bod frame angular velocity vector = ')
+    print(top['omega_b'])
@@ -0,0 +1,192 @@
+"""
+Vectorized thrust map of the Single Sided Linear Induction Motor (SLIM) of LIM.py.
+The simplified circuit model of LIM.Thrust is evaluated on whole arrays of rotor speed,
+frequency and voltage at once, so thrust versus slip and frequency over an acceleration run
+is one array evaluation instead of a Problem.run() per point.
+
+The synchronous velocity is set by the stator pole pitch, V_s = 2*pole_pitch*f.  At a given
+frequency the thrust, proportional to S*(1 - S)/(R2**2 + S**2*X_m**2), peaks at the slip
+
+    S* = (-R2**2 + sqrt(R2**4 + X_m**2*R2**2))/X_m**2 = R2/(R2 + sqrt(R2**2 + X_m**2))
+
+where the second form is used since the first cancels catastrophically for X_m << R2.
+frequency_schedule holds the slip at S* as the pod accelerates.
+"""
+from __future__ import print_function
+
+import numpy as np
+
+from hyperloop.Python.tools.integrate import cumulative_trapezoid
+from hyperloop.Python.tools.interpolate import RegularGridInterpolant
+
+# params of LIM.Thrust; pole pitch so that V_s = 16.31 m/s at 60 Hz
+DEFAULT_LIM = {'R1': 7.6e-7,
+               'R2': 0.082,
+               'X_m': 0.9e-6,
+               'L': 0.0017,
+               'm': 3.0,
+               'P1': 180000.0,
+               'V1': 450.0,
+               'pole_pitch': 16.31 / 120.0}
+
+
+def _lim_params(lim):
+    params = dict(DEFAULT_LIM)
+    params.update(lim)
+    return params
+
+
+def slim_thrust(V_r, f, V1=None, **lim):
+    """
+    Thrust and efficiency of the SLIM, with the model of LIM.Thrust, at any number of
+    operating points.
+
+    Params
+    ------
+    V_r : float or array
+        rotor velocity (m/s)
+    f : float or array
+        input frequency (Hz)
+    V1 : float or array
+        input voltage (V). Default is DEFAULT_LIM['V1']
+    lim : float or array
+        Any other key of DEFAULT_LIM
+
+    Returns
+    -------
+    perf : dict
+        Arrays with the broadcast shape of the inputs: V_s (m/s), slip_ratio, phi, thrust (N),
+        power, the mechanical power thrust*V_r (W), and efficiency, the mechanical power over
+        the air gap power thrust*V_s (= 1 - slip_ratio)
+    """
+    p = _lim_params(lim)
+    if V1 is None:
+        V1 = p['V1']
+    V_r = np.asarray(V_r, dtype=float)
+    f = np.asarray(f, dtype=float)
+
+    V_s = 2.0 * p['pole_pitch'] * f
+    S = (V_s - V_r) / V_s
+    phi = np.arctan(2.0 * np.pi * f * p['L'] / p['R1'])
+
+    thrust = p['P1']**2 * p['R2'] * p['X_m']**2 * S * (1.0 - S) / \
+        (p['m'] * np.asarray(V1)**2 * np.cos(phi)**2 * (p['R2']**2 + S**2 * p['X_m']**2))
+
+    return {'V_s': V_s,
+            'slip_ratio': S,
+            'phi': phi,
+            'thrust': thrust,
+            'power': thrust * V_r,
+            'efficiency': 1.0 - S}
+
+
+def optimal_slip(R2=DEFAULT_LIM['R2'], X_m=DEFAULT_LIM['X_m']):
+    """Slip ratio of maximum thrust at fixed frequency, elementwise for array R2, X_m"""
+    R2 = np.asarray(R2, dtype=float)
+    return R2 / (R2 + np.sqrt(R2**2 + np.asarray(X_m, dtype=float)**2))
+
+
+def frequency_schedule(V_r, f_min=0.0, f_max=np.inf, **lim):
+    """
+    Input frequency that holds the slip at optimal_slip at each rotor velocity, limited to
+    [f_min, f_max].
+
+    Returns
+    -------
+    schedule : dict
+        slim_thrust outputs along the schedule, and f (Hz)
+    """
+    p = _lim_params(lim)
+    S = optimal_slip(p['R2'], p['X_m'])
+    V_r = np.asarray(V_r, dtype=float)
+
+    f = np.clip(V_r / (1.0 - S) / (2.0 * p['pole_pitch']), f_min, f_max)
+    schedule = slim_thrust(V_r, f, **p)
+    schedule['f'] = f
+    return schedule
+
+
+def acceleration_run(mass, v_final, v_initial=1.0, num_points=201, f_min=0.0, f_max=np.inf, **lim):
+    """
+    Accelerates the pod from v_initial to v_final on the frequency_schedule, with thrust as
+    the only force.
+
+    Params
+    ------
+    mass : float
+        mass of pod (kg)
+    v_final, v_initial : float
+        rotor velocity at the end and start of the run (m/s).  The circuit model has no
+        thrust at standstill (S = 1), so v_initial must be positive.
+    f_min, f_max : float
+        inverter frequency limits (Hz).  Raises ValueError if v_final is not below the
+        synchronous velocity at f_max, where the thrust vanishes
+
+    Returns
+    -------
+    run : dict
+        frequency_schedule outputs at num_points velocities V_r, with the time (s), distance
+        (m) and air gap energy, the integral of thrust*V_s dt (J), to reach each of them
+    """
+    V_s_max = 2.0 * _lim_params(lim)['pole_pitch'] * f_max
+    if v_final >= V_s_max:
+        raise ValueError('v_final %.1f m/s is not below the synchronous velocity %.1f m/s at f_max, '
+                         'the thrust vanishes before it' % (v_final, V_s_max))
+
+    V_r = np.linspace(v_initial, v_final, num_points)
+    run = frequency_schedule(V_r, f_min, f_max, **lim)
+
+    # dt = m dv/F, dx = v dt, F*V_s dt = m*V_s dv
+    dt_dv = mass / run['thrust']
+    run['V_r'] = V_r
+    run['time'] = cumulative_trapezoid(dt_dv, V_r)
+    run['distance'] = cumulative_trapezoid(V_r * dt_dv, V_r)
+    run['energy'] = cumulative_trapezoid(mass * run['V_s'], V_r)
+    return run
+
+
+class ThrustMap(object):
+    """
+    Thrust and efficiency of the SLIM on a rotor velocity x frequency grid.
+
+    Params
+    ------
+    V_r : array
+        rotor velocity grid (m/s)
+    f : array
+        frequency grid (Hz)
+    thrust, efficiency : array
+        tables with shape (len(V_r), len(f))
+    """
+
+    def __init__(self, V_r, f, thrust, efficiency):
+        self.V_r = np.asarray(V_r, dtype=float)
+        self.f = np.asarray(f, dtype=float)
+        self.thrust = RegularGridInterpolant((self.V_r, self.f), thrust)
+        self.efficiency = RegularGridInterpolant((self.V_r, self.f), efficiency)
+
+
+def build_thrust_map(v_max, f_max, num_speed=101, num_frequency=101, **lim):
+    """
+    Tabulates thrust and efficiency over [0, v_max] x (0, f_max].  Points with the rotor
+    faster than the field (generator operation, slip < 0) have negative thrust.
+
+    Returns
+    -------
+    thrust_map : ThrustMap
+    """
+    V_r = np.linspace(0.0, v_max, num_speed)
+    f = np.linspace(f_max / num_frequency, f_max, num_frequency)
+
+    perf = slim_thrust(V_r[:, np.newaxis], f[np.newaxis, :], **lim)
+    return ThrustMap(V_r, f, perf['thrust'], perf['efficiency'])
+
+
+if __name__ == '__main__':
+
+    run = acceleration_run(15000.0, 300.0, f_max=2000.0)
+
+    print('Optimal slip ratio : %f' % optimal_slip())
+    print('Frequency at 300 m/s : %f Hz' % run['f'][-1])
+    print('Time to 300 m/s : %f s' % run['time'][-1])
+    print('Distance to 300 m/s : %f m' % run['distance'][-1])
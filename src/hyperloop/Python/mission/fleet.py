@@ -0,0 +1,362 @@
+"""
+Discrete-event simulation of a fleet of pods shuttling along a line of stations.
+The line is an ordered list of stations of a timetable.TrackNetwork, with one tube per
+direction.  Every leg between neighbouring stations is run on the precomputed minimum-time
+speed profile of the network, so a pod's position, power and heat over a leg are known from
+its departure time alone.  Each leg is split into signal blocks, and booster sections may be
+placed anywhere on the line; both hold one pod at a time, with a headway between one pod
+leaving and the next entering.
+
+Events (a pod ready to leave a station, a pod arriving at a station) are processed in time
+order from a heap.  A ready pod is held at the station until every block and booster of its
+leg is clear on the profile, which is one array comparison per departure:
+
+    depart >= max_k (last_exit[k] + headway - entry_offset[k])
+
+and reserves them by setting last_exit[k] = depart + exit_offset[k].  Pods dwell at every
+station and turn around at the ends of the line.  The legs are numbered in the order a pod
+runs them, forward from stations[0] to stations[-1] and then backward, so every leg is
+followed by the next one, cyclically.
+
+The loads of all legs are binned in time and by block at the end, one leg at a time over all
+of its runs.  tube_loads sums them over the tube, as time series of the num_pods of
+TubeWallTemp, the heat added to the tube and the prop_power of TubePower, and tube_power and
+tube_temperature evaluate those models at every time bin.
+"""
+from __future__ import print_function
+
+import heapq
+
+import numpy as np
+from openmdao.api import Group, Problem, IndepVarComp
+
+from hyperloop.Python.mission.pod_drag import pod_drag
+from hyperloop.Python.mission.trip_energy import trip_power
+from hyperloop.Python.tube.tube_power import TubePower
+
+# directions of travel, one tube each
+FORWARD, BACKWARD = 0, 1
+
+# power_params that are also params of pod_drag
+DRAG_PARAMS = ('S', 'p_tube', 'T_ambient', 'R', 'D_magnetic')
+
+
+def _leg(network, origin, destination, start, direction, block_length, boosters, dt_sample, power_params):
+    """Profile, loads and section offsets of the run of one leg, relative to its departure"""
+    trip = network.trip(origin, destination)
+    s, v = trip['s'], trip['v']
+    length = s[-1]
+
+    v_mean = 0.5 * (v[1:] + v[:-1])
+    t = np.concatenate([[0.0], np.cumsum(np.diff(s) / v_mean)])
+    v_dot = np.gradient(v, t)
+
+    # loads sampled at the midpoints of steps of dt_sample
+    edges = np.append(np.arange(0.0, t[-1], dt_sample), t[-1])
+    mid = 0.5 * (edges[1:] + edges[:-1])
+    v_mid = np.interp(mid, t, v)
+    power = trip_power(v_mid, np.interp(mid, t, v_dot), vacuum_power=0.0, **power_params)
+
+    drag = pod_drag(v_mid, **dict((key, power_params[key]) for key in DRAG_PARAMS if key in power_params))
+
+    # equal blocks between the stations, then the boosters, as distances along the leg
+    num_blocks = max(int(np.ceil(length / block_length)), 1)
+    block_edges = np.linspace(0.0, length, num_blocks + 1)
+    lo = [block_edges[:-1]]
+    hi = [block_edges[1:]]
+    booster_index = []
+    for i, (a, b) in enumerate(boosters):
+        a, b = (a - start, b - start) if direction == FORWARD else (start - b, start - a)
+        if a < length and b > 0.0:
+            lo.append([max(a, 0.0)])
+            hi.append([min(b, length)])
+            booster_index.append(i)
+    lo = np.concatenate(lo)
+    hi = np.concatenate(hi)
+
+    position = np.interp(mid, t, s)
+    return {'origin': origin,
+            'destination': destination,
+            'direction': direction,
+            'length': length,
+            'duration': t[-1],
+            'num_blocks': num_blocks,
+            'block_edges': start + block_edges if direction == FORWARD else start - block_edges,
+            'sample_time': mid,
+            'sample_weight': np.diff(edges),
+            'sample_block': np.minimum(np.searchsorted(block_edges, position, side='right') - 1,
+                                       num_blocks - 1),
+            'power': power['propulsion'],
+            # drag work and compressor work are both dissipated as heat in the tube air
+            'heat': drag * v_mid + power['compressor'],
+            'booster_index': np.array(booster_index, dtype=int),
+            'entry': np.interp(lo, s, t),
+            'exit': np.interp(hi, s, t)}
+
+
+def simulate_fleet(network, stations, num_pods, duration=86400.0, dispatch_interval=60.0, dwell=60.0,
+                   turnaround=None, headway=10.0, block_length=10000.0, boosters=(), dt_bin=60.0,
+                   dt_sample=1.0, **power_params):
+    """
+    Simulates num_pods pods shuttling between the ends of a line for a given duration.
+
+    Params
+    ------
+    network : timetable.TrackNetwork
+        network the speed profiles of the legs are taken from
+    stations : list
+        stations of the line, in order
+    num_pods : int
+        fleet size.  Pods enter service alternately at stations[0] and stations[-1],
+        dispatch_interval apart at each end
+    duration : float
+        simulated time (s); no pod departs after it
+    dwell, turnaround : float or dict
+        time at intermediate stations and at the ends of the line (s), or a dict by station.
+        turnaround defaults to dwell
+    headway : float
+        least time between a pod leaving a block or booster and the next entering it (s)
+    block_length : float
+        longest signal block (m).  Each leg is split into equal blocks
+    boosters : list of (float, float)
+        start and end of each booster section, as distance along the line from stations[0] (m)
+    dt_bin : float
+        time resolution of the loads (s)
+    dt_sample : float
+        time step the loads of a leg are sampled at (s)
+    power_params
+        pod and tube params of trip_energy.trip_power
+
+    Returns
+    -------
+    fleet : dict
+        time (start of each bin, s), block_edges (m along the line), and pods, power and heat,
+        the mean number of pods (-), propulsion power (W) and heat added to the tube (W) in each
+        time bin and block, shape (2, num_bins, num_blocks) with the first axis the direction.
+        runs lists every leg run as arrays of pod, leg, direction, origin, destination, ready,
+        depart and arrive times.  booster_utilization is the fraction of time each booster is occupied, shape
+        (2, num_boosters), and launches[direction][booster] the sorted times pods enter it (s)
+    """
+    turnaround = dwell if turnaround is None else turnaround
+
+    def _time(value, station):
+        return value[station] if isinstance(value, dict) else value
+
+    # line position of each station
+    distance = [0.0]
+    for a, b in zip(stations[:-1], stations[1:]):
+        distance.append(distance[-1] + network.trip(a, b)['s'][-1])
+    line_length = distance[-1]
+
+    # forward legs from stations[0], then backward legs from stations[-1], in running order
+    num_legs = len(stations) - 1
+    segments = list(range(num_legs)) + list(range(num_legs - 1, -1, -1))
+    legs = [_leg(network, stations[k], stations[k + 1], distance[k], FORWARD, block_length, boosters,
+                 dt_sample, power_params) for k in segments[:num_legs]]
+    legs += [_leg(network, stations[k + 1], stations[k], distance[k + 1], BACKWARD, block_length, boosters,
+                  dt_sample, power_params) for k in segments[num_legs:]]
+
+    # global block index of the first block of each forward leg; backward legs run the same
+    # blocks in reverse, in the other tube
+    first_block = np.concatenate([[0], np.cumsum([leg['num_blocks'] for leg in legs[:num_legs]])])
+    num_blocks = first_block[-1]
+    for k, leg in zip(segments, legs):
+        if leg['direction'] == FORWARD:
+            leg['sections'] = first_block[k] + np.arange(leg['num_blocks'])
+        else:
+            leg['sections'] = first_block[k + 1] - 1 - np.arange(leg['num_blocks'])
+        leg['sample_block'] = leg['sections'][leg['sample_block']]
+        leg['sections'] = np.concatenate([leg['sections'], num_blocks + leg['booster_index']])
+
+    # sections are the blocks then the boosters, per tube
+    last_exit = -np.inf * np.ones((2, num_blocks + len(boosters)))
+
+    # events are (time, sequence, kind, pod, leg index); the sequence keeps the heap order stable
+    READY, ARRIVE = 0, 1
+    events = []
+    for pod in range(num_pods):
+        direction = pod % 2
+        leg = 0 if direction == FORWARD else num_legs
+        events.append((pod // 2 * dispatch_interval, pod, READY, pod, leg))
+    heapq.heapify(events)
+    sequence = num_pods
+
+    runs = []
+    while events:
+        t, _, kind, pod, i = heapq.heappop(events)
+        leg = legs[i]
+
+        if kind == READY:
+            sections = leg['sections']
+            occupied = last_exit[leg['direction'], sections]
+            depart = max(t, np.max(occupied + headway - leg['entry']))
+            if depart > duration:
+                continue
+            last_exit[leg['direction'], sections] = depart + leg['exit']
+            runs.append((pod, i, leg['direction'], t, depart, depart + leg['duration']))
+            heapq.heappush(events, (depart + leg['duration'], sequence, ARRIVE, pod, i))
+        else:
+            # the next leg starts where this one ends, back the other way at the ends of the line
+            next_leg = (i + 1) % (2 * num_legs)
+            end = leg['destination'] in (stations[0], stations[-1])
+            wait = _time(turnaround if end else dwell, leg['destination'])
+            heapq.heappush(events, (t + wait, sequence, READY, pod, next_leg))
+        sequence += 1
+
+    runs = np.array(runs, dtype=float).reshape(-1, 6)
+    run_leg = runs[:, 1].astype(int)
+    num_bins = int(np.ceil(duration / dt_bin))
+    shape = (2, num_bins, num_blocks)
+    pods, power, heat = np.zeros(np.prod(shape)), np.zeros(np.prod(shape)), np.zeros(np.prod(shape))
+    booster_time = np.zeros((2, len(boosters)))
+    launches = [[[] for _ in boosters] for _ in range(2)]
+
+    for i, leg in enumerate(legs):
+        depart = runs[run_leg == i, 4]
+        if depart.size == 0:
+            continue
+
+        n_booster = leg['booster_index'].size
+        if n_booster:
+            occupied = leg['exit'][-n_booster:] - leg['entry'][-n_booster:]
+            booster_time[leg['direction'], leg['booster_index']] += depart.size * occupied
+            for k, entry in zip(leg['booster_index'], leg['entry'][-n_booster:]):
+                launches[leg['direction']][k].append(depart + entry)
+
+        # in chunks of runs, to bound the memory of the (runs, samples) index arrays
+        chunk = max(int(2e6 // leg['sample_time'].size), 1)
+        for start in range(0, depart.size, chunk):
+            bins = np.floor((depart[start:start + chunk, np.newaxis] + leg['sample_time']) / dt_bin).astype(int)
+            keep = bins < num_bins
+            index = ((leg['direction'] * num_bins + bins) * num_blocks + leg['sample_block'])[keep]
+            for total, load in ((pods, 1.0), (power, leg['power']), (heat, leg['heat'])):
+                weight = np.broadcast_to(load * leg['sample_weight'], bins.shape)[keep]
+                total += np.bincount(index, weight, minlength=total.size)
+
+    edges = np.concatenate([leg['block_edges'][:-1] for leg in legs[:num_legs]] + [[line_length]])
+    return {'time': dt_bin * np.arange(num_bins),
+            'block_edges': edges,
+            'pods': pods.reshape(shape) / dt_bin,
+            'power': power.reshape(shape) / dt_bin,
+            'heat': heat.reshape(shape) / dt_bin,
+            'runs': {'pod': runs[:, 0].astype(int),
+                     'leg': run_leg,
+                     'direction': runs[:, 2].astype(int),
+                     'origin': np.array([legs[i]['origin'] for i in run_leg]),
+                     'destination': np.array([legs[i]['destination'] for i in run_leg]),
+                     'ready': runs[:, 3],
+                     'depart': runs[:, 4],
+                     'arrive': runs[:, 5]},
+            'booster_utilization': booster_time / duration,
+            'launches': [[np.sort(np.concatenate(times)) if times else np.zeros(0) for times in tube]
+                         for tube in launches]}
+
+
+def tube_loads(fleet):
+    """
+    Loads of the whole line over time, summed over blocks and both tubes: num_pods for
+    TubeWallTemp, total_heat_rate_pods (W) added to the tube and prop_power (W) for TubePower
+    """
+    return {'time': fleet['time'],
+            'num_pods': fleet['pods'].sum(axis=(0, 2)),
+            'total_heat_rate_pods': fleet['heat'].sum(axis=(0, 2)),
+            'prop_power': fleet['power'].sum(axis=(0, 2))}
+
+
+def _bin_problem(component, names):
+    """Problem of a Component alone with the given params connected to an IndepVarComp"""
+    prob = Problem(Group())
+    prob.root.add('comp', component)
+    prob.root.add('des_vars', IndepVarComp([(name, 0.0) for name in names]))
+    for name in names:
+        prob.root.connect('des_vars.%s' % name, 'comp.%s' % name)
+    prob.setup(check=False)
+    return prob
+
+
+def tube_power(loads, vac_power=0.0):
+    """
+    tot_power of TubePower (W) in each time bin of tube_loads, from its prop_power and a
+    constant vac_power (W), e.g. the average pumping power of Vacuum
+    """
+    prob = _bin_problem(TubePower(), ['vac_power', 'prop_power'])
+    prob['des_vars.vac_power'] = vac_power
+
+    power = np.zeros(loads['time'].size)
+    for k, prop_power in enumerate(loads['prop_power']):
+        prob['des_vars.prop_power'] = prop_power
+        prob.run()
+        power[k] = prob['comp.tot_power']
+    return power
+
+
+def tube_temperature(loads, thermo='ideal', nozzle_air=(.304434211, 1710.0, 1.08),
+                     bearing_air=(.304434211, 1710.0, 0.0), **tube_params):
+    """
+    Steady state tube wall temperature of TubeTemp (K) for the num_pods of each time bin of
+    tube_loads.  The wall is taken to settle within a bin, and the solution of each bin starts
+    from that of the previous one.
+
+    Params
+    ------
+    thermo : str
+        thermo of the TubeTemp flow stations, 'ideal' or 'janaf'
+    nozzle_air, bearing_air : tuple
+        total pressure (psi), total temperature (degR) and mass flow (lbm/s) of the air
+        leaving the nozzle and air bearings of each pod
+    tube_params
+        other params of TubeWallTemp, e.g. length_tube and temp_outside_ambient
+    """
+    # pycycle is only needed here, for the janaf flow stations
+    from hyperloop.Python.tube.tube_wall_temp import TubeTemp
+
+    prob = Problem(Group())
+    prob.root.add('tt', TubeTemp(thermo))
+    for name, station in (('nozzle_air', nozzle_air), ('bearing_air', bearing_air)):
+        prob.root.add(name, IndepVarComp([('P', station[0], {'units': 'psi'}),
+                                          ('T', station[1], {'units': 'degR'}),
+                                          ('W', station[2], {'units': 'lbm/s'})]))
+        for var in ('P', 'T', 'W'):
+            prob.root.connect('%s.%s' % (name, var), 'tt.%s.%s' % (name, var))
+    prob.root.add('des_vars', IndepVarComp('num_pods', 0.0))
+    prob.root.connect('des_vars.num_pods', 'tt.tm.num_pods')
+    prob.setup(check=False)
+
+    for name, val in tube_params.items():
+        # radius_outer_tube is promoted to TubeTemp
+        prob['tt.%s' % name if name == 'radius_outer_tube' else 'tt.tm.%s' % name] = val
+
+    temp = np.zeros(loads['time'].size)
+    for k, num_pods in enumerate(loads['num_pods']):
+        prob['des_vars.num_pods'] = num_pods
+        prob.run()
+        temp[k] = prob['tt.tm.temp_boundary']
+    return temp
+
+
+if __name__ == '__main__':
+    import time
+
+    from hyperloop.Python.mission.timetable import TrackNetwork
+
+    network = TrackNetwork()
+    line = ['SF', 'SJ', 'Fresno', 'Bakersfield', 'LA']
+    for name in line:
+        network.add_station(name)
+    network.add_link('SF', 'SJ', 70000.0, kappa_h=np.array([0.0, 1.0 / 8000.0, 0.0, 0.0]))
+    network.add_link('SJ', 'Fresno', 210000.0, kappa_h=np.array([0.0, 1.0 / 5000.0, 0.0]))
+    network.add_link('Fresno', 'Bakersfield', 175000.0)
+    network.add_link('Bakersfield', 'LA', 180000.0, kappa_v=np.array([0.0, 1.0 / 30000.0, 0.0]))
+
+    start = time.time()
+    fleet = simulate_fleet(network, line, num_pods=200, dispatch_interval=30.0,
+                           boosters=[(300000.0, 305000.0), (400000.0, 405000.0)])
+    loads = tube_loads(fleet)
+    print('%d leg runs in %.2f s' % (fleet['runs']['pod'].size, time.time() - start))
+    print('Pods in tube: mean %.1f, peak %.1f' % (loads['num_pods'].mean(), loads['num_pods'].max()))
+    print('Propulsion power: mean %.1f MW, peak %.1f MW' % (loads['prop_power'].mean() / 1e6,
+                                                           loads['prop_power'].max() / 1e6))
+    print('Heat into tube: mean %.1f MW' % (loads['total_heat_rate_pods'].mean() / 1e6))
+    power = tube_power(loads, vac_power=2e6)
+    print('Tube power: mean %.1f MW, peak %.1f MW' % (power.mean() / 1e6, power.max() / 1e6))
+    print('Booster utilization: %s' % fleet['booster_utilization'])
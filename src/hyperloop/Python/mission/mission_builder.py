@@ -0,0 +1,280 @@
+"""
+Multi-phase trip builder.
+A trip is given as a list of segments (boost, cruise, coast, grade, brake), each of which
+becomes a CollocationPhase of one Trajectory with its own MagnePlaneRHS thrust model.  The
+phases are linked for continuity of the states, and seeded with the states of an explicit
+simulation of the same force model, interpolated onto the nodes of each phase by seed_phases
+once the Problem is set up, so the optimizer starts from a feasible trip.
+
+Segments are dicts with the keys
+
+    kind : 'boost', 'cruise', 'coast', 'grade' or 'brake'
+    distance : horizontal length of the segment (m).  Boost and brake segments may instead end at
+        v_final
+    v_final : speed at the end of a boost or brake segment (m/s)
+    theta : grade, elevation angle up from horizontal (rad). Default 0
+    thrust : thrust over the segment (N).  Default from SEGMENT_THRUST; cruise and grade
+        segments default to the thrust holding their entry speed
+    num_seg, seg_ncn : collocation grid of the phase. Default 5 and 3
+
+All phases share one terrain interpolant, see terrain.terrain_interpolant.
+"""
+from __future__ import print_function
+
+import numpy as np
+
+from hyperloop.Python.mission.pod_drag import pod_drag
+
+# default thrust of each kind of segment (N); None holds the entry speed
+SEGMENT_THRUST = {'boost': 30000.0,
+                  'cruise': None,
+                  'coast': 0.0,
+                  'grade': None,
+                  'brake': -30000.0}
+
+STATES = ('x', 'y', 'z', 'v')
+
+# ride comfort path constraints of every phase, lower and upper bound (m/s**2 and m/s**3)
+COMFORT_LIMITS = {'a_lat': (-.1 * 9.80665, .1 * 9.80665),
+                  'a_vert': (.5 * 9.80665, 1.5 * 9.80665),
+                  'jerk_lat': (-1.0, 1.0),
+                  'jerk_vert': (-1.0, 1.0)}
+
+
+def segment_thrust(segment, v, mass=3100.0, g=9.80665, **drag_params):
+    """Thrust of a segment entered at speed v"""
+    thrust = segment.get('thrust', SEGMENT_THRUST[segment['kind']])
+    if thrust is None:
+        thrust = pod_drag(v, **drag_params) + mass * g * np.sin(segment.get('theta', 0.0))
+    return thrust
+
+
+def simulate_segments(segments, v_initial=0.0, mass=3100.0, g=9.80665, dt=.1, max_time=3600.0,
+                      **drag_params):
+    """
+    Explicit simulation of the trip with the force model of the phases, by fourth order
+    Runge-Kutta in time, with each segment ended at its distance or v_final.  Raises
+    ValueError if the pod comes to rest before the end of a segment, e.g. a brake segment
+    longer than the braking distance or a cruise segment entered at rest, or if a segment does
+    not end within max_time.
+
+    Returns
+    -------
+    history : list of dict
+        One dict per segment with thrust, theta and arrays of t, x, z and v
+    """
+    t, x, z, v = 0.0, 0.0, 0.0, float(v_initial)
+    history = []
+
+    for i, segment in enumerate(segments):
+        theta = segment.get('theta', 0.0)
+        thrust = segment_thrust(segment, v, mass, g, **drag_params)
+        x_end = x + segment['distance'] if 'distance' in segment else np.inf
+        v_final = segment.get('v_final')
+        accelerating = v_final is not None and v_final > v
+
+        def rate(state):
+            vel = state[2]
+            return np.array([vel * np.cos(theta),
+                             -vel * np.sin(theta),
+                             -g * np.sin(theta) + (thrust - pod_drag(vel, **drag_params)) / mass])
+
+        def done(state):
+            if state[0] >= x_end:
+                return True
+            if v_final is not None:
+                return state[2] >= v_final if accelerating else state[2] <= v_final
+            return False
+
+        state = np.array([x, z, v])
+        ts, states = [t], [state]
+        while not done(state):
+            if state[2] <= 0.0 and rate(state)[2] <= 0.0:
+                raise ValueError('%s segment %d comes to rest after %.1f m, before its end'
+                                 % (segment['kind'], i, state[0] - x))
+            if ts[-1] >= max_time:
+                raise ValueError('%s segment %d does not end within max_time' % (segment['kind'], i))
+
+            k1 = rate(state)
+            k2 = rate(state + .5 * dt * k1)
+            k3 = rate(state + .5 * dt * k2)
+            k4 = rate(state + dt * k3)
+            new = state + dt / 6.0 * (k1 + 2.0 * k2 + 2.0 * k3 + k4)
+
+            # end the segment on the step that crosses its end condition
+            if done(new):
+                if new[0] > x_end:
+                    frac = (x_end - state[0]) / (new[0] - state[0])
+                else:
+                    frac = (v_final - state[2]) / (new[2] - state[2])
+                new = state + frac * (new - state)
+                ts.append(ts[-1] + frac * dt)
+            elif new[2] < 0.0:
+                # stop where the pod comes to rest instead of running backwards
+                frac = state[2] / (state[2] - new[2])
+                new = state + frac * (new - state)
+                new[2] = 0.0
+                ts.append(ts[-1] + frac * dt)
+            else:
+                ts.append(ts[-1] + dt)
+            state = new
+            states.append(state)
+
+        states = np.array(states)
+        history.append({'kind': segment['kind'],
+                        'thrust': thrust,
+                        'theta': theta,
+                        't': np.array(ts),
+                        'x': states[:, 0],
+                        'z': states[:, 1],
+                        'v': states[:, 2]})
+        t, (x, z, v) = ts[-1], state
+
+    return history
+
+
+def build_mission(segments, v_initial=0.0, mass=3100.0, g=9.80665, Cd=0.2, S=1.4, p_tube=850.0,
+                  T_ambient=298.0, R=287.0, D_magnetic=150.0, optimizer='SLSQP', comfort_limits=None):
+    """
+    Builds the pointer Problem of the trip, with one linked CollocationPhase per segment and
+    the total trip time as objective.  The angles theta, psi and phi are dynamic controls, so
+    the RHS gets their rates for the track curvature, and the passenger loads of every phase
+    are path constrained to comfort_limits, COMFORT_LIMITS by default.
+
+    Returns
+    -------
+    prob : pointer Problem
+        Ready for setup(), seed_phases and run()
+    history : list of dict
+        Explicit simulation of each phase, with tau, the normalized times of its nodes
+    """
+    # pointer is only needed to build the optimization problem, not to simulate segments
+    from openmdao.api import ScipyOptimizer
+    from pointer.components import Problem, Trajectory, CollocationPhase
+    from hyperloop.Python.mission.rhs import rhs_variant
+
+    drag_params = dict(S=S, p_tube=p_tube, T_ambient=T_ambient, R=R, D_magnetic=D_magnetic)
+    history = simulate_segments(segments, v_initial, mass, g, **drag_params)
+
+    prob = Problem()
+    traj = prob.add_traj(Trajectory('traj0'))
+
+    driver = ScipyOptimizer()
+    driver.options['optimizer'] = optimizer
+    driver.options['tol'] = 1.0E-6
+    driver.options['maxiter'] = 500
+    prob.driver = driver
+
+    if comfort_limits is None:
+        comfort_limits = COMFORT_LIMITS
+
+    dynamic_controls = [{'name': 'theta', 'units': 'rad'},
+                        {'name': 'psi', 'units': 'rad'},
+                        {'name': 'phi', 'units': 'rad'}]
+    static_controls = [{'name': 'mass', 'units': 'kg'},
+                       {'name': 'g', 'units': 'm/s/s'},
+                       {'name': 'Cd', 'units': 'unitless'},
+                       {'name': 'S', 'units': 'm**2'},
+                       {'name': 'p_tube', 'units': 'Pa'},
+                       {'name': 'T_ambient', 'units': 'K'},
+                       {'name': 'R', 'units': 'J/(kg*K)'},
+                       {'name': 'D_magnetic', 'units': 'N'}]
+
+    names = []
+    for i, (segment, sim) in enumerate(zip(segments, history)):
+        name = 'phase%d_%s' % (i, segment['kind'])
+        names.append(name)
+
+        phase = CollocationPhase(name=name, rhs_class=rhs_variant(name, sim['thrust']),
+                                 num_seg=segment.get('num_seg', 5), seg_ncn=segment.get('seg_ncn', 3),
+                                 rel_lengths='lgl', dynamic_controls=dynamic_controls,
+                                 static_controls=static_controls)
+        traj.add_phase(phase)
+
+        first = i == 0
+        ends = dict((state, (sim[state][0], sim[state][-1])) for state in ('x', 'z', 'v'))
+        ends['y'] = (0.0, 0.0)
+        fix_x = 'distance' in segment
+        fix_v = 'v_final' in segment
+
+        phase.set_state_options('x', lower=0, upper=np.inf, ic_val=ends['x'][0], ic_fix=first,
+                                fc_val=ends['x'][1], fc_fix=fix_x, defect_scaler=0.1)
+        phase.set_state_options('y', lower=0, upper=0, ic_val=0, ic_fix=False,
+                                fc_val=0, fc_fix=False, defect_scaler=0.1)
+        phase.set_state_options('z', lower=-np.inf, upper=np.inf, ic_val=ends['z'][0], ic_fix=first,
+                                fc_val=ends['z'][1], fc_fix=False, defect_scaler=0.1)
+        phase.set_state_options('v', lower=0, upper=np.inf, ic_val=ends['v'][0], ic_fix=first,
+                                fc_val=ends['v'][1], fc_fix=fix_v, defect_scaler=0.1)
+
+        sim['tau'] = phase.node_space(0.0, 1.0)
+
+        phase.set_dynamic_control_options(name='theta', val=phase.node_space(sim['theta'], sim['theta']), opt=False)
+        phase.set_dynamic_control_options(name='psi', val=phase.node_space(0.0, 0.0), opt=False)
+        phase.set_dynamic_control_options(name='phi', val=phase.node_space(0.0, 0.0), opt=False)
+        phase.set_static_control_options(name='g', val=g, opt=False)
+        phase.set_static_control_options(name='mass', val=mass, opt=False)
+        phase.set_static_control_options(name='Cd', val=Cd, opt=False)
+        phase.set_static_control_options(name='S', val=S, opt=False)
+        phase.set_static_control_options(name='p_tube', val=p_tube, opt=False)
+        phase.set_static_control_options(name='T_ambient', val=T_ambient, opt=False)
+        phase.set_static_control_options(name='R', val=R, opt=False)
+        phase.set_static_control_options(name='D_magnetic', val=D_magnetic, opt=False)
+
+        duration = sim['t'][-1] - sim['t'][0]
+        phase.set_time_options(t0_val=sim['t'][0], t0_lower=sim['t'][0] if first else 0.0,
+                               t0_upper=sim['t'][0] if first else np.inf,
+                               tp_val=duration, tp_lower=0.1 * duration, tp_upper=10.0 * duration)
+
+        for output, (lower, upper) in sorted(comfort_limits.items()):
+            traj.add_constraint(name=output, phase=name, place='path', lower=lower, upper=upper)
+
+    # continuity of time and states between consecutive phases
+    traj.link_phases(phases=names, vars=['time'] + list(STATES))
+    traj.add_objective(name='t', phase=names[-1], place='end', scaler=1.0)
+
+    return prob, history
+
+
+def seed_phases(prob, history, traj_name='traj0'):
+    """
+    Sets the states of every phase of a set up build_mission Problem to the simulated
+    histories, interpolated in time onto the nodes of the phase.  The state values are set on
+    the source of the rhs_c param of the same name, which must hold one value per node.
+    """
+    for i, sim in enumerate(history):
+        name = 'phase%d_%s' % (i, sim['kind'])
+        t = sim['t'][0] + sim['tau'] * (sim['t'][-1] - sim['t'][0])
+
+        for state in ('x', 'z', 'v'):
+            target = '%s.%s.rhs_c.%s' % (traj_name, name, state)
+            if target not in prob.root.connections:
+                raise ValueError('%s is not connected, cannot find the %s state of %s' % (target, state, name))
+            source = prob.root.connections[target][0]
+
+            values = np.interp(t, sim['t'], sim[state])
+            if np.size(prob[source]) != values.size:
+                raise ValueError('%s has %d values, but %s has %d nodes' %
+                                 (source, np.size(prob[source]), name, values.size))
+            prob[source] = values
+
+
+def solve_mission(segments, **kwargs):
+    """Builds, sets up, seeds and solves the trip. Returns the solved Problem"""
+    prob, history = build_mission(segments, **kwargs)
+    prob.setup()
+    seed_phases(prob, history)
+    prob.run()
+    return prob
+
+
+if __name__ == '__main__':
+
+    trip = [{'kind': 'boost', 'v_final': 335.0},
+            {'kind': 'cruise', 'distance': 20000.0},
+            {'kind': 'grade', 'distance': 5000.0, 'theta': .01},
+            {'kind': 'coast', 'distance': 2000.0},
+            {'kind': 'brake', 'v_final': 0.0}]
+
+    for sim in simulate_segments(trip):
+        print('%-6s : %7.1f s, %8.1f m, %5.1f m/s at end' % (sim['kind'], sim['t'][-1] - sim['t'][0],
+                                                          sim['x'][-1] - sim['x'][0], sim['v'][-1]))
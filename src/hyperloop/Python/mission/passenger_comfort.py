@@ -0,0 +1,307 @@
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import IndepVarComp, Component, Group, Problem
+
+from hyperloop.Python.tools.partials import apply_diagonal
+
+
+class PassengerComfort(Component):
+    """
+    Notes
+    -----
+
+    Passenger g-loading and jerk at every node of a trajectory, for use as path constraints
+    on ride comfort.  The pod follows a track of horizontal curvature kappa_h (curvature of the
+    plan view, positive turning right) and vertical curvature kappa_v (positive pitching up)
+    at speed v, elevation theta and roll phi.  The specific force felt in the cabin, in the
+    plane normal to the track, has a horizontal centripetal and an upward component
+
+        A = v**2*cos(theta)**2*kappa_h,    U = g*cos(theta) + v**2*kappa_v
+
+    which, rolled by phi into the body frame, give
+
+        a_lat = A*cos(phi) - U*sin(phi),    a_vert = A*sin(phi) + U*cos(phi)
+
+    so a_lat vanishes for the coordinated bank tan(phi) = A/U.  Jerk is the time derivative of
+    both along the track, with theta_dot = v*kappa_v and kappa_dot = v*dkappa/ds.  The heading
+    psi only enters through kappa_h.
+
+    The partials are elementwise over the nodes, see tools.partials.
+
+    Params
+    ------
+    v : float
+        Pod speed. Default value is 335 m/s
+    theta : float
+        Elevation angle, up from horizontal. Default value is 0.0 rad
+    phi : float
+        Roll angle, positive right side down. Default value is 0.0 rad
+    kappa_h : float
+        Horizontal curvature of the track. Default value is 0.0 1/m
+    kappa_v : float
+        Vertical curvature of the track. Default value is 0.0 1/m
+    dkappa_h_ds : float
+        Rate of change of horizontal curvature along the track. Default value is 0.0 1/m**2
+    dkappa_v_ds : float
+        Rate of change of vertical curvature along the track. Default value is 0.0 1/m**2
+    v_dot : float
+        Pod acceleration. Default value is 0.0 m/s**2
+    phi_dot : float
+        Roll rate. Default value is 0.0 rad/s
+    g : float
+        Gravitational acceleration. Default value is 9.81 m/s**2
+
+    Returns
+    -------
+    a_lat : float
+        Lateral acceleration felt by passengers
+    a_vert : float
+        Vertical acceleration felt by passengers, g when level
+    jerk_lat : float
+        Rate of change of a_lat
+    jerk_vert : float
+        Rate of change of a_vert
+
+    Args
+    ----
+    num_nodes : int
+        Number of nodes.  With num_nodes = 1 all params and outputs are floats
+    rate_names : dict
+        Names of the v_dot and phi_dot params, e.g. {'v_dot': 'dXdt:v', 'phi_dot': 'dUdt:phi'}
+        in a pointer RHS
+    """
+
+    def __init__(self, num_nodes=1, rate_names=None):
+        super(PassengerComfort, self).__init__()
+
+        self.deriv_options['type'] = 'user'
+
+        self.num_nodes = nn = num_nodes
+        self.rate_names = {'v_dot': 'v_dot', 'phi_dot': 'phi_dot'}
+        self.rate_names.update(rate_names or {})
+
+        def _val(val):
+            return val if nn == 1 else val * np.ones(nn)
+
+        self.add_param('v', val=_val(335.0), units='m/s', desc='Pod speed')
+        self.add_param('theta', val=_val(0.0), units='rad', desc='Elevation angle')
+        self.add_param('phi', val=_val(0.0), units='rad', desc='Roll angle')
+        self.add_param('kappa_h', val=_val(0.0), units='1/m', desc='Horizontal track curvature')
+        self.add_param('kappa_v', val=_val(0.0), units='1/m', desc='Vertical track curvature')
+        self.add_param('dkappa_h_ds', val=_val(0.0), units='1/m**2', desc='Horizontal curvature rate along track')
+        self.add_param('dkappa_v_ds', val=_val(0.0), units='1/m**2', desc='Vertical curvature rate along track')
+        self.add_param(self.rate_names['v_dot'], val=_val(0.0), units='m/s**2', desc='Pod acceleration')
+        self.add_param(self.rate_names['phi_dot'], val=_val(0.0), units='rad/s', desc='Roll rate')
+        self.add_param('g', val=_val(9.81), units='m/s**2', desc='Gravitational acceleration')
+
+        self.add_output('a_lat', val=_val(0.0), units='m/s**2', desc='Lateral acceleration')
+        self.add_output('a_vert', val=_val(9.81), units='m/s**2', desc='Vertical acceleration')
+        self.add_output('jerk_lat', val=_val(0.0), units='m/s**3', desc='Lateral jerk')
+        self.add_output('jerk_vert', val=_val(0.0), units='m/s**3', desc='Vertical jerk')
+
+        self._partials = {}
+
+    def _loads(self, params):
+        v = params['v']
+        g = params['g']
+        kh = params['kappa_h']
+        kv = params['kappa_v']
+        v_dot = params[self.rate_names['v_dot']]
+
+        c = np.cos(params['theta'])
+        s = np.sin(params['theta'])
+
+        # specific force in the plane normal to the track and its rate of change
+        A = v**2 * c**2 * kh
+        U = g * c + v**2 * kv
+        A_dot = 2.0 * v * v_dot * c**2 * kh - 2.0 * v**3 * c * s * kv * kh + v**3 * c**2 * params['dkappa_h_ds']
+        U_dot = -g * s * v * kv + 2.0 * v * v_dot * kv + v**3 * params['dkappa_v_ds']
+        return A, U, A_dot, U_dot
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        A, U, A_dot, U_dot = self._loads(params)
+        cp = np.cos(params['phi'])
+        sp = np.sin(params['phi'])
+        phi_dot = params[self.rate_names['phi_dot']]
+
+        unknowns['a_lat'] = a_lat = A * cp - U * sp
+        unknowns['a_vert'] = a_vert = A * sp + U * cp
+        unknowns['jerk_lat'] = A_dot * cp - U_dot * sp - a_vert * phi_dot
+        unknowns['jerk_vert'] = A_dot * sp + U_dot * cp + a_lat * phi_dot
+
+    def linearize(self, params, unknowns, resids):
+        v = params['v']
+        g = params['g']
+        kh = params['kappa_h']
+        kv = params['kappa_v']
+        dkh = params['dkappa_h_ds']
+        v_dot_name = self.rate_names['v_dot']
+        phi_dot_name = self.rate_names['phi_dot']
+        v_dot = params[v_dot_name]
+        phi_dot = params[phi_dot_name]
+
+        c = np.cos(params['theta'])
+        s = np.sin(params['theta'])
+        cp = np.cos(params['phi'])
+        sp = np.sin(params['phi'])
+
+        A, U, A_dot, U_dot = self._loads(params)
+        a_lat = unknowns['a_lat']
+        a_vert = unknowns['a_vert']
+
+        # partials of A, U, A_dot and U_dot, zero where left out
+        dA = {'v': 2.0 * v * c**2 * kh,
+              'theta': -2.0 * v**2 * c * s * kh,
+              'kappa_h': v**2 * c**2}
+        dU = {'v': 2.0 * v * kv,
+              'theta': -g * s,
+              'kappa_v': v**2,
+              'g': c}
+        dA_dot = {'v': 2.0 * v_dot * c**2 * kh - 6.0 * v**2 * c * s * kv * kh + 3.0 * v**2 * c**2 * dkh,
+                  'theta': -4.0 * v * v_dot * c * s * kh - 2.0 * v**3 * (c**2 - s**2) * kv * kh -
+                           2.0 * v**3 * c * s * dkh,
+                  'kappa_h': 2.0 * v * v_dot * c**2 - 2.0 * v**3 * c * s * kv,
+                  'kappa_v': -2.0 * v**3 * c * s * kh,
+                  'dkappa_h_ds': v**3 * c**2,
+                  v_dot_name: 2.0 * v * c**2 * kh}
+        dU_dot = {'v': -g * s * kv + 2.0 * v_dot * kv + 3.0 * v**2 * params['dkappa_v_ds'],
+                  'theta': -g * c * v * kv,
+                  'kappa_v': -g * s * v + 2.0 * v * v_dot,
+                  'dkappa_v_ds': v**3,
+                  v_dot_name: 2.0 * v * kv,
+                  'g': -s * v * kv}
+
+        self._partials = partials = {}
+        for name in ('v', 'theta', 'phi', 'kappa_h', 'kappa_v', 'dkappa_h_ds', 'dkappa_v_ds',
+                     v_dot_name, phi_dot_name, 'g'):
+            d_lat = dA.get(name, 0.0) * cp - dU.get(name, 0.0) * sp
+            d_vert = dA.get(name, 0.0) * sp + dU.get(name, 0.0) * cp
+            dj_lat = dA_dot.get(name, 0.0) * cp - dU_dot.get(name, 0.0) * sp
+            dj_vert = dA_dot.get(name, 0.0) * sp + dU_dot.get(name, 0.0) * cp
+
+            if name == 'phi':
+                d_lat = -a_vert
+                d_vert = a_lat
+                dj_lat = -A_dot * sp - U_dot * cp
+                dj_vert = A_dot * cp - U_dot * sp
+            elif name == phi_dot_name:
+                dj_lat = -a_vert
+                dj_vert = a_lat
+
+            partials['a_lat', name] = d_lat
+            partials['a_vert', name] = d_vert
+            partials['jerk_lat', name] = dj_lat - d_vert * phi_dot
+            partials['jerk_vert', name] = dj_vert + d_lat * phi_dot
+
+        return {}
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        apply_diagonal(self._partials, dparams, dresids, mode)
+
+
+class TrackCurvature(Component):
+    """
+    Notes
+    -----
+
+    Curvature of the track followed by the pod, from the rates of its heading and elevation
+    angles, for PassengerComfort in a pointer RHS where psi and theta are dynamic controls
+
+        kappa_h = psi_dot/(v*cos(theta)),    kappa_v = theta_dot/v
+
+    The curvature is undefined at rest, so v is limited to v_min.  The rates of change of
+    curvature along the track need the second derivatives of the controls and are not
+    computed.
+
+    Params
+    ------
+    v : float
+        Pod speed. Default value is 335 m/s
+    theta : float
+        Elevation angle, up from horizontal. Default value is 0.0 rad
+    psi_dot : float
+        Heading rate. Default value is 0.0 rad/s
+    theta_dot : float
+        Elevation rate. Default value is 0.0 rad/s
+
+    Returns
+    -------
+    kappa_h : float
+        Horizontal curvature of the track
+    kappa_v : float
+        Vertical curvature of the track
+
+    Args
+    ----
+    num_nodes : int
+        Number of nodes.  With num_nodes = 1 all params and outputs are floats
+    rate_names : dict
+        Names of the psi_dot and theta_dot params, e.g. {'psi_dot': 'dUdt:psi',
+        'theta_dot': 'dUdt:theta'} in a pointer RHS
+    v_min : float
+        Lowest speed the curvature is evaluated at (m/s). Default is 1.0e-3
+    """
+
+    def __init__(self, num_nodes=1, rate_names=None, v_min=1.0e-3):
+        super(TrackCurvature, self).__init__()
+
+        self.deriv_options['type'] = 'user'
+
+        self.num_nodes = nn = num_nodes
+        self.rate_names = {'psi_dot': 'psi_dot', 'theta_dot': 'theta_dot'}
+        self.rate_names.update(rate_names or {})
+        self.v_min = v_min
+
+        def _val(val):
+            return val if nn == 1 else val * np.ones(nn)
+
+        self.add_param('v', val=_val(335.0), units='m/s', desc='Pod speed')
+        self.add_param('theta', val=_val(0.0), units='rad', desc='Elevation angle')
+        self.add_param(self.rate_names['psi_dot'], val=_val(0.0), units='rad/s', desc='Heading rate')
+        self.add_param(self.rate_names['theta_dot'], val=_val(0.0), units='rad/s', desc='Elevation rate')
+
+        self.add_output('kappa_h', val=_val(0.0), units='1/m', desc='Horizontal track curvature')
+        self.add_output('kappa_v', val=_val(0.0), units='1/m', desc='Vertical track curvature')
+
+        self._partials = {}
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        v = np.maximum(params['v'], self.v_min)
+
+        unknowns['kappa_h'] = params[self.rate_names['psi_dot']] / (v * np.cos(params['theta']))
+        unknowns['kappa_v'] = params[self.rate_names['theta_dot']] / v
+
+    def linearize(self, params, unknowns, resids):
+        v = np.maximum(params['v'], self.v_min)
+        moving = params['v'] > self.v_min
+        c = np.cos(params['theta'])
+
+        self._partials = {('kappa_h', 'v'): -unknowns['kappa_h'] / v * moving,
+                          ('kappa_h', 'theta'): unknowns['kappa_h'] * np.tan(params['theta']),
+                          ('kappa_h', self.rate_names['psi_dot']): 1.0 / (v * c),
+                          ('kappa_v', 'v'): -unknowns['kappa_v'] / v * moving,
+                          ('kappa_v', self.rate_names['theta_dot']): 1.0 / v}
+        return {}
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        apply_diagonal(self._partials, dparams, dresids, mode)
+
+
+if __name__ == '__main__':
+    top = Problem()
+    root = top.root = Group()
+
+    # 5 km radius turn at 335 m/s, banked at the coordinated angle
+    params = (('v', 335.0, {'units': 'm/s'}),
+              ('kappa_h', 1.0 / 5000.0, {'units': '1/m'}),
+              ('phi', float(np.arctan(335.0**2 / 5000.0 / 9.81)), {'units': 'rad'}))
+
+    root.add('input_vars', IndepVarComp(params), promotes=['v', 'kappa_h', 'phi'])
+    root.add('p', PassengerComfort(), promotes=['v', 'kappa_h', 'phi', 'a_lat', 'a_vert'])
+
+    top.setup()
+    top.run()
+
+    print('Lateral acceleration = %f m/s**2' % top['a_lat'])
+    print('Vertical acceleration = %f g' % (top['a_vert'] / 9.81))
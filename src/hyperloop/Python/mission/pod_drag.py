@@ -0,0 +1,12 @@
+"""
+Drag force on the pod, shared by PodThrustAndDrag and the explicit trip, booster and fleet models.
+The aero drag is that of PodThrustAndDrag, .5*rho*v**2*S with rho from the tube pressure and
+temperature, plus the magnetic levitation drag.
+"""
+from __future__ import print_function
+
+
+def pod_drag(v, S=1.4, p_tube=850.0, T_ambient=298.0, R=287.0, D_magnetic=150.0):
+    """Drag force (N) at speed v (m/s); every argument may be an array"""
+    rho = p_tube / (R * T_ambient)
+    return .5 * rho * v**2 * S + D_magnetic
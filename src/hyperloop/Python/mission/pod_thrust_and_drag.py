@@ -9,6 +9,8 @@ from openmdao.api import IndepVarComp, Group, Problem
 
 from pointer.components import EOMComp
 
+from hyperloop.Python.mission.pod_drag import pod_drag
+
 
 class PodThrustAndDrag(EOMComp):
     """
@@ -37,11 +39,21 @@ class PodThrustAndDrag(EOMComp):
     -------
     Drag : float
         Total drag force acting on pod. Default value is 0.0.
+    Thrust : float
+        Thrust force acting on pod, constant over the phase. Default value is 30000 N.
+
+    Args
+    ----
+    thrust : float
+        Thrust of the phase, e.g. LIM thrust in a boost phase, zero when coasting and negative
+        when braking
     """
 
-    def __init__(self, grid_data):
+    def __init__(self, grid_data, thrust=30000.0):
         super(PodThrustAndDrag, self).__init__(grid_data, time_units='s')
 
+        self.thrust = thrust
+
         self.deriv_options['type'] = 'fd'
         nn = grid_data['num_nodes']
 
@@ -91,9 +103,9 @@ class PodThrustAndDrag(EOMComp):
 
     def solve_nonlinear(self, params, unknowns, resids):
         #  dCalculate air density and drag force
-        rho = params['p_tube']/(params['R']*params['T_ambient'])
-        unknowns['F_drag'][:] = (.5*rho*(params['v']**2)*params['S']) + params['D_magnetic']
-        unknowns['F_thrust'][:] = 30000.0
+        unknowns['F_drag'][:] = pod_drag(params['v'], params['S'], params['p_tube'],
+                                         params['T_ambient'], params['R'], params['D_magnetic'])
+        unknowns['F_thrust'][:] = self.thrust
         # TODO: thrust value as determined by cycle analysis
 
 if __name__ == '__main__':
@@ -1,3 +1,6 @@
+import numpy as np
+
+from openmdao.api import ExecComp
 from pointer.components import RHS
 
 from .eom import MagneplaneEOM
@@ -5,9 +8,15 @@ from .eom import MagneplaneEOM
 from hyperloop.Python.mission.pod_thrust_and_drag import PodThrustAndDrag
 from hyperloop.Python.mission.lat_long import LatLong
 from hyperloop.Python.mission.terrain import TerrainElevationComp
+from hyperloop.Python.pod.pod_mach import PodMach
+from hyperloop.Python.angular_velocity321 import AngularVelocity321
+from hyperloop.Python.mission.passenger_comfort import PassengerComfort, TrackCurvature
 
 class MagnePlaneRHS(RHS):
 
+    # thrust of PodThrustAndDrag; phases with other force models use subclasses from rhs_variant
+    thrust = 30000.0
+
     def __init__(self, grid_data, dynamic_controls=None, static_controls=None):
         super(MagnePlaneRHS, self).__init__(grid_data, dynamic_controls,
                                             static_controls)
@@ -17,7 +26,7 @@ class MagnePlaneRHS(RHS):
                  promotes=['*'])
 
         self.add(name='pod_thrust_drag',
-                 system=PodThrustAndDrag(grid_data),
+                 system=PodThrustAndDrag(grid_data, thrust=self.thrust),
                  promotes=['*'])
 
         self.add(name='latlon',
@@ -28,4 +37,41 @@ class MagnePlaneRHS(RHS):
                  system=TerrainElevationComp(grid_data),
                  promotes=['*'])
 
+        nn = grid_data['num_nodes']
+
+        self.add(name='pod_mach_number',
+                 system=ExecComp('M_pod = v/(gam*R*T_ambient)**0.5',
+                                 M_pod=np.zeros(nn),
+                                 v=np.zeros(nn),
+                                 gam=1.4*np.ones(nn),
+                                 R=287.0*np.ones(nn),
+                                 T_ambient=298.0*np.ones(nn),
+                                 units={'v': 'm/s', 'R': 'J/(kg*K)', 'T_ambient': 'K'}),
+                 promotes=['*'])
+
+        self.add(name='pod_mach',
+                 system=PodMach(num_nodes=nn),
+                 promotes=['*'])
+
+        self.add(name='omega',
+                 system=AngularVelocity321(num_nodes=nn, rate_format='dUdt:{}'),
+                 promotes=['*'])
+
+        # track curvature from the rates of the psi and theta controls
+        self.add(name='curvature',
+                 system=TrackCurvature(num_nodes=nn,
+                                       rate_names={'psi_dot': 'dUdt:psi', 'theta_dot': 'dUdt:theta'}),
+                 promotes=['*'])
+
+        # a_lat, a_vert, jerk_lat and jerk_vert for comfort path constraints
+        self.add(name='comfort',
+                 system=PassengerComfort(num_nodes=nn,
+                                         rate_names={'v_dot': 'dXdt:v', 'phi_dot': 'dUdt:phi'}),
+                 promotes=['*'])
+
         self.complete_init()
+
+
+def rhs_variant(name, thrust):
+    """MagnePlaneRHS subclass with the given phase thrust, to pass as a CollocationPhase rhs_class"""
+    return type('MagnePlaneRHS_%s' % name, (MagnePlaneRHS,), {'thrust': thrust})
@@ -8,6 +8,24 @@ from openmdao.api import Group, Problem, Group, IndepVarComp, Component
 from pointer.components import Trajectory, RHS, EOMComp, CollocationPhase
 from scipy import interpolate
 
+# terrain interpolants by data file, shared by every TerrainElevationComp (one per phase)
+_interpolants = {}
+
+
+def terrain_interpolant(data_file_path=None):
+    """Elevation spline of the USGS data file, built on first use and cached per process"""
+    if data_file_path is None:
+        mydir = os.path.dirname(os.path.realpath(__file__))
+        data_file_path = os.path.join(mydir, 'usgs_data.npz')
+
+    if data_file_path not in _interpolants:
+        usgs_file = np.load(data_file_path)
+        _interpolants[data_file_path] = interpolate.RectBivariateSpline(usgs_file['Longitude'],
+                                                                       usgs_file['Latitude'],
+                                                                       usgs_file['Elevation'])
+    return _interpolants[data_file_path]
+
+
 class TerrainElevationComp(EOMComp):
     '''
     The terrain component uses the given latitude and longitude (x and y) to
@@ -25,15 +43,10 @@ class TerrainElevationComp(EOMComp):
         self.add_param('long', shape=(nn,), desc='longitude', units='deg', eom_state=False)
         self.add_param('z', shape=(nn,), desc='vertical component of position, positive down', units='m', eom_state=False)
 
-        mydir = os.path.dirname(os.path.realpath(__file__))
-        data_file_path = os.path.join(mydir,'usgs_data.npz')
-
-        usgs_file = np.load(data_file_path)
-
         self.add_output('elev', shape=(nn,), desc='terrain elevation at the given point', units='m/s/s')
         self.add_output('alt', shape=(nn,), desc='ground-relative altitude of the track', units='m')
 
-        self.interpolant = interpolate.RectBivariateSpline(usgs_file['Longitude'], usgs_file['Latitude'], usgs_file['Elevation'])
+        self.interpolant = terrain_interpolant()
 
         # import matplotlib.pyplot as plt
         #
@@ -74,10 +87,7 @@ class TerrainElevationComp(EOMComp):
 
     def solve_nonlinear(self, params, unknowns, resids):
         #convert x/y to lat/lon (see Component lat_long.py), then feed into interpolant
-        elev = unknowns['elev']
-
-        for i in range(self.num_nodes):
-            elev[i] = self.interpolant(params['long'][i],params['lat'][i])
+        unknowns['elev'][:] = self.interpolant.ev(params['long'], params['lat'])
         unknowns['alt'] = params['z'] - unknowns['elev']
 
 
@@ -0,0 +1,255 @@
+"""
+Minimum trip times between all stations of a track network.
+The track is a graph of links between stations and junctions.  Each link has a speed limit
+profile from the line speed and from passenger comfort on its curves (the g-loading of
+PassengerComfort, with the pod banked up to a maximum roll angle), sampled every ds along the
+link and cached.  The speed profile of a trip is the fastest one under those limits with
+comfort limited acceleration and braking, starting and ending at rest.  It is found by forward
+and backward passes that are closed form for constant acceleration, since v**2 grows linearly
+with distance:
+
+    v_fwd(s_i)**2 = min_{j <= i} (v_lim(s_j)**2 + 2*a_accel*(s_i - s_j))
+
+so a whole route is one array evaluation.  Routes are chosen by Dijkstra's algorithm on the
+link traversal times at the speed limit, and trip profiles are cached by route, so shared track
+is only evaluated once.  Selected pairs can then be refined by full collocation with
+mission_builder.
+"""
+from __future__ import print_function
+
+import heapq
+
+import numpy as np
+
+
+def curve_speed_limit(kappa_h=0.0, kappa_v=0.0, a_lat_max=0.1 * 9.81, a_vert_max=0.2 * 9.81,
+                      phi_max=np.radians(15.0), g=9.81):
+    """
+    Highest speed on a curve within the passenger comfort limits.
+
+    The pod is banked up to phi_max, so with A = v**2*kappa_h and U ~ g the lateral load
+    A*cos(phi) - g*sin(phi) stays below a_lat_max for A <= (a_lat_max + g*sin(phi_max))/cos(phi_max),
+    and the vertical load change v**2*|kappa_v| stays below a_vert_max.
+    """
+    kappa_h = np.abs(np.asarray(kappa_h, dtype=float))
+    kappa_v = np.abs(np.asarray(kappa_v, dtype=float))
+    a_h = (a_lat_max + g * np.sin(phi_max)) / np.cos(phi_max)
+
+    with np.errstate(divide='ignore'):
+        v_h = np.where(kappa_h > 0.0, np.sqrt(a_h / kappa_h), np.inf)
+        v_v = np.where(kappa_v > 0.0, np.sqrt(a_vert_max / kappa_v), np.inf)
+    return np.minimum(v_h, v_v)
+
+
+def speed_profile(v_lim, ds, a_accel=0.5 * 9.81, a_brake=0.5 * 9.81):
+    """
+    Fastest speed profile from rest to rest under the speed limits v_lim, sampled every ds.
+
+    Returns
+    -------
+    v : array
+        speed at each sample (m/s)
+    time : float
+        trip time (s)
+    """
+    v_lim = np.asarray(v_lim, dtype=float).copy()
+    v_lim[0] = v_lim[-1] = 0.0
+    s = ds * np.arange(v_lim.size)
+
+    fwd = np.minimum.accumulate(v_lim**2 - 2.0 * a_accel * s) + 2.0 * a_accel * s
+    s_back = s[-1] - s
+    bwd = (np.minimum.accumulate((v_lim**2 - 2.0 * a_brake * s_back)[::-1]) + 2.0 * a_brake * s_back[::-1])[::-1]
+    v = np.sqrt(np.maximum(np.minimum(fwd, bwd), 0.0))
+
+    v_mean = 0.5 * (v[1:] + v[:-1])
+    return v, np.sum(ds / v_mean)
+
+
+class TrackNetwork(object):
+    """
+    Stations and junctions connected by track links, with cached link speed limits and trip
+    profiles.
+
+    Args
+    ----
+    ds : float
+        sampling distance of the speed profiles (m)
+    v_line : float
+        line speed (m/s)
+    a_accel, a_brake : float
+        comfort limits on acceleration and braking (m/s**2)
+    comfort : dict
+        keyword arguments of curve_speed_limit
+    """
+
+    def __init__(self, ds=50.0, v_line=335.0, a_accel=0.5 * 9.81, a_brake=0.5 * 9.81, comfort=None):
+        self.ds = ds
+        self.v_line = v_line
+        self.a_accel = a_accel
+        self.a_brake = a_brake
+        self.comfort = comfort or {}
+
+        self.stations = []
+        self.links = {}
+        self._adjacent = {}
+        self._limits = {}
+        self._profiles = {}
+
+    def add_station(self, name):
+        """Adds a stop; pods start and end trips at stations only"""
+        self.add_junction(name)
+        self.stations.append(name)
+
+    def add_junction(self, name):
+        """Adds a node pods pass through without stopping"""
+        self._adjacent.setdefault(name, [])
+
+    def add_link(self, a, b, length, kappa_h=0.0, kappa_v=0.0, v_line=None):
+        """
+        Adds track between nodes a and b, usable both ways.  kappa_h and kappa_v are the
+        curvatures of the track, floats or arrays sampled evenly along it.
+        """
+        for node in (a, b):
+            self.add_junction(node)
+
+        n = max(int(np.ceil(length / self.ds)), 1) + 1
+        self.links[a, b] = {'length': length,
+                            'kappa_h': kappa_h,
+                            'kappa_v': kappa_v,
+                            'v_line': self.v_line if v_line is None else v_line,
+                            'num_points': n}
+        self._adjacent[a].append(b)
+        self._adjacent[b].append(a)
+
+    def _link(self, a, b):
+        return self.links[a, b] if (a, b) in self.links else self.links[b, a]
+
+    def link_limit(self, a, b):
+        """Speed limit sampled along the link from a to b, cached"""
+        key = (a, b) if (a, b) in self.links else (b, a)
+        if key not in self._limits:
+            link = self.links[key]
+            n = link['num_points']
+            x = np.linspace(0.0, 1.0, n)
+            kappa = [np.interp(x, np.linspace(0.0, 1.0, np.size(k)), np.atleast_1d(k)) if np.size(k) > 1
+                     else k * np.ones(n) for k in (link['kappa_h'], link['kappa_v'])]
+            self._limits[key] = np.minimum(link['v_line'], curve_speed_limit(kappa[0], kappa[1], **self.comfort))
+
+        limit = self._limits[key]
+        return limit if key == (a, b) else limit[::-1]
+
+    def route(self, origin, destination):
+        """Dijkstra's shortest route by link time at the speed limit. Returns the list of nodes"""
+        best = {origin: 0.0}
+        prev = {}
+        heap = [(0.0, origin)]
+        while heap:
+            t, node = heapq.heappop(heap)
+            if node == destination:
+                break
+            if t > best[node]:
+                continue
+            for other in self._adjacent[node]:
+                limit = self.link_limit(node, other)
+                ds = self._link(node, other)['length'] / (limit.size - 1)
+                t_other = t + np.sum(ds / np.minimum(limit[1:], limit[:-1]))
+                if t_other < best.get(other, np.inf):
+                    best[other] = t_other
+                    prev[other] = node
+                    heapq.heappush(heap, (t_other, other))
+
+        if destination not in best:
+            raise ValueError('No route from %s to %s' % (origin, destination))
+
+        nodes = [destination]
+        while nodes[-1] != origin:
+            nodes.append(prev[nodes[-1]])
+        return nodes[::-1]
+
+    def trip(self, origin, destination):
+        """
+        Fastest speed profile between two stations, cached by route.
+
+        Returns
+        -------
+        trip : dict
+            route (list of nodes), s (m) and v (m/s) along it, and time (s)
+        """
+        nodes = tuple(self.route(origin, destination))
+        if nodes not in self._profiles:
+            limits = [self.link_limit(a, b) for a, b in zip(nodes[:-1], nodes[1:])]
+            lengths = [self._link(a, b)['length'] for a, b in zip(nodes[:-1], nodes[1:])]
+
+            # resample the joined links at one spacing, keeping the lower limit at junctions
+            s_link = np.concatenate([[0.0], np.cumsum(lengths)])
+            n = max(int(np.ceil(s_link[-1] / self.ds)), 1) + 1
+            s = np.linspace(0.0, s_link[-1], n)
+            v_lim = np.full(n, np.inf)
+            for i, limit in enumerate(limits):
+                s_i = np.linspace(s_link[i], s_link[i + 1], limit.size)
+                inside = (s >= s_link[i]) & (s <= s_link[i + 1])
+                v_lim[inside] = np.minimum(v_lim[inside], np.interp(s[inside], s_i, limit))
+
+            v, time = speed_profile(v_lim, s[1] - s[0], self.a_accel, self.a_brake)
+            self._profiles[nodes] = {'route': list(nodes), 's': s, 'v': v, 'time': time}
+        return self._profiles[nodes]
+
+    def timetable(self, stations=None):
+        """
+        Minimum trip times between all pairs of stations.
+
+        Returns
+        -------
+        times : array
+            times[i, j] is the trip time from stations[i] to stations[j] (s)
+        """
+        stations = self.stations if stations is None else stations
+        times = np.zeros((len(stations), len(stations)))
+        for i, origin in enumerate(stations):
+            for j, destination in enumerate(stations):
+                if i != j:
+                    times[i, j] = self.trip(origin, destination)['time']
+        return times
+
+    def mission_segments(self, origin, destination, tol=1.0):
+        """
+        Segment list of mission_builder for the trip: a boost to the first speed plateau,
+        cruise and brake, for refinement by full collocation
+        """
+        trip = self.trip(origin, destination)
+        s, v = trip['s'], trip['v']
+        v_top = np.max(v)
+        cruise = np.nonzero(v >= v_top - tol)[0]
+
+        return [{'kind': 'boost', 'v_final': v[cruise[0]]},
+                {'kind': 'cruise', 'distance': s[cruise[-1]] - s[cruise[0]]},
+                {'kind': 'brake', 'v_final': 0.0}]
+
+    def refine(self, pairs, **kwargs):
+        """Solves the selected (origin, destination) pairs with mission_builder.solve_mission"""
+        from hyperloop.Python.mission.mission_builder import solve_mission
+
+        return dict((pair, solve_mission(self.mission_segments(*pair), **kwargs)) for pair in pairs)
+
+
+if __name__ == '__main__':
+    import time
+
+    network = TrackNetwork()
+    for name in ('SF', 'SJ', 'Fresno', 'Bakersfield', 'LA', 'SD', 'Sacramento'):
+        network.add_station(name)
+    network.add_junction('Gilroy')
+
+    network.add_link('SF', 'SJ', 70000.0, kappa_h=np.array([0.0, 1.0 / 8000.0, 0.0, 0.0]))
+    network.add_link('SJ', 'Gilroy', 50000.0)
+    network.add_link('Sacramento', 'SF', 130000.0, kappa_h=1.0 / 20000.0)
+    network.add_link('Gilroy', 'Fresno', 160000.0, kappa_h=np.array([0.0, 1.0 / 5000.0, 0.0]))
+    network.add_link('Sacramento', 'Fresno', 270000.0)
+    network.add_link('Fresno', 'Bakersfield', 175000.0)
+    network.add_link('Bakersfield', 'LA', 180000.0, kappa_v=np.array([0.0, 1.0 / 30000.0, 0.0]))
+    network.add_link('LA', 'SD', 190000.0, kappa_h=1.0 / 15000.0)
+
+    start = time.time()
+    times = network.timetable()
+    print('%d pairs in %.2f s' % (len(network.stations) * (len(network.stations) - 1), time.time() - start))
+    print('SF to LA: %.1f min via %s' % (times[0, 4] / 60.0, ' - '.join(network.trip('SF', 'LA')['route'])))
@@ -0,0 +1,182 @@
+"""
+Energy per trip from solved trajectories.
+The power consumers that are otherwise evaluated at one operating point (tractive power as in
+PropulsionMechanics, the compressor power pwr_comp of PodMach and the tube pumping power of
+Vacuum) are evaluated at every node of any number of stored trajectories in one pass, and
+integrated over time with the Legendre-Gauss-Lobatto weights of the collocation grid.
+
+Trajectories are arrays of shape (num_trajectories, num_nodes) holding num_seg segments of
+seg_ncn nodes each, segment by segment, with the end node of a segment repeated as the start
+node of the next, as stored by a pointer CollocationPhase with LGL nodes.
+"""
+from __future__ import print_function
+
+import numpy as np
+from numpy.polynomial import legendre
+from openmdao.api import Group, Problem, IndepVarComp
+
+from hyperloop.Python.mission.pod_drag import pod_drag
+from hyperloop.Python.pod.pod_mach import PodMach
+from hyperloop.Python.tube.tube_vacuum import Vacuum
+
+
+def lgl_nodes(n):
+    """
+    Legendre-Gauss-Lobatto nodes and weights of n points on [-1, 1].
+
+    The interior nodes are the roots of P'_(n-1) and w_i = 2/(n*(n - 1)*P_(n-1)(x_i)**2),
+    which integrates polynomials up to degree 2n - 3 exactly.
+    """
+    c = np.zeros(n)
+    c[-1] = 1.0
+    x = np.concatenate([[-1.0], np.sort(legendre.legroots(legendre.legder(c))), [1.0]])
+    w = 2.0 / (n * (n - 1) * legendre.legval(x, c)**2)
+    return x, w
+
+
+def collocation_weights(time, num_seg=None, seg_ncn=None):
+    """
+    Quadrature weights over the last axis of time, so that the integral of y is
+    sum(weights*y, axis=-1).
+
+    With num_seg and seg_ncn each segment gets the LGL weights of seg_ncn nodes scaled to its
+    duration.  Otherwise the nodes are taken as arbitrary and the trapezoidal rule is used.
+    """
+    time = np.asarray(time, dtype=float)
+
+    if num_seg is None:
+        dt = np.diff(time, axis=-1)
+        weights = np.zeros(time.shape)
+        weights[..., :-1] += 0.5 * dt
+        weights[..., 1:] += 0.5 * dt
+        return weights
+
+    if time.shape[-1] != num_seg * seg_ncn:
+        raise ValueError('Expected %d nodes for %d segments of %d nodes, got %d' %
+                         (num_seg * seg_ncn, num_seg, seg_ncn, time.shape[-1]))
+
+    _, w = lgl_nodes(seg_ncn)
+    seg = time.reshape(time.shape[:-1] + (num_seg, seg_ncn))
+    h = seg[..., -1] - seg[..., 0]
+    return (0.5 * h[..., np.newaxis] * w).reshape(time.shape)
+
+
+def _run(comp, **values):
+    """Problem of a Component alone, run with the given param values"""
+    prob = Problem(Group())
+    prob.root.add('comp', comp)
+    if values:
+        prob.root.add('des_vars', IndepVarComp(sorted(values.items())))
+        for name in values:
+            prob.root.connect('des_vars.%s' % name, 'comp.%s' % name)
+    prob.setup(check=False)
+    prob.run()
+    return prob
+
+
+def trip_power(v, v_dot, theta=0.0, mass=3100.0, S=1.4, D_magnetic=150.0, p_tube=850.0,
+               T_ambient=298.0, R=287.0, gam=1.4, g=9.81, eta_prop=0.8, eta_regen=0.0,
+               eta_comp=0.8, A_pod=1.4, L=22.0, prc=12.5, vacuum_power=None, pods_in_tube=1.0):
+    """
+    Power of each consumer at each node.
+
+    Params
+    ------
+    v, v_dot, theta : array
+        speed (m/s), acceleration (m/s**2) and elevation angle (rad) at each node
+    mass, S, D_magnetic, p_tube, T_ambient, R, g : float or array
+        as in MagneplaneEOM and pod_drag.pod_drag, the drag of PodThrustAndDrag
+    eta_prop : float
+        propulsion efficiency, as eta of PropulsionMechanics
+    eta_regen : float
+        fraction of negative tractive power recovered while braking
+    eta_comp : float
+        compressor efficiency, applied to pwr_comp of PodMach
+    A_pod, L, prc : float
+        pod area (m**2), length (m) and compressor pressure ratio of PodMach
+    vacuum_power : float
+        average pumping power of the whole tube (W).  Default is that of Vacuum with its
+        default params
+    pods_in_tube : float
+        number of pods sharing the pumping power
+
+    Returns
+    -------
+    power : dict
+        propulsion, compressor and vacuum power (W) with the broadcast shape of the inputs
+    """
+    v = np.asarray(v, dtype=float)
+    shape = np.broadcast(v, v_dot, theta, mass).shape
+
+    drag = pod_drag(v, S, p_tube, T_ambient, R, D_magnetic)
+    tractive = (mass * (v_dot + g * np.sin(theta)) + drag) * v
+    propulsion = np.where(tractive > 0.0, tractive / eta_prop, tractive * eta_regen)
+
+    # PodMach params at each node, floats for a single node
+    n = int(np.prod(shape))
+    node_params = dict(M_pod=v / np.sqrt(gam * R * T_ambient), gam=gam, R=R, T_ambient=T_ambient,
+                       p_tube=p_tube, A_pod=A_pod, L=L, prc=prc)
+    for name, val in node_params.items():
+        val = np.broadcast_to(val, shape).ravel()
+        node_params[name] = val if n > 1 else float(val[0])
+    mach = _run(PodMach(num_nodes=n), **node_params)
+    compressor = np.reshape(mach['comp.pwr_comp'], shape) / eta_comp
+
+    if vacuum_power is None:
+        # Vacuum etot is the pumping energy per day in kJ
+        vacuum_power = _run(Vacuum())['comp.etot'] * 1000.0 / 86400.0
+
+    return {'propulsion': np.broadcast_to(propulsion, shape),
+            'compressor': compressor,
+            'vacuum': vacuum_power / pods_in_tube * np.ones(shape)}
+
+
+def trip_energy(time, v, v_dot, num_seg=None, seg_ncn=None, **kwargs):
+    """
+    Energy per trip of each consumer for a batch of trajectories.
+
+    Params
+    ------
+    time, v, v_dot : array
+        time (s), speed and acceleration at each node, shape (num_trajectories, num_nodes)
+        or (num_nodes,)
+    num_seg, seg_ncn : int
+        number of segments and nodes per segment of the LGL collocation grid.  If not given
+        the trapezoidal rule is used.
+    kwargs
+        other node values and params of trip_power
+
+    Returns
+    -------
+    energy : dict
+        energy (J) of each consumer of trip_power and the total, shape (num_trajectories,),
+        along with the trip duration (s)
+    """
+    time = np.asarray(time, dtype=float)
+    weights = collocation_weights(time, num_seg, seg_ncn)
+    power = trip_power(v, v_dot, **kwargs)
+
+    energy = dict((name, np.sum(weights * p, axis=-1)) for name, p in power.items())
+    energy['total'] = sum(energy[name] for name in power)
+    energy['duration'] = time[..., -1] - time[..., 0]
+    return energy
+
+
+if __name__ == '__main__':
+
+    num_seg, seg_ncn = 4, 5
+    x, _ = lgl_nodes(seg_ncn)
+    bounds = np.linspace(0.0, 600.0, num_seg + 1)
+    time = np.concatenate([bounds[i] + .5 * (x + 1.0) * (bounds[i + 1] - bounds[i]) for i in range(num_seg)])
+
+    # accelerate to cruise, cruise and brake, for three cruise speeds
+    v_max = np.array([[250.0], [300.0], [335.0]])
+    a = 2.0
+    v = np.minimum(np.minimum(a * time, v_max), a * (600.0 - time))
+    v_dot = np.where(a * time < v_max, a, np.where(a * (600.0 - time) < v_max, -a, 0.0))
+
+    energy = trip_energy(time * np.ones((3, 1)), v, v_dot, num_seg, seg_ncn)
+
+    for i in range(3):
+        print('%3.0f m/s cruise : %s' % (v_max[i, 0], ', '.join('%s %.1f MJ' % (name, energy[name][i] / 1e6)
+                                                               for name in ('propulsion', 'compressor', 'vacuum', 'total'))))
@@ -0,0 +1,340 @@
+"""
+Compressor off-design map generation and lookup.
+build_compressor_map runs FlowPath off-design over a grid of corrected speed and corrected
+flow, and stores the pressure ratio and efficiency tables in a compressed array file.
+CompressorMapLookup interpolates the map at num_nodes operating points at once, e.g. every
+node of a trajectory, and returns the compressor power with analytic derivatives.
+"""
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import IndepVarComp, Component, Group, Problem, ExecComp, Newton, ScipyGMRES
+
+from hyperloop.Python.tools.cache import cache_path
+from hyperloop.Python.tools.interpolate import RegularGridInterpolant
+from hyperloop.Python.tools.partials import apply_diagonal
+from hyperloop.Python.tools.sweep import run_sweep
+
+T_STD = 518.67  # degR, reference temperature for corrected speed and flow
+P_STD = 14.696  # psi, reference pressure for corrected flow
+
+
+# compressor map scalars, outputs of the design run and params of the off-design compressor,
+# by their path in FlowPath.  They follow the pycycle2 CompressorMap; check_map_scalars raises
+# if the installed pycycle names them differently
+MAP_SCALARS = ('comp.map.s_Nc', 'comp.map.s_Wc', 'comp.map.s_PR', 'comp.map.s_eff')
+
+
+def check_map_scalars(prob, vector='unknowns', prefix='FlowPath.'):
+    """
+    Raises a ValueError naming the MAP_SCALARS that are missing from a set up Problem.
+
+    Params
+    ------
+    prob : Problem
+        Problem after setup
+    vector : str
+        'unknowns' for the outputs of a design run, 'params' for the off-design compressor
+    prefix : str
+        Path of the FlowPath group in prob
+    """
+    meta = getattr(prob.root, '_%s_dict' % vector)
+    variables = set(m['top_promoted_name'] for m in meta.values())
+    missing = [prefix + name for name in MAP_SCALARS if prefix + name not in variables]
+    if missing:
+        found = sorted(name for name in variables if name.startswith(prefix + 'comp.'))
+        raise ValueError('compressor map scalars %s are not %s of the cycle, update MAP_SCALARS '
+                         'to the names of the installed pycycle compressor map. Compressor '
+                         'variables are: %s' % (', '.join(missing), vector, ', '.join(found)))
+
+
+def design_map_scalars(**design):
+    """
+    Runs FlowPath at its design point and returns the compressor map scalars.
+
+    Params
+    ------
+    design
+        values of the des_vars of cycle_surrogate.flow_path_problem, e.g. PRdes.  Default is
+        the FlowPath example case
+
+    Returns
+    -------
+    scalars : dict
+        Value of each of MAP_SCALARS
+    """
+    from hyperloop.Python.pod.cycle.cycle_surrogate import flow_path_problem
+
+    prob = flow_path_problem()
+    prob.setup(check=False)
+    check_map_scalars(prob)
+    for name, val in design.items():
+        prob['des_vars.%s' % name] = val
+    prob.run()
+
+    return dict((name, prob['FlowPath.%s' % name]) for name in MAP_SCALARS)
+
+
+def flow_path_off_design_problem(scalars=None):
+    """
+    FlowPath with the compressor off-design, driven by corrected speed (des_vars.Nc, rpm) and
+    corrected flow (des_vars.Wc, kg/s) at tube conditions.  The map is scaled by the scalars
+    of a design run, design_map_scalars() unless given, and the off-design operating point is
+    converged by Newton.  The speed is set on shaft.Nmech, the param of the pycycle Shaft that
+    FlowPath connects to comp.Nmech.  Module level so sweep workers can build it.
+    """
+    from hyperloop.Python.pod.cycle.flow_path import FlowPath
+
+    if scalars is None:
+        scalars = design_map_scalars()
+
+    # a connection to a missing param would only fail inside setup of the sweep, so check the
+    # off-design FlowPath on its own first
+    probe = Problem()
+    probe.root = Group()
+    probe.root.add('FlowPath', FlowPath(design=False))
+    probe.setup(check=False)
+    check_map_scalars(probe, 'params')
+
+    prob = Problem()
+    root = prob.root = Group()
+
+    root.add('FlowPath', FlowPath(design=False))
+
+    params = (('Nc', 10000.0),
+              ('Wc', 4.53592),
+              ('vehicleMach', 0.8),
+              ('P', 0.1885057735, {'units': 'psi'}),
+              ('T', 591.0961831, {'units': 'degR'}))
+    root.add('des_vars', IndepVarComp(params))
+    root.add('design', IndepVarComp([(name.split('.')[-1], scalars[name]) for name in MAP_SCALARS]))
+    root.add('uncorrect', ExecComp(['W = Wc*(P/%f)/(T/%f)**.5' % (P_STD, T_STD),
+                                    'Nmech = Nc*(T/%f)**.5' % T_STD]))
+
+    root.connect('des_vars.Nc', 'uncorrect.Nc')
+    root.connect('des_vars.Wc', 'uncorrect.Wc')
+    root.connect('des_vars.P', ['uncorrect.P', 'FlowPath.fl_start.P', 'FlowPath.nozzle.Ps_exhaust'])
+    root.connect('des_vars.T', ['uncorrect.T', 'FlowPath.fl_start.T'])
+    root.connect('des_vars.vehicleMach', 'FlowPath.fl_start.MN_target')
+    root.connect('uncorrect.W', 'FlowPath.fl_start.W')
+    root.connect('uncorrect.Nmech', 'FlowPath.shaft.Nmech')
+    for name in MAP_SCALARS:
+        root.connect('design.%s' % name.split('.')[-1], 'FlowPath.%s' % name)
+
+    root.nl_solver = Newton()
+    root.nl_solver.options['atol'] = 1e-6
+    root.nl_solver.options['maxiter'] = 50
+    root.ln_solver = ScipyGMRES()
+
+    return prob
+
+
+class CompressorMap(object):
+    """
+    Pressure ratio and efficiency of a compressor on a grid of corrected speed and flow.
+
+    Params
+    ------
+    Nc : array
+        Corrected speed grid, rpm
+    Wc : array
+        Corrected flow grid, kg/s
+    PR, eff : array
+        Tables with shape (len(Nc), len(Wc))
+    """
+
+    def __init__(self, Nc, Wc, PR, eff):
+        self.Nc = np.asarray(Nc, dtype=float)
+        self.Wc = np.asarray(Wc, dtype=float)
+        self.PR = RegularGridInterpolant((self.Nc, self.Wc), PR)
+        self.eff = RegularGridInterpolant((self.Nc, self.Wc), eff)
+
+    def save(self, file_name):
+        """Saves the map as a compressed float32 array file in the cache directory (or an absolute path)"""
+        np.savez_compressed(cache_path(file_name),
+                            Nc=self.Nc, Wc=self.Wc,
+                            PR=self.PR.values.astype(np.float32),
+                            eff=self.eff.values.astype(np.float32))
+
+    @classmethod
+    def load(cls, file_name):
+        with np.load(cache_path(file_name)) as f:
+            return cls(f['Nc'], f['Wc'], f['PR'], f['eff'])
+
+
+def _fill_speed_lines(table):
+    # points that did not converge (past surge or choke) take the value of the nearest
+    # converged point on the same speed line, so the interpolant stays finite
+    table = np.array(table)
+    j = np.arange(table.shape[1])
+    for row in table:
+        ok = np.isfinite(row)
+        if ok.any():
+            row[~ok] = row[ok][np.abs(j[~ok, np.newaxis] - j[ok]).argmin(axis=1)]
+    return table
+
+
+def build_compressor_map(Nc, Wc, file_name='compressor_map.npz', factory=flow_path_off_design_problem,
+                         inputs=('des_vars.Nc', 'des_vars.Wc'),
+                         outputs=('FlowPath.comp.PR', 'FlowPath.comp.eff'),
+                         num_workers=None):
+    """
+    Runs an off-design cycle over the Nc x Wc grid with the sweep runner and saves the map.
+
+    Params
+    ------
+    Nc, Wc : array
+        Corrected speed and flow grids
+    file_name : str
+        Map file in the cache directory, or None to skip saving
+    factory : callable
+        Module level function returning the off-design Problem. Default is FlowPath
+    inputs : tuple of str
+        Paths the corrected speed and flow are set on
+    outputs : tuple of str
+        Paths of the pressure ratio and efficiency
+
+    Returns
+    -------
+    comp_map : CompressorMap
+    """
+    Nc = np.asarray(Nc, dtype=float)
+    Wc = np.asarray(Wc, dtype=float)
+    NN, WW = np.meshgrid(Nc, Wc, indexing='ij')
+
+    cases = {inputs[0]: NN.ravel(), inputs[1]: WW.ravel()}
+    sweep_path = cache_path((file_name or 'compressor_map.npz') + '.sweep')
+    data = run_sweep(factory, cases, list(outputs), sweep_path, num_workers=num_workers)
+
+    failed = data['success'] != 1.0
+    tables = []
+    for name in outputs:
+        vals = np.where(failed, np.nan, data[name])
+        tables.append(_fill_speed_lines(vals.reshape(NN.shape)))
+
+    comp_map = CompressorMap(Nc, Wc, *tables)
+    if file_name is not None:
+        comp_map.save(file_name)
+    return comp_map
+
+
+class CompressorMapLookup(Component):
+    """
+    Notes
+    ------
+
+    Interpolates a compressor map at num_nodes operating points at once.  With num_nodes = 1
+    all params and outputs are floats; otherwise each one is an array of length num_nodes.
+    Points outside the map are clamped to its boundary.
+
+    Params
+    ------
+    Corrected speed : float
+        Compressor corrected speed. Default value is 10000 rpm
+    Corrected flow : float
+        Compressor corrected mass flow. Default value is 4.536 kg/s
+    Mass flow : float
+        Actual mass flow through the compressor. Default value is 4.536 kg/s
+    Inlet temperature : float
+        Total temperature at the compressor face. Default value is 328.4 K
+    Specific heat : float
+        Specific heat of air. Default value is 1009 J/(kg*K)
+    Ratio of specific heats : float
+        Ratio of specific heats. Default value is 1.4
+
+    Returns
+    -------
+    Pressure ratio : float
+        Compressor total pressure ratio from the map
+    Efficiency : float
+        Compressor adiabatic efficiency from the map
+    Compressor power : float
+        Power delivered to the flow, W*cp*Tt*(PR**((gam-1)/gam) - 1)/eff
+
+    Args
+    ----
+    comp_map : CompressorMap or str
+        Map, or the file it was saved to. Default is 'compressor_map.npz' in the cache directory
+    """
+
+    def __init__(self, num_nodes=1, comp_map='compressor_map.npz'):
+        super(CompressorMapLookup, self).__init__()
+
+        self.deriv_options['type'] = 'user'
+
+        self.num_nodes = num_nodes
+        nn = num_nodes
+
+        self.comp_map = comp_map if isinstance(comp_map, CompressorMap) else CompressorMap.load(comp_map)
+
+        def _val(val):
+            return val if nn == 1 else val * np.ones(nn)
+
+        self.add_param('Nc', val=_val(10000.0), units='rpm', desc='corrected speed')
+        self.add_param('Wc', val=_val(4.53592), units='kg/s', desc='corrected flow')
+        self.add_param('W', val=_val(4.53592), units='kg/s', desc='mass flow')
+        self.add_param('Tt', val=_val(328.4), units='K', desc='compressor inlet total temperature')
+        self.add_param('cp', val=_val(1009.0), units='J/(kg*K)', desc='specific heat')
+        self.add_param('gam', val=_val(1.4), desc='ratio of specific heats')
+
+        self.add_output('PR', val=_val(1.0), desc='compressor pressure ratio')
+        self.add_output('eff', val=_val(1.0), desc='compressor efficiency')
+        self.add_output('pwr', val=_val(0.0), units='W', desc='compressor power')
+
+        self._partials = {}
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        PR = self.comp_map.PR(params['Nc'], params['Wc'])
+        eff = self.comp_map.eff(params['Nc'], params['Wc'])
+        k = (params['gam'] - 1.0) / params['gam']
+
+        unknowns['PR'] = PR
+        unknowns['eff'] = eff
+        unknowns['pwr'] = params['W'] * params['cp'] * params['Tt'] * (PR**k - 1.0) / eff
+
+    def linearize(self, params, unknowns, resids):
+        PR, (dPR_dNc, dPR_dWc) = self.comp_map.PR.evaluate(params['Nc'], params['Wc'])
+        eff, (deff_dNc, deff_dWc) = self.comp_map.eff.evaluate(params['Nc'], params['Wc'])
+
+        W = params['W']
+        cp = params['cp']
+        Tt = params['Tt']
+        gam = params['gam']
+        k = (gam - 1.0) / gam
+        tau = PR**k - 1.0
+        pwr = W * cp * Tt * tau / eff
+
+        dpwr_dPR = W * cp * Tt * k * PR**(k - 1.0) / eff
+        dpwr_deff = -pwr / eff
+
+        self._partials = {('PR', 'Nc'): dPR_dNc,
+                          ('PR', 'Wc'): dPR_dWc,
+                          ('eff', 'Nc'): deff_dNc,
+                          ('eff', 'Wc'): deff_dWc,
+                          ('pwr', 'Nc'): dpwr_dPR * dPR_dNc + dpwr_deff * deff_dNc,
+                          ('pwr', 'Wc'): dpwr_dPR * dPR_dWc + dpwr_deff * deff_dWc,
+                          ('pwr', 'W'): cp * Tt * tau / eff,
+                          ('pwr', 'cp'): W * Tt * tau / eff,
+                          ('pwr', 'Tt'): W * cp * tau / eff,
+                          ('pwr', 'gam'): W * cp * Tt * PR**k * np.log(PR) / (gam**2 * eff)}
+        return {}
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        apply_diagonal(self._partials, dparams, dresids, mode)
+
+
+if __name__ == '__main__':
+
+    comp_map = build_compressor_map(np.linspace(6000.0, 12000.0, 13), np.linspace(1.0, 8.0, 15))
+
+    top = Problem()
+    root = top.root = Group()
+    root.add('p', CompressorMapLookup(num_nodes=5, comp_map=comp_map))
+
+    top.setup()
+    top['p.Nc'] = np.linspace(7000.0, 11000.0, 5)
+    top.run()
+
+    print('\n')
+    print('PR = %s' % top['p.PR'])
+    print('Compressor power = %s W' % top['p.pwr'])
@@ -98,6 +98,34 @@ class CompressorMass(Component):
         unknowns['comp_mass'] = 299.2167 * comp_inletArea + 0.007418 * (
             (mass_flow * (h_out - h_in)) / (comp_eff / 100)) + 37.15
 
+    def linearize(self, params, unknowns, resids):
+        """Returns the analytic partials of `comp_mass` with respect to each param
+
+        Args
+        ----------
+        params : `VecWrapper`
+            `VecWrapper` containing parameters
+
+        unknowns : `VecWrapper`
+            `VecWrapper` containing outputs and states
+
+        resids : `VecWrapper`
+            `VecWrapper` containing residuals
+
+        """
+        comp_eff = params['comp_eff']
+        mass_flow = params['mass_flow']
+        dh = params['h_out'] - params['h_in']
+        k = 0.007418 * 100 / comp_eff
+
+        J = {}
+        J['comp_mass', 'comp_eff'] = -k * mass_flow * dh / comp_eff
+        J['comp_mass', 'mass_flow'] = k * dh
+        J['comp_mass', 'h_in'] = -k * mass_flow
+        J['comp_mass', 'h_out'] = k * mass_flow
+        J['comp_mass', 'comp_inletArea'] = 299.2167
+        return J
+
 if __name__ == "__main__":
     top = Problem()
     root = top.root = Group()
@@ -0,0 +1,115 @@
+"""
+Memoized cycle evaluations.
+Runs a cycle model (by default the pycycle FlowPath) as a sub-problem and caches every
+converged point.  Repeat evaluations at the same inputs return the stored outputs, and new
+inputs start the cycle solve from the converged state of the nearest cached point.
+"""
+from __future__ import print_function
+
+from collections import OrderedDict
+
+import numpy as np
+from openmdao.api import Component
+
+from hyperloop.Python.tools.cache import ResultCache
+from hyperloop.Python.pod.cycle.cycle_surrogate import SURROGATE_INPUTS, SURROGATE_OUTPUTS, flow_path_problem
+
+
+def _local_name(path):
+    return path.replace('.', '_').replace(':', '_')
+
+
+# FlowPath inputs and outputs exposed by CachedCycle: local name -> (sub-problem path, default, units)
+FLOW_PATH_INPUTS = OrderedDict((name, ('des_vars.%s' % name, val, units))
+                               for name, (val, units, bounds) in SURROGATE_INPUTS.items())
+FLOW_PATH_OUTPUTS = OrderedDict((_local_name('%s.%s' % (element, name)),
+                                 ('FlowPath.%s.%s' % (element, name), 0.0, units))
+                                for element, outputs in SURROGATE_OUTPUTS.items()
+                                for name, units in outputs)
+
+
+class CachedCycle(Component):
+    """
+    Notes
+    ------
+
+    Wraps a cycle Problem in a component with a cache of converged points.  An exact hit
+    (inputs equal to sig_digits significant digits) copies the stored outputs without running
+    the cycle.  On a miss the sub-problem's unknowns vector is set to the converged state of
+    the nearest cached point before running, so its Newton solve starts close to the answer.
+    Derivatives are finite differenced; the perturbed points are cached as well.
+
+    Params
+    ------
+    vehicleMach, P, T, W, PRdes : float
+        Cycle inputs, as in CycleSurrogate
+
+    Returns
+    -------
+    comp_power, comp_trq, nozzle_Fg, inlet_F_ram, ... : float
+        Cycle outputs, named after their FlowPath paths with '.' and ':' replaced by '_'
+
+    Args
+    ----
+    factory : callable
+        Returns the cycle Problem (not set up). Default builds FlowPath
+    inputs, outputs : OrderedDict
+        Map local variable names to (sub-problem path, default value, units)
+    maxsize : int
+        Maximum number of cached points
+    sig_digits : int
+        Significant digits of the inputs used to match cached points
+    cache_file : str
+        File in the cache directory to persist the cache to, or None
+    """
+
+    def __init__(self, factory=flow_path_problem, inputs=FLOW_PATH_INPUTS, outputs=FLOW_PATH_OUTPUTS,
+                 maxsize=256, sig_digits=10, cache_file=None):
+        super(CachedCycle, self).__init__()
+
+        self.deriv_options['type'] = 'fd'
+
+        self.factory = factory
+        self.inputs = inputs
+        self.outputs = outputs
+        self.cache = ResultCache(maxsize=maxsize, sig_digits=sig_digits, file_name=cache_file)
+        self._prob = None
+
+        for name, (path, val, units) in inputs.items():
+            kwargs = {'units': units} if units else {}
+            self.add_param(name, val, **kwargs)
+        for name, (path, val, units) in outputs.items():
+            kwargs = {'units': units} if units else {}
+            self.add_output(name, val, **kwargs)
+
+    def _problem(self):
+        if self._prob is None:
+            self._prob = self.factory()
+            self._prob.setup(check=False)
+        return self._prob
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        x = np.array([params[name] for name in self.inputs])
+
+        entry = self.cache.get(x)
+        if entry is None:
+            prob = self._problem()
+
+            nearest = self.cache.nearest(x)
+            if nearest is not None:
+                prob.root.unknowns.vec[:] = nearest[1]
+
+            for name, (path, val, units) in self.inputs.items():
+                prob[path] = params[name]
+            prob.run()
+
+            entry = (dict((name, prob[path]) for name, (path, val, units) in self.outputs.items()),
+                     prob.root.unknowns.vec)
+            self.cache.put(x, *entry)
+
+        for name, val in entry[0].items():
+            unknowns[name] = val
+
+    def save_cache(self):
+        """Writes the cached points to cache_file"""
+        self.cache.save()
@@ -0,0 +1,354 @@
+"""
+Surrogate for the pycycle FlowPath.
+Samples FlowPath over the operating envelope, saves the samples to disk, and fits
+response surface or Kriging models of the compressor, inlet and nozzle outputs.
+CycleSurrogate can replace the Cycle group: it takes the flow start conditions at the same
+paths, promotes the same outputs (comp.power, nozzle.Fg, comp_mass, ...) and has analytic
+derivatives.
+"""
+from __future__ import print_function
+
+import sys
+from collections import OrderedDict
+
+import numpy as np
+from openmdao.api import IndepVarComp, Component, Group, Problem, MetaModel, KrigingSurrogate, ResponseSurface
+
+from hyperloop.Python.pod.cycle.compressor_mass import CompressorMass
+from hyperloop.Python.tools.cache import cache_path
+from hyperloop.Python.tools.sweep import latin_hypercube, run_sweep
+
+# Surrogate inputs: name, default, units and bounds of the operating envelope
+SURROGATE_INPUTS = OrderedDict([('vehicleMach', (.8, None, (.5, .95))),
+                                ('P', (.1885057735, 'psi', (.07, .3))),
+                                ('T', (591.0961831, 'degR', (520.0, 600.0))),
+                                ('W', (4.53592, 'kg/s', (1.0, 8.0))),
+                                ('PRdes', (6.0, None, (4.0, 20.0)))])
+
+# Surrogate outputs, grouped by the FlowPath element they come from, with pycycle units
+SURROGATE_OUTPUTS = OrderedDict([('inlet', [('F_ram', 'lbf'),
+                                            ('Fl_O:stat:area', 'inch**2'),
+                                            ('Fl_O:stat:W', 'lbm/s'),
+                                            ('Fl_O:tot:h', 'Btu/lbm'),
+                                            ('Fl_O:stat:MN', None),
+                                            ('Fl_O:stat:P', 'psi'),
+                                            ('Fl_O:stat:T', 'degR'),
+                                            ('Fl_O:tot:P', 'psi'),
+                                            ('Fl_O:tot:T', 'degR')]),
+                                 ('comp', [('power', 'hp'),
+                                           ('trq', 'ft*lbf'),
+                                           ('Nmech', 'rpm'),
+                                           ('Fl_O:stat:area', 'inch**2'),
+                                           ('Fl_O:tot:h', 'Btu/lbm'),
+                                           ('Fl_O:stat:MN', None),
+                                           ('Fl_O:stat:P', 'psi'),
+                                           ('Fl_O:stat:T', 'degR')]),
+                                 ('nozzle', [('Fg', 'lbf'),
+                                             ('Fl_O:stat:area', 'inch**2'),
+                                             ('Fl_O:tot:T', 'degR'),
+                                             ('Fl_O:stat:W', 'lbm/s')])])
+
+# FlowPath outputs promoted by the Cycle group
+CYCLE_OUTPUTS = ['comp.trq', 'comp.power', 'comp.Nmech', 'inlet.Fl_O:stat:area', 'nozzle.Fg',
+                 'inlet.F_ram', 'nozzle.Fl_O:tot:T', 'nozzle.Fl_O:stat:W', 'fl_start.Fl_O:stat:P',
+                 'fl_start.Fl_O:stat:T', 'fl_start.Fl_O:tot:P', 'fl_start.Fl_O:tot:T',
+                 'fl_start.Fl_O:stat:rho', 'fl_start.Fl_O:stat:V', 'inlet.Fl_O:stat:MN',
+                 'inlet.Fl_O:stat:P', 'inlet.Fl_O:stat:T', 'inlet.Fl_O:tot:P', 'inlet.Fl_O:tot:T',
+                 'inlet.Fl_O:stat:W', 'comp.Fl_O:stat:MN', 'comp.Fl_O:stat:area',
+                 'comp.Fl_O:stat:P', 'comp.Fl_O:stat:T']
+
+# flow start outputs that set each surrogate input
+_FLOW_START_INPUTS = OrderedDict([('vehicleMach', 'Fl_O:stat:MN'),
+                                  ('P', 'Fl_O:tot:P'),
+                                  ('T', 'Fl_O:tot:T'),
+                                  ('W', 'Fl_O:stat:W')])
+
+# gas constant of air (ft*lbf/(lbm*degR)) and lbm*ft/(lbf*s**2)
+_R_AIR = 53.3533
+_G_C = 32.174
+
+
+def flow_path_problem():
+    """Builds the FlowPath Problem that is sampled. Module level so sweep workers can build it"""
+    from hyperloop.Python.pod.cycle.flow_path import FlowPath
+
+    prob = Problem()
+    root = prob.root = Group()
+
+    root.add('FlowPath', FlowPath())
+
+    params = [(name, val, {'units': units}) if units else (name, val)
+              for name, (val, units, bounds) in SURROGATE_INPUTS.items()]
+    # remaining settings match the FlowPath example case
+    params += [('inlet_MN', 0.65),
+               ('ram_recovery', 0.99),
+               ('comp_MN', 0.65),
+               ('duct_MN', 0.65),
+               ('duct_dPqP', 0.0),
+               ('nozzle_Cfg', 1.0),
+               ('nozzle_dPqP', 0.0)]
+    root.add('des_vars', IndepVarComp(params))
+
+    root.connect('des_vars.vehicleMach', 'FlowPath.fl_start.MN_target')
+    root.connect('des_vars.P', ['FlowPath.fl_start.P', 'FlowPath.nozzle.Ps_exhaust'])
+    root.connect('des_vars.T', 'FlowPath.fl_start.T')
+    root.connect('des_vars.W', 'FlowPath.fl_start.W')
+    root.connect('des_vars.PRdes', 'FlowPath.comp.map.PRdes')
+    root.connect('des_vars.inlet_MN', 'FlowPath.inlet.MN_target')
+    root.connect('des_vars.ram_recovery', 'FlowPath.inlet.ram_recovery')
+    root.connect('des_vars.comp_MN', 'FlowPath.comp.MN_target')
+    root.connect('des_vars.duct_MN', 'FlowPath.duct.MN_target')
+    root.connect('des_vars.duct_dPqP', 'FlowPath.duct.dPqP')
+    root.connect('des_vars.nozzle_Cfg', 'FlowPath.nozzle.Cfg')
+    root.connect('des_vars.nozzle_dPqP', 'FlowPath.nozzle.dPqP')
+
+    return prob
+
+
+def sample_flow_path(num_samples, file_name='flow_path_samples.npz', num_workers=None, seed=0):
+    """
+    Runs FlowPath on a Latin hypercube over the operating envelope and saves the converged
+    samples as training data for CycleSurrogate.
+
+    Returns
+    -------
+    data : dict
+        Training data, keyed by surrogate input name and by output path (e.g. 'comp.power')
+    """
+    bounds = dict(('des_vars.%s' % name, meta[2]) for name, meta in SURROGATE_INPUTS.items())
+    outputs = ['FlowPath.%s.%s' % (element, name)
+               for element, names in SURROGATE_OUTPUTS.items() for name, units in names]
+
+    cases = latin_hypercube(bounds, num_samples, seed=seed)
+    results = run_sweep(flow_path_problem, cases, outputs, cache_path(file_name + '.sweep'),
+                        num_workers=num_workers)
+
+    converged = results['success'] == 1.0
+    data = {}
+    for name in SURROGATE_INPUTS:
+        data[name] = results['des_vars.%s' % name][converged]
+    for path in outputs:
+        data[path[len('FlowPath.'):]] = results[path][converged]
+
+    np.savez(cache_path(file_name), **data)
+    return data
+
+
+class FlowStart(Component):
+    """
+    Notes
+    ------
+
+    Static and total conditions of the flow entering the FlowPath, for a calorically perfect
+    gas.  Stands in for the pycycle FlowStart element, which uses the janaf air properties, at
+    the same path and with the same params and output names.
+
+    Params
+    ------
+    MN_target : float
+        Mach number of the flow. Default value is .8
+    P : float
+        Total pressure. Default value is .1885 psi
+    T : float
+        Total temperature. Default value is 591.1 degR
+    W : float
+        Mass flow. Default value is 10.0 lbm/s
+
+    Returns
+    -------
+    Fl_O:stat:P, Fl_O:stat:T : float
+        Static pressure and temperature
+    Fl_O:tot:P, Fl_O:tot:T : float
+        Total pressure and temperature
+    Fl_O:stat:rho, Fl_O:stat:V : float
+        Static density and velocity
+    Fl_O:stat:MN, Fl_O:stat:W : float
+        Mach number and mass flow
+
+    Args
+    ----
+    gam : float
+        Ratio of specific heats. Default is 1.4
+    """
+
+    def __init__(self, gam=1.4):
+        super(FlowStart, self).__init__()
+
+        self.gam = gam
+
+        self.add_param('MN_target', val=.8, desc='Mach number')
+        self.add_param('P', val=.1885057735, units='psi', desc='total pressure')
+        self.add_param('T', val=591.0961831, units='degR', desc='total temperature')
+        self.add_param('W', val=10.0, units='lbm/s', desc='mass flow')
+
+        self.add_output('Fl_O:stat:P', val=0.0, units='psi', desc='static pressure')
+        self.add_output('Fl_O:stat:T', val=0.0, units='degR', desc='static temperature')
+        self.add_output('Fl_O:tot:P', val=0.0, units='psi', desc='total pressure')
+        self.add_output('Fl_O:tot:T', val=0.0, units='degR', desc='total temperature')
+        self.add_output('Fl_O:stat:rho', val=0.0, units='lbm/ft**3', desc='static density')
+        self.add_output('Fl_O:stat:V', val=0.0, units='ft/s', desc='velocity')
+        self.add_output('Fl_O:stat:MN', val=0.0, desc='Mach number')
+        self.add_output('Fl_O:stat:W', val=0.0, units='lbm/s', desc='mass flow')
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        gam = self.gam
+        MN = params['MN_target']
+
+        f = 1.0 + .5 * (gam - 1.0) * MN**2
+        Ts = params['T'] / f
+        Ps = params['P'] * f**(-gam / (gam - 1.0))
+
+        unknowns['Fl_O:stat:P'] = Ps
+        unknowns['Fl_O:stat:T'] = Ts
+        unknowns['Fl_O:tot:P'] = params['P']
+        unknowns['Fl_O:tot:T'] = params['T']
+        unknowns['Fl_O:stat:rho'] = 144.0 * Ps / (_R_AIR * Ts)
+        unknowns['Fl_O:stat:V'] = MN * np.sqrt(gam * _R_AIR * _G_C * Ts)
+        unknowns['Fl_O:stat:MN'] = MN
+        unknowns['Fl_O:stat:W'] = params['W']
+
+    def linearize(self, params, unknowns, resids):
+        gam = self.gam
+        MN = params['MN_target']
+        Ts = unknowns['Fl_O:stat:T']
+        Ps = unknowns['Fl_O:stat:P']
+        rho = unknowns['Fl_O:stat:rho']
+        V = unknowns['Fl_O:stat:V']
+
+        f = 1.0 + .5 * (gam - 1.0) * MN**2
+        df_dMN = (gam - 1.0) * MN
+
+        dTs = {'T': 1.0 / f, 'MN_target': -Ts / f * df_dMN}
+        dPs = {'P': Ps / params['P'], 'MN_target': -gam / (gam - 1.0) * Ps / f * df_dMN}
+
+        J = {}
+        J['Fl_O:stat:T', 'T'] = dTs['T']
+        J['Fl_O:stat:T', 'MN_target'] = dTs['MN_target']
+        J['Fl_O:stat:P', 'P'] = dPs['P']
+        J['Fl_O:stat:P', 'MN_target'] = dPs['MN_target']
+        J['Fl_O:tot:P', 'P'] = 1.0
+        J['Fl_O:tot:T', 'T'] = 1.0
+        J['Fl_O:stat:rho', 'P'] = rho / Ps * dPs['P']
+        J['Fl_O:stat:rho', 'T'] = -rho / Ts * dTs['T']
+        J['Fl_O:stat:rho', 'MN_target'] = rho * (dPs['MN_target'] / Ps - dTs['MN_target'] / Ts)
+        J['Fl_O:stat:V', 'T'] = .5 * V / Ts * dTs['T']
+        J['Fl_O:stat:V', 'MN_target'] = V / MN + .5 * V / Ts * dTs['MN_target']
+        J['Fl_O:stat:MN', 'MN_target'] = 1.0
+        J['Fl_O:stat:W', 'W'] = 1.0
+        return J
+
+
+class CycleSurrogate(Group):
+    """
+    Notes
+    ------
+
+    Replaces the Cycle group with surrogates of its FlowPath.  The FlowPath subgroup keeps
+    the element names of the pycycle FlowPath: fl_start computes the station at the front of
+    the pod, and each element that Cycle promotes outputs from is a MetaModel trained on
+    FlowPath samples, fed by fl_start.  The group promotes the same outputs as Cycle, so
+    PodGroup(cycle=CycleSurrogate()) needs no other changes.  The compressor mass is computed
+    from the surrogate enthalpies as in Cycle.
+
+    The surrogates are trained with the inlet and compressor Mach numbers, ram recovery and
+    losses of sample_flow_path and the nozzle exhausting to the tube pressure, so
+    FlowPath.inlet.MN_target and FlowPath.nozzle.Ps_exhaust are not params here.  The design
+    pressure ratio is FlowPath.comp.PRdes rather than FlowPath.comp.map.PRdes.
+
+    Params
+    ------
+    FlowPath.fl_start.MN_target : float
+        Pod Mach number. Default value is .8
+    FlowPath.fl_start.P : float
+        Tube total pressure. Default value is .1885 psi
+    FlowPath.fl_start.T : float
+        Tube total temperature. Default value is 591.1 degR
+    FlowPath.fl_start.W : float
+        Mass flow through the inlet. Default value is 10.0 lbm/s
+    FlowPath.comp.PRdes : float
+        Compressor design pressure ratio. Default value is 6.0
+
+    Returns
+    -------
+    comp.power : float
+        Power required by the compressor
+    comp.trq : float
+        Torque required by the compressor
+    comp.Nmech : float
+        Shaft speed
+    nozzle.Fg : float
+        Nozzle gross thrust
+    inlet.F_ram : float
+        Inlet ram drag
+    comp_mass : float
+        Compressor mass
+
+    The flow station outputs are promoted as in Cycle, e.g. fl_start.Fl_O:stat:rho and
+    comp.Fl_O:stat:area.
+
+    Args
+    ----
+    training_data : str or dict
+        Training data from sample_flow_path, or the name of the file it was saved to.
+        Default is 'flow_path_samples.npz' in the cache directory
+    surrogate : str
+        'response_surface' (quadratic, default) or 'kriging'
+    """
+
+    def __init__(self, training_data='flow_path_samples.npz', surrogate='response_surface'):
+        super(CycleSurrogate, self).__init__()
+
+        if not isinstance(training_data, dict):
+            with np.load(cache_path(training_data)) as f:
+                training_data = dict((k, f[k]) for k in f.files)
+
+        if surrogate == 'response_surface':
+            surrogate_class = ResponseSurface
+        elif surrogate == 'kriging':
+            surrogate_class = KrigingSurrogate
+        else:
+            raise ValueError("surrogate must be 'response_surface' or 'kriging', not '%s'" % surrogate)
+
+        flow_path = Group()
+        flow_path.add('fl_start', FlowStart())
+
+        for element, outputs in SURROGATE_OUTPUTS.items():
+            meta = MetaModel()
+            for name, (val, units, bounds) in SURROGATE_INPUTS.items():
+                kwargs = {'units': units} if units else {}
+                meta.add_param(name, val, training_data=training_data[name], **kwargs)
+            for name, units in outputs:
+                kwargs = {'units': units} if units else {}
+                meta.add_output(name, 0.0,
+                                training_data=training_data['%s.%s' % (element, name)],
+                                surrogate=surrogate_class(),
+                                **kwargs)
+            flow_path.add(element, meta)
+
+        for name, station in _FLOW_START_INPUTS.items():
+            flow_path.connect('fl_start.%s' % station, ['%s.%s' % (element, name) for element in SURROGATE_OUTPUTS])
+        flow_path.connect('comp.PRdes', ['inlet.PRdes', 'nozzle.PRdes'])
+
+        self.add('FlowPath', flow_path, promotes=CYCLE_OUTPUTS)
+        self.add('CompressorMass', CompressorMass(), promotes=['comp_mass', 'comp_inletArea'])
+
+        self.connect('FlowPath.inlet.Fl_O:tot:h', 'CompressorMass.h_in')
+        self.connect('FlowPath.comp.Fl_O:tot:h', 'CompressorMass.h_out')
+        self.connect('comp.Fl_O:stat:area', 'comp_inletArea')
+        self.connect('inlet.Fl_O:stat:W', 'CompressorMass.mass_flow')
+
+
+if __name__ == "__main__":
+
+    num_samples = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    sample_flow_path(num_samples)
+
+    prob = Problem()
+    root = prob.root = Group()
+    root.add('Cycle', CycleSurrogate())
+
+    prob.setup()
+    prob.run()
+
+    print('Comp power %f hp' % prob['Cycle.comp.power'])
+    print('Comp_Mass %f' % prob['Cycle.comp_mass'])
@@ -71,12 +71,18 @@ class FlowPath(Group):
     comp trq out : float
         Torque required by compressor motor
 
+    Args
+    ----
+    design : bool
+        Runs the compressor in design mode (default), where PRdes and effDes size it.
+        With design=False the compressor runs off-design on its map at the given speed and flow
+
     Notes
     -----
     [1] see https://github.com/jcchin/pycycle2/wiki
     """
 
-    def __init__(self):
+    def __init__(self, design=True):
         super(FlowPath, self).__init__()
 
         # initiate components
@@ -84,7 +90,7 @@ class FlowPath(Group):
         self.add('fl_start', FlowStart(thermo_data=janaf, elements=AIR_MIX))
         # internal flow
         self.add('inlet', Inlet(thermo_data=janaf, elements=AIR_MIX))
-        self.add('comp', Compressor(thermo_data=janaf, elements=AIR_MIX))
+        self.add('comp', Compressor(thermo_data=janaf, elements=AIR_MIX, design=design))
         self.add('duct', Duct(thermo_data=janaf, elements=AIR_MIX))
         self.add('nozzle', Nozzle(thermo_data=janaf, elements=AIR_MIX))
         self.add('shaft', Shaft(1))
@@ -1,6 +1,12 @@
 import numpy as np
 from openmdao.api import Component, Problem, Group
 
+# Shepherd discharge curve parameters of a single cell, from the SUGAR paper [2]_
+A_EXP = 0.144  # voltage drop over exponential zone (V)
+B_EXP = 2.3077  # time constant of the exponential zone (1/(A*h))
+K_POL = 0.01875  # polarization voltage (V)
+E_0 = 1.2848  # no load constant voltage (V)
+
 class Battery(Component):
     """The `Battery` class represents a battery component in an OpenMDAO model. 
     
@@ -210,14 +216,14 @@ class Battery(Component):
 
         # voltage drop over exponential zone
         # a = params['params['e_full']'] - params['e_exp']
-        a = 0.144
+        a = A_EXP
         # discharge of single cell from full to end of exponential zone
         q_exp = self._calculate_total_discharge(
             params['t_exp'], params['des_current']) / n_parallel
 
         # time constant of the exponential zone
         # b = 3 / q_exp
-        b = 2.3077
+        b = B_EXP
 
         # discharge over the nominal zone
         q_nom = self._calculate_total_discharge(
@@ -225,12 +231,12 @@ class Battery(Component):
 
         # polarization voltage
         # k = (params['params['e_full']'] - params['e_nom'] + a * (np.exp(-b * q_nom) - 1)) * (params['q_n'] - q_nom)
-        k = 0.01875
+        k = K_POL
 
         # no load constant voltage of battery
         # k = polarization voltage, params['r'] = resistance,
         # e_0 = params['params['e_full']'] + k + params['r'] * single_bat_current - a
-        e_0 = 1.2848
+        e_0 = E_0
 
         # general voltage performance curve
         v_batt = e_0 - k * (params['q_n'] / (
@@ -266,6 +272,21 @@ class Battery(Component):
         # check representation invariant
         self._check_rep(params, unknowns, resids)
 
+    def linearize(self, params, unknowns, resids):
+        """Partials of the continuous outputs. The cell counts are rounded up to integers,
+        so the outputs are piecewise constant in the load params and have zero partials there."""
+        n_cells = unknowns['n_cells']
+        n_series = unknowns['output_voltage'] / params['e_nom']
+        area = np.pi * np.power(params['cell_diameter'] / 2, 2)
+
+        J = {}
+        J['battery_volume', 'cell_height'] = n_cells * area / 0.9069 / 1000
+        J['battery_volume', 'cell_diameter'] = n_cells * params['cell_height'] * np.pi * \
+            params['cell_diameter'] / 2 / 0.9069 / 1000
+        J['battery_mass', 'cell_mass'] = n_cells / 1000
+        J['output_voltage', 'e_nom'] = n_series
+        return J
+
     def _calculate_total_discharge(self, time, current):
         """Calculates the total discharge over a given load profile
 
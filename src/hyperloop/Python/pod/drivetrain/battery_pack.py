@@ -0,0 +1,340 @@
+"""
+Battery pack configuration search.
+Battery sizes a pack by rounding its cell counts up with np.ceil, which has no useful
+derivatives and misbehaves for fractional cell counts.  Here a pack is n_series strings in
+series of n_parallel cells in parallel, and pack_performance evaluates any (n_series,
+n_parallel), integer or not, at the design power at the end of the usable discharge: the
+cell current, the loaded pack voltage and the usable energy, along with mass, volume and cost.
+
+search_pack_configurations enumerates the integer configurations of one or more cell types
+that meet a power, voltage and energy requirement and returns the Pareto set in mass, volume
+and cost.  BatteryPack is the continuous relaxation with analytic derivatives, for use with
+n_series and n_parallel as design variables of a gradient based optimization.
+"""
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import Component, Problem, Group
+
+from hyperloop.Python.pod.drivetrain.battery import A_EXP, B_EXP, K_POL, E_0
+
+# Cell of the Battery component defaults
+DEFAULT_CELL = {'q_n': 6.8,  # A*h
+                'r': 0.0046,  # Ohms
+                'e_nom': 1.2,  # V
+                'cell_mass': 170.0,  # g
+                'cell_height': 61.0,  # mm
+                'cell_diameter': 33.0,  # mm
+                'cell_cost': 12.95}  # $
+
+
+def end_of_discharge_voltage(q_n, q_l):
+    """Open circuit voltage of a cell (V) discharged to its limit, Shepherd curve of Battery"""
+    return E_0 - K_POL / q_l + A_EXP * np.exp(-B_EXP * q_n * (1.0 - q_l))
+
+
+def pack_performance(n_series, n_parallel, des_power, q_n=6.8, r=0.0046, q_l=0.1, e_nom=1.2,
+                     cell_mass=170.0, cell_height=61.0, cell_diameter=33.0, cell_cost=12.95):
+    """
+    Performance of pack configurations at the design power, at the end of the usable discharge.
+    All arguments broadcast against each other.
+
+    Params
+    ------
+    n_series, n_parallel : float or array
+        Cells in series and in parallel
+    des_power : float
+        Design power (W)
+    q_n, r, q_l, e_nom : float or array
+        Cell capacity (A*h), resistance (Ohms), discharge limit and nominal voltage (V)
+    cell_mass, cell_height, cell_diameter, cell_cost : float or array
+        Cell mass (g), height and diameter (mm) and cost ($)
+
+    Returns
+    -------
+    perf : dict
+        n_cells, cell_current (A), voltage (loaded pack voltage, V), energy (usable, W*h),
+        mass (kg), volume (cm**3) and cost ($).  The cell current is nan where a configuration
+        cannot deliver the design power at all
+    """
+    n_cells = n_series * n_parallel
+    v_oc = end_of_discharge_voltage(q_n, q_l)
+
+    # cell power p = i*(v_oc - r*i), on the low current root
+    p = des_power / n_cells
+    with np.errstate(invalid='ignore'):
+        i = (v_oc - np.sqrt(v_oc**2 - 4.0 * r * p)) / (2.0 * r)
+
+    return {'n_cells': n_cells,
+            'cell_current': i,
+            'voltage': n_series * (v_oc - r * i),
+            'energy': n_cells * e_nom * q_n * (1.0 - q_l),
+            'mass': cell_mass * n_cells / 1000.0,
+            'volume': n_cells * cell_height * np.pi * (cell_diameter / 2.0)**2 / 0.9069 / 1000.0,
+            'cost': n_cells * cell_cost}
+
+
+def pareto_front(objectives):
+    """
+    Mask of the non-dominated rows of objectives, shape (num_points, num_objectives), all
+    minimized.  Of identical points only the first is kept.
+    """
+    objectives = np.asarray(objectives, dtype=float)
+    a = objectives[:, np.newaxis, :]
+    b = objectives[np.newaxis, :, :]
+    dominates = np.all(b <= a, axis=-1) & np.any(b < a, axis=-1)
+
+    equal = np.all(b == a, axis=-1)
+    duplicate = np.triu(equal, 1).T.any(axis=1)
+
+    return ~dominates.any(axis=1) & ~duplicate
+
+
+def search_pack_configurations(des_power, des_voltage, energy, cells=(DEFAULT_CELL, ), q_l=0.1,
+                               max_c_rate=3.0, max_series=2000, max_parallel=500, pareto=True):
+    """
+    Integer pack configurations that deliver des_power at no less than des_voltage at the end
+    of the usable discharge, store at least energy, and keep the cell current under max_c_rate.
+
+    For each cell type and number of cells in series the smallest feasible number in parallel
+    has a closed form: the voltage and current limits bound the cell current, which bounds
+    the power per cell, and the energy bounds the total cell count.  Adding cells in parallel
+    only adds mass, volume and cost, so every larger count is dominated and never evaluated.
+    The remaining candidates are checked with pack_performance and filtered to the Pareto set.
+
+    Params
+    ------
+    des_power : float
+        Design power (W)
+    des_voltage : float
+        Minimum loaded pack voltage (V)
+    energy : float
+        Minimum usable energy (W*h)
+    cells : sequence of dict
+        Cell types, with the keys of DEFAULT_CELL
+    q_l : float
+        Discharge limit
+    max_c_rate : float
+        Maximum cell current, as a multiple of the cell capacity (1/h)
+    max_series, max_parallel : int
+        Largest configurations considered
+    pareto : bool
+        If False, return every candidate instead of only the Pareto set
+
+    Returns
+    -------
+    configs : dict
+        Arrays over the configurations, sorted by mass: cell (index into cells), n_series,
+        n_parallel and the pack_performance outputs
+    """
+    keys = sorted(DEFAULT_CELL)
+    cell = dict((key, np.array([c[key] for c in cells], dtype=float)[:, np.newaxis]) for key in keys)
+    n_series = np.arange(1, max_series + 1, dtype=float)[np.newaxis, :]
+
+    v_oc = end_of_discharge_voltage(cell['q_n'], q_l)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # largest cell current allowed by the current limit, the voltage limit and the peak of
+        # the cell power curve at v_oc/(2*r)
+        i_lim = np.minimum(np.minimum(max_c_rate * cell['q_n'], (v_oc - des_voltage / n_series) / cell['r']),
+                           v_oc / (2.0 * cell['r']))
+        p_lim = i_lim * (v_oc - cell['r'] * i_lim)
+
+        n_parallel = np.maximum(des_power / (n_series * p_lim),
+                                energy / (n_series * cell['e_nom'] * cell['q_n'] * (1.0 - q_l)))
+        n_parallel = np.ceil(n_parallel * (1.0 - 1e-12))
+
+    candidate = (i_lim > 0.0) & np.isfinite(n_parallel) & (n_parallel <= max_parallel)
+    index, n_series, n_parallel = [np.broadcast_to(x, candidate.shape)[candidate]
+                                   for x in (np.arange(len(cells))[:, np.newaxis], n_series, n_parallel)]
+
+    perf = pack_performance(n_series, n_parallel, des_power, q_l=q_l,
+                            **dict((key, cell[key][index, 0]) for key in keys))
+
+    with np.errstate(invalid='ignore'):
+        feasible = (perf['voltage'] >= des_voltage * (1.0 - 1e-9)) & \
+                   (perf['cell_current'] <= max_c_rate * cell['q_n'][index, 0] * (1.0 + 1e-9)) & \
+                   (perf['energy'] >= energy * (1.0 - 1e-9))
+
+    configs = dict((name, val[feasible]) for name, val in perf.items())
+    configs['cell'] = index[feasible]
+    configs['n_series'] = n_series[feasible]
+    configs['n_parallel'] = n_parallel[feasible]
+
+    if pareto and len(configs['cell']):
+        front = pareto_front(np.column_stack((configs['mass'], configs['volume'], configs['cost'])))
+        configs = dict((name, val[front]) for name, val in configs.items())
+
+    order = np.lexsort((configs['cost'], configs['volume'], configs['mass']))
+    return dict((name, val[order]) for name, val in configs.items())
+
+
+class BatteryPack(Component):
+    """
+    Notes
+    ------
+
+    Continuous relaxation of a battery pack of n_series x n_parallel cells.  The cell counts
+    are params, so an optimizer can use them as design variables with constraints on the
+    voltage, cell current and energy outputs; search_pack_configurations then gives the
+    integer configurations near the optimum.
+
+    Params
+    ------
+    n_series : float
+        Cells in series. Default value is 200
+    n_parallel : float
+        Cells in parallel. Default value is 10
+    des_power : float
+        Design power. Default value is 100 kW
+    q_n : float
+        Single cell capacity. Default value is 6.8 A*h
+    r : float
+        Single cell resistance. Default value is .0046 Ohms
+    q_l : float
+        Discharge limit. Default value is .1
+    e_nom : float
+        Cell nominal voltage. Default value is 1.2 V
+    cell_mass : float
+        Mass of a single cell. Default value is 170 g
+    cell_height : float
+        Height of a single cylindrical cell. Default value is 61 mm
+    cell_diameter : float
+        Diameter of a single cylindrical cell. Default value is 33 mm
+    cell_cost : float
+        Cost of a single cell. Default value is 12.95 $
+
+    Returns
+    -------
+    n_cells : float
+        Total number of cells
+    cell_current : float
+        Cell current at the design power at the end of the usable discharge
+    voltage : float
+        Loaded pack voltage at the design power at the end of the usable discharge
+    energy : float
+        Usable energy of the pack
+    battery_mass : float
+        Total mass of cells
+    battery_volume : float
+        Total volume of cells, with hexagonal packing
+    battery_cost : float
+        Total cost of cells
+    """
+
+    def __init__(self):
+        super(BatteryPack, self).__init__()
+
+        self.deriv_options['type'] = 'user'
+
+        self.add_param('n_series', val=200.0, desc='cells in series')
+        self.add_param('n_parallel', val=10.0, desc='cells in parallel')
+        self.add_param('des_power', val=1.0e5, desc='design power', units='W')
+        self.add_param('q_n', val=6.8, desc='single cell capacity', units='A*h')
+        self.add_param('r', val=0.0046, desc='single cell resistance', units='ohm')
+        self.add_param('q_l', val=0.1, desc='discharge limit')
+        self.add_param('e_nom', val=1.2, desc='cell nominal voltage', units='V')
+        self.add_param('cell_mass', val=170.0, desc='mass of a single cell', units='g')
+        self.add_param('cell_height', val=61.0, desc='height of a single cylindrical cell', units='mm')
+        self.add_param('cell_diameter', val=33.0, desc='diameter of a single cylindrical cell', units='mm')
+        self.add_param('cell_cost', val=12.95, desc='cost of a single cell')
+
+        self.add_output('n_cells', val=1.0, desc='total number of cells')
+        self.add_output('cell_current', val=1.0, desc='cell current at design power', units='A')
+        self.add_output('voltage', val=1.0, desc='loaded pack voltage at design power', units='V')
+        self.add_output('energy', val=1.0, desc='usable energy', units='W*h')
+        self.add_output('battery_mass', val=1.0, desc='total mass of cells', units='kg')
+        self.add_output('battery_volume', val=1.0, desc='total volume of cells', units='cm**3')
+        self.add_output('battery_cost', val=1.0, desc='total cost of cells')
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        perf = pack_performance(params['n_series'], params['n_parallel'], params['des_power'],
+                                params['q_n'], params['r'], params['q_l'], params['e_nom'],
+                                params['cell_mass'], params['cell_height'], params['cell_diameter'],
+                                params['cell_cost'])
+
+        unknowns['n_cells'] = perf['n_cells']
+        unknowns['cell_current'] = perf['cell_current']
+        unknowns['voltage'] = perf['voltage']
+        unknowns['energy'] = perf['energy']
+        unknowns['battery_mass'] = perf['mass']
+        unknowns['battery_volume'] = perf['volume']
+        unknowns['battery_cost'] = perf['cost']
+
+    def linearize(self, params, unknowns, resids):
+        n_s = params['n_series']
+        n_p = params['n_parallel']
+        P = params['des_power']
+        q_n = params['q_n']
+        r = params['r']
+        q_l = params['q_l']
+        e_nom = params['e_nom']
+        n = n_s * n_p
+
+        x = np.exp(-B_EXP * q_n * (1.0 - q_l))
+        v_oc = E_0 - K_POL / q_l + A_EXP * x
+        p = P / n
+        s = np.sqrt(v_oc**2 - 4.0 * r * p)
+        i = (v_oc - s) / (2.0 * r)
+
+        # partials of the end of discharge voltage, the cell power and the cell current
+        dv = {'q_n': -A_EXP * B_EXP * (1.0 - q_l) * x,
+              'q_l': K_POL / q_l**2 + A_EXP * B_EXP * q_n * x}
+        dp = {'n_series': -p / n_s, 'n_parallel': -p / n_p, 'des_power': 1.0 / n}
+        di_dv = (1.0 - v_oc / s) / (2.0 * r)
+        di_dp = 1.0 / s
+        di = dict((name, di_dp * val) for name, val in dp.items())
+        di.update((name, di_dv * val) for name, val in dv.items())
+        di['r'] = p / (r * s) - i / r
+
+        dn = {'n_series': n_p, 'n_parallel': n_s}
+
+        J = {}
+        for name, val in di.items():
+            J['cell_current', name] = val
+            J['voltage', name] = n_s * (dv.get(name, 0.0) - r * val)
+        J['voltage', 'n_series'] += v_oc - r * i
+        J['voltage', 'r'] -= n_s * i
+
+        area = np.pi * (params['cell_diameter'] / 2.0)**2
+        for name, val in dn.items():
+            J['n_cells', name] = val
+            J['energy', name] = val * e_nom * q_n * (1.0 - q_l)
+            J['battery_mass', name] = val * params['cell_mass'] / 1000.0
+            J['battery_volume', name] = val * params['cell_height'] * area / 0.9069 / 1000.0
+            J['battery_cost', name] = val * params['cell_cost']
+
+        J['energy', 'e_nom'] = n * q_n * (1.0 - q_l)
+        J['energy', 'q_n'] = n * e_nom * (1.0 - q_l)
+        J['energy', 'q_l'] = -n * e_nom * q_n
+        J['battery_mass', 'cell_mass'] = n / 1000.0
+        J['battery_volume', 'cell_height'] = n * area / 0.9069 / 1000.0
+        J['battery_volume', 'cell_diameter'] = n * params['cell_height'] * np.pi * \
+            params['cell_diameter'] / 2.0 / 0.9069 / 1000.0
+        J['battery_cost', 'cell_cost'] = n
+        return J
+
+
+if __name__ == '__main__':
+    # the Battery default cell and a smaller, lighter but more expensive cell of the same chemistry
+    cells = (DEFAULT_CELL,
+             dict(DEFAULT_CELL, q_n=4.5, r=0.006, cell_mass=95.0, cell_height=50.0,
+                  cell_diameter=26.0, cell_cost=11.0))
+
+    configs = search_pack_configurations(400e3, 300.0, 25e3, cells=cells)
+
+    print('Pareto set (cell, n_series, n_parallel, mass kg, volume cm**3, cost $):')
+    for row in zip(configs['cell'], configs['n_series'], configs['n_parallel'],
+                   configs['mass'], configs['volume'], configs['cost']):
+        print('%d %5d %4d %10.1f %12.1f %10.1f' % row)
+
+    prob = Problem()
+    prob.root = Group()
+    prob.root.add('pack', BatteryPack())
+    prob.setup()
+    prob['pack.des_power'] = 400e3
+    prob['pack.n_series'] = configs['n_series'][0]
+    prob['pack.n_parallel'] = configs['n_parallel'][0]
+    prob.run()
+
+    print('Loaded voltage: %f V' % prob['pack.voltage'])
+    print('Cell current: %f A' % prob['pack.cell_current'])
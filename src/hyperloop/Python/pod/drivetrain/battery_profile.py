@@ -0,0 +1,326 @@
+"""
+Battery discharge over a mission load profile.
+Battery sizes the pack at a single design current.  discharge_profile instead integrates the
+cell discharge over the per-node current (or power) history of a mission with a cumulative
+trapezoid, and evaluates the Shepherd voltage curve of Battery, the state of charge and the
+I**2*R heating at every node.  It broadcasts over leading dimensions, so a whole set of pack
+configurations can be evaluated against thousands of nodes in one call.
+
+BatteryProfile wraps the current driven case in a component with analytic derivatives.
+"""
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import Component, Problem, Group
+
+from hyperloop.Python.pod.drivetrain.battery import A_EXP, B_EXP, K_POL, E_0
+from hyperloop.Python.tools.integrate import cumulative_trapezoid
+
+V_FULL = E_0 - K_POL + A_EXP  # open circuit voltage of a fully charged cell (V)
+
+
+def cell_voltage(q, i, q_n=6.8, r=0.0046):
+    """Shepherd terminal voltage of a cell (V) after a discharge of q (A*h) at current i (A)"""
+    return E_0 - K_POL * q_n / (q_n - q) + A_EXP * np.exp(-B_EXP * q) - r * i
+
+
+def discharge_profile(time, n_series, n_parallel, current=None, power=None, q_n=6.8, r=0.0046,
+                      q_l=0.1, tol=1e-9, maxiter=50):
+    """
+    Discharge, voltage and heating of a battery pack over a load profile.
+
+    The pack is n_series strings in series of n_parallel cells in parallel.  Given the pack
+    power instead of the current, the current at every node depends on the voltage, which
+    depends on the discharge up to that node; the whole profile is solved at once by fixed
+    point iteration on the cell current.
+
+    Params
+    ------
+    time : array
+        Node times (s), shape (..., num_nodes)
+    n_series, n_parallel : float or array
+        Pack configuration.  Broadcast against the leading dimensions of the load, e.g. with
+        shape (num_configs, 1) to evaluate many configurations on one profile
+    current : array
+        Pack current at each node (A)
+    power : array
+        Pack power at each node (W). Used when current is None
+    q_n : float
+        Single cell capacity (A*h)
+    r : float
+        Resistance of a single cell (Ohms)
+    q_l : float
+        Discharge limit, as a fraction of the cell capacity that is not usable
+
+    Returns
+    -------
+    profile : dict
+        Arrays with the broadcast shape of the load and configuration:
+        current (A), cell_current (A), discharge (cell A*h), soc, cell_voltage (V),
+        voltage (pack V), voltage_sag (pack voltage below fully charged open circuit, V),
+        heat_rate (I**2*R, W), heat (J) and energy (J) drawn so far.
+        min_soc, min_voltage and feasible (the discharge stays within the limit and the
+        voltage stays positive) have the shape of the leading dimensions
+    """
+    n_series = np.asarray(n_series, dtype=float)
+    n_parallel = np.asarray(n_parallel, dtype=float)
+    n_cells = n_series * n_parallel
+
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        if current is not None:
+            i = np.asarray(current, dtype=float) / n_parallel
+            q = cumulative_trapezoid(i, time) / 3600.0
+            v = cell_voltage(q, i, q_n, r)
+        elif power is not None:
+            power = np.asarray(power, dtype=float)
+            v = V_FULL
+            i = power / (n_cells * v)
+            for _ in range(maxiter):
+                q = cumulative_trapezoid(i, time) / 3600.0
+                v = cell_voltage(q, i, q_n, r)
+                i_new = power / (n_cells * v)
+                converged = np.all(np.abs(i_new - i) <= tol * np.maximum(np.abs(i_new), 1.0))
+                i = i_new
+                if converged:
+                    break
+            q = cumulative_trapezoid(i, time) / 3600.0
+            v = cell_voltage(q, i, q_n, r)
+        else:
+            raise ValueError('discharge_profile needs either current or power')
+
+        voltage = n_series * v
+        pack_current = i * n_parallel
+        heat_rate = n_cells * r * i**2
+
+    feasible = np.all(np.isfinite(v) & (v > 0.0), axis=-1) & (q[..., -1] <= q_n * (1.0 - q_l))
+
+    return {'current': pack_current,
+            'cell_current': i,
+            'discharge': q,
+            'soc': 1.0 - q / q_n,
+            'cell_voltage': v,
+            'voltage': voltage,
+            'voltage_sag': n_series * V_FULL - voltage,
+            'heat_rate': heat_rate,
+            'heat': cumulative_trapezoid(heat_rate, time),
+            'energy': cumulative_trapezoid(voltage * pack_current, time),
+            'min_soc': 1.0 - q.max(axis=-1) / q_n,
+            'min_voltage': voltage.min(axis=-1),
+            'feasible': feasible}
+
+
+def _trapezoid_fwd(t, y, dt, dy):
+    """Directional derivative of cumulative_trapezoid(y, t) along (dt, dy)"""
+    out = cumulative_trapezoid(dy, t)
+    out[1:] += np.cumsum(0.5 * (y[1:] + y[:-1]) * np.diff(dt))
+    return out
+
+
+def _trapezoid_rev(t, y, bar):
+    """Transpose of _trapezoid_fwd: the (t, y) seeds of a seed bar on cumulative_trapezoid(y, t)"""
+    # seed summed over the nodes after each interval
+    after = np.cumsum(bar[::-1])[::-1][1:]
+
+    y_bar = np.zeros(len(t))
+    y_bar[:-1] += 0.5 * np.diff(t) * after
+    y_bar[1:] += 0.5 * np.diff(t) * after
+
+    t_bar = np.zeros(len(t))
+    a = 0.5 * (y[1:] + y[:-1]) * after
+    t_bar[1:] += a
+    t_bar[:-1] -= a
+    return t_bar, y_bar
+
+
+def _last(n, val):
+    """Seed val on the last of n nodes"""
+    bar = np.zeros(n)
+    bar[-1] = val
+    return bar
+
+
+class BatteryProfile(Component):
+    """
+    Notes
+    ------
+
+    Battery pack discharge over a mission current profile at num_nodes nodes.  The cell
+    discharge is the cumulative trapezoid integral of the cell current, and the voltage follows
+    the Shepherd curve of Battery at every node.
+
+    Params
+    ------
+    time : array
+        Node times. Default value is 0 to 600 s
+    current : array
+        Pack current at each node. Default value is 100 A
+    n_series : float
+        Number of cells in series. Default value is 300
+    n_parallel : float
+        Number of cells in parallel. Default value is 20
+    q_n : float
+        Single cell capacity. Default value is 6.8 A*h
+    r : float
+        Resistance of a single cell. Default value is .0046 Ohms
+
+    Returns
+    -------
+    soc : array
+        State of charge at each node
+    voltage : array
+        Pack terminal voltage at each node
+    voltage_sag : array
+        Pack voltage below the fully charged open circuit voltage at each node
+    heat_rate : array
+        I**2*R heating of the pack at each node
+    heat : float
+        Heat generated over the profile
+    energy : float
+        Electrical energy drawn over the profile
+
+    Args
+    ----
+    num_nodes : int
+        Number of nodes of the profile, at least 2
+    """
+
+    def __init__(self, num_nodes=11):
+        super(BatteryProfile, self).__init__()
+
+        self.deriv_options['type'] = 'user'
+
+        self.num_nodes = nn = num_nodes
+
+        self.add_param('time', val=np.linspace(0.0, 600.0, nn), units='s', desc='node times')
+        self.add_param('current', val=100.0 * np.ones(nn), units='A', desc='pack current')
+        self.add_param('n_series', val=300.0, desc='number of cells in series')
+        self.add_param('n_parallel', val=20.0, desc='number of cells in parallel')
+        self.add_param('q_n', val=6.8, units='A*h', desc='single cell capacity')
+        self.add_param('r', val=0.0046, units='ohm', desc='single cell resistance')
+
+        self.add_output('soc', val=np.ones(nn), desc='state of charge')
+        self.add_output('voltage', val=np.ones(nn), units='V', desc='pack voltage')
+        self.add_output('voltage_sag', val=np.zeros(nn), units='V', desc='pack voltage sag')
+        self.add_output('heat_rate', val=np.zeros(nn), units='W', desc='I**2*R heating')
+        self.add_output('heat', val=0.0, units='J', desc='heat generated over the profile')
+        self.add_output('energy', val=0.0, units='J', desc='energy drawn over the profile')
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        profile = discharge_profile(params['time'], params['n_series'], params['n_parallel'],
+                                    current=params['current'], q_n=params['q_n'], r=params['r'])
+
+        unknowns['soc'] = profile['soc']
+        unknowns['voltage'] = profile['voltage']
+        unknowns['voltage_sag'] = profile['voltage_sag']
+        unknowns['heat_rate'] = profile['heat_rate']
+        unknowns['heat'] = profile['heat'][-1]
+        unknowns['energy'] = profile['energy'][-1]
+
+    def linearize(self, params, unknowns, resids):
+        # the discharge at a node depends on the current at every node before it, so the
+        # partials are applied matrix-free in apply_linear, in O(num_nodes)
+        t = params['time']
+        I = params['current']
+        n_s = params['n_series']
+        n_p = params['n_parallel']
+        q_n = params['q_n']
+        r = params['r']
+
+        i = I / n_p
+        q = cumulative_trapezoid(I, t) / (3600.0 * n_p)
+        v = cell_voltage(q, i, q_n, r)
+
+        self._lin = {'t': t, 'I': I, 'n_s': n_s, 'n_p': n_p, 'q_n': q_n, 'r': r, 'i': i, 'q': q, 'v': v,
+                     'V': n_s * v,
+                     'heat_rate': n_s * r * I**2 / n_p,
+                     'dv_dq': -K_POL * q_n / (q_n - q)**2 - A_EXP * B_EXP * np.exp(-B_EXP * q),
+                     'dv_dqn': K_POL * q / (q_n - q)**2}
+        return {}
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        lin = self._lin
+        t, I, n_s, n_p, q_n, r = (lin[name] for name in ('t', 'I', 'n_s', 'n_p', 'q_n', 'r'))
+        i, q, v, V, heat_rate = (lin[name] for name in ('i', 'q', 'v', 'V', 'heat_rate'))
+        dv_dq, dv_dqn = lin['dv_dq'], lin['dv_dqn']
+        n = len(t)
+
+        if mode == 'fwd':
+            d = dict((name, dparams[name] if name in dparams else 0.0)
+                     for name in ('time', 'current', 'n_series', 'n_parallel', 'q_n', 'r'))
+            dt = d['time'] * np.ones(n)
+            dI = d['current'] * np.ones(n)
+
+            dq = _trapezoid_fwd(t, I, dt, dI) / (3600.0 * n_p) - q / n_p * d['n_parallel']
+            dv = dv_dq * dq - r / n_p * dI + r * i / n_p * d['n_parallel'] + dv_dqn * d['q_n'] - i * d['r']
+            dV = n_s * dv + v * d['n_series']
+            dh = heat_rate * (d['n_series'] / n_s + d['r'] / r - d['n_parallel'] / n_p) + \
+                2.0 * n_s * r * I / n_p * dI
+
+            out = {'soc': -dq / q_n + q / q_n**2 * d['q_n'],
+                   'voltage': dV,
+                   'voltage_sag': (V_FULL - v) * d['n_series'] - n_s * dv,
+                   'heat_rate': dh,
+                   'heat': _trapezoid_fwd(t, heat_rate, dt, dh)[-1],
+                   'energy': _trapezoid_fwd(t, V * I, dt, I * dV + V * dI)[-1]}
+            for name, val in out.items():
+                if name in dresids:
+                    dresids[name] += val
+
+        else:
+            b = dict((name, dresids[name] if name in dresids else np.zeros(n))
+                     for name in ('soc', 'voltage', 'voltage_sag', 'heat_rate'))
+            heat_bar = dresids['heat'] if 'heat' in dresids else 0.0
+            energy_bar = dresids['energy'] if 'energy' in dresids else 0.0
+
+            t_bar, P_bar = _trapezoid_rev(t, V * I, _last(n, energy_bar))
+            V_bar = b['voltage'] + P_bar * I
+            I_bar = P_bar * V
+
+            dt_heat, h_bar = _trapezoid_rev(t, heat_rate, _last(n, heat_bar))
+            t_bar += dt_heat
+            h_bar = h_bar + b['heat_rate']
+            I_bar += 2.0 * n_s * r * I / n_p * h_bar
+            h_sum = np.sum(h_bar * heat_rate)
+
+            v_bar = n_s * (V_bar - b['voltage_sag'])
+            q_bar = dv_dq * v_bar - b['soc'] / q_n
+            I_bar -= r / n_p * v_bar
+
+            dt_q, dI_q = _trapezoid_rev(t, I, q_bar / (3600.0 * n_p))
+            t_bar += dt_q
+            I_bar += dI_q
+
+            bars = {'time': t_bar,
+                    'current': I_bar,
+                    'n_series': h_sum / n_s + np.sum(V_bar * v) + np.sum(b['voltage_sag'] * (V_FULL - v)),
+                    'n_parallel': -h_sum / n_p + np.sum(v_bar * r * i) / n_p - np.sum(q_bar * q) / n_p,
+                    'q_n': np.sum(b['soc'] * q) / q_n**2 + np.sum(v_bar * dv_dqn),
+                    'r': h_sum / r - np.sum(v_bar * i)}
+            for name, val in bars.items():
+                if name in dparams:
+                    dparams[name] += val
+
+if __name__ == '__main__':
+    # a 10 minute run: accelerate, cruise and brake
+    time = np.linspace(0.0, 600.0, 2001)
+    power = np.interp(time, [0.0, 60.0, 540.0, 600.0], [400e3, 150e3, 150e3, 0.0])
+
+    n_series = np.array([250.0, 300.0, 350.0])[:, np.newaxis]
+    n_parallel = np.array([10.0, 20.0, 30.0, 40.0])[:, np.newaxis, np.newaxis]
+    profile = discharge_profile(time, n_series, n_parallel, power=power)
+
+    print('feasible configurations (n_parallel x n_series):')
+    print(profile['feasible'])
+    print('minimum state of charge:')
+    print(profile['min_soc'])
+
+    prob = Problem()
+    prob.root = Group()
+    prob.root.add('battery', BatteryProfile(num_nodes=len(time)))
+    prob.setup()
+    prob['battery.time'] = time
+    prob['battery.current'] = profile['current'][1, 1]
+    prob.run()
+
+    print('Final state of charge: %f' % prob['battery.soc'][-1])
+    print('Heat generated: %f J' % prob['battery.heat'])
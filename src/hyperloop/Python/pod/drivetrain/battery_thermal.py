@@ -0,0 +1,319 @@
+"""
+Lumped parameter thermal model of a battery pack.
+Every cell of a pack carries the same current, so the pack is represented by one cell with
+heat capacity m*cp, heated by its I**2*R loss and cooled by convection h*A to the ambient:
+
+    m*cp*dT/dt = i**2*r - h*A*(T - T_amb) - q_cool
+
+With the heat rate averaged over each interval between nodes this is integrated exactly by
+the exponential integrator
+
+    T_k+1 - T_amb = a_k*(T_k - T_amb) + R*(1 - a_k)*(q_k - q_cool),   a_k = exp(-dt_k/tau)
+
+with thermal resistance R = 1/(h*A) and time constant tau = m*cp*R.  The recurrence has a
+closed form evaluated with cumulative sums, so whole temperature histories of many pack
+configurations are computed at once without a loop over the nodes.
+
+The constant cooling power that holds the peak temperature to T_max follows from the
+linearity of the model in q_cool.
+"""
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import Component, Problem, Group
+
+# largest exponent used in the closed form before the integration is restarted
+_MAX_EXPONENT = 30.0
+
+
+def thermal_properties(cell_mass=170.0, cell_cp=1000.0, h=10.0, cell_height=61.0, cell_diameter=33.0):
+    """
+    Thermal resistance (K/W) and time constant (s) of a cylindrical cell cooled over its
+    lateral surface.  cell_mass in g, cell_cp in J/(kg*K), h in W/(m**2*K), sizes in mm.
+    """
+    area = np.pi * cell_diameter * cell_height * 1e-6
+    R = 1.0 / (h * area)
+    return R, cell_mass * 1e-3 * cell_cp * R
+
+
+def _exponential_integral(time, heat_rate, R, tau, x0):
+    # closed form of x_k+1 = a_k*x_k + R*(1 - a_k)*qbar_k, restarted every _MAX_EXPONENT
+    # time constants so the growing exponentials stay finite
+    qbar = 0.5 * (heat_rate[..., 1:] + heat_rate[..., :-1])
+    x = np.zeros(np.broadcast(heat_rate, R, tau, x0).shape)
+
+    block = np.floor((time - time[0]) / (_MAX_EXPONENT * np.min(tau))).astype(int)
+    bounds = [0] + list(np.flatnonzero(np.diff(block)) + 1) + [len(time) - 1]
+
+    x_s = x0 * np.ones(x.shape[:-1] + (1, ))
+    x[..., :1] = x_s
+    for s, e in zip(bounds[:-1], bounds[1:]):
+        if e <= s:
+            continue
+        g = np.exp((time[s:e + 1] - time[s]) / tau)
+        inc = R * qbar[..., s:e] * (g[..., 1:] - g[..., :-1])
+        x[..., s + 1:e + 1] = (x_s + np.cumsum(inc, axis=-1)) / g[..., 1:]
+        x_s = x[..., e:e + 1]
+    return x
+
+
+def pack_temperature(time, current, n_series, n_parallel, r=0.0046, cell_mass=170.0, cell_cp=1000.0,
+                     h=10.0, cell_height=61.0, cell_diameter=33.0, T_amb=293.15, T_0=None, T_max=333.15):
+    """
+    Cell temperature history of battery packs over a current profile.
+
+    Params
+    ------
+    time : array
+        Node times (s), shape (num_nodes, )
+    current : array
+        Pack current at each node (A), shape (..., num_nodes)
+    n_series, n_parallel : float or array
+        Pack configuration. Broadcast against current, e.g. with shape (num_configs, 1) to
+        evaluate many configurations on one profile
+    r : float or array
+        Single cell resistance (Ohms)
+    cell_mass, cell_cp : float or array
+        Cell mass (g) and specific heat (J/(kg*K))
+    h : float or array
+        Convection coefficient to the ambient over the cell lateral surface (W/(m**2*K))
+    cell_height, cell_diameter : float or array
+        Cell size (mm)
+    T_amb : float
+        Ambient temperature (K)
+    T_0 : float
+        Initial cell temperature (K). Default is T_amb
+    T_max : float
+        Maximum allowed cell temperature (K)
+
+    Returns
+    -------
+    thermal : dict
+        temperature (K) and cell heat_rate (W) at every node, and with the last axis reduced,
+        peak_temperature (K), cooling_power (constant pack cooling power that keeps the cells
+        under T_max, W) and cooling_energy (J)
+    """
+    time = np.asarray(time, dtype=float)
+    T_0 = T_amb if T_0 is None else T_0
+    R, tau = thermal_properties(cell_mass, cell_cp, h, cell_height, cell_diameter)
+
+    heat_rate = r * (np.asarray(current, dtype=float) / n_parallel)**2
+    temperature = T_amb + _exponential_integral(time, heat_rate, R, tau, T_0 - T_amb)
+    temperature = temperature * np.ones(np.broadcast(temperature, n_series * n_parallel).shape)
+
+    # the response to a constant cooling power q_cool per cell is -q_cool*R*(1 - exp(-t/tau))
+    response = R * (1.0 - np.exp(-(time[1:] - time[0]) / tau))
+    q_cool = np.maximum(((temperature[..., 1:] - T_max) / response).max(axis=-1), 0.0)
+    n_cells = (n_series * n_parallel * np.ones(temperature.shape))[..., 0]
+    cooling_power = q_cool * n_cells
+
+    return {'temperature': temperature,
+            'heat_rate': heat_rate * np.ones(temperature.shape),
+            'peak_temperature': temperature.max(axis=-1),
+            'cooling_power': cooling_power,
+            'cooling_energy': cooling_power * (time[-1] - time[0])}
+
+
+class BatteryThermal(Component):
+    """
+    Notes
+    ------
+
+    Lumped parameter thermal model of a battery pack over a current profile at num_nodes
+    nodes.  The cell temperature is integrated exactly for a heat rate that is the average of
+    the I**2*R loss at the ends of each interval.  The peak temperature and cooling power are
+    maxima over the nodes; their derivatives are those of the active node.
+
+    Params
+    ------
+    time : array
+        Node times. Default value is 0 to 2100 s
+    current : array
+        Pack current at each node. Default value is 400 A
+    n_series : float
+        Number of cells in series. Default value is 300
+    n_parallel : float
+        Number of cells in parallel. Default value is 20
+    r : float
+        Single cell resistance. Default value is .0046 Ohms
+    h : float
+        Convection coefficient over the cell lateral surface. Default value is 10 W/(m**2*K)
+    cell_mass : float
+        Mass of a single cell. Default value is 170 g
+    cell_cp : float
+        Specific heat of a cell. Default value is 1000 J/(kg*K)
+    T_amb : float
+        Ambient temperature. Default value is 293.15 K
+    T_0 : float
+        Initial cell temperature. Default value is 293.15 K
+    T_max : float
+        Maximum allowed cell temperature. Default value is 333.15 K
+
+    Returns
+    -------
+    temperature : array
+        Cell temperature at each node
+    peak_temperature : float
+        Peak cell temperature
+    cooling_power : float
+        Constant pack cooling power needed to keep the cells under T_max
+
+    Args
+    ----
+    num_nodes : int
+        Number of nodes of the profile
+    cell_height, cell_diameter : float
+        Cell size, mm
+    """
+
+    def __init__(self, num_nodes=11, cell_height=61.0, cell_diameter=33.0):
+        super(BatteryThermal, self).__init__()
+
+        self.deriv_options['type'] = 'user'
+
+        self.num_nodes = nn = num_nodes
+        self.cell_height = cell_height
+        self.cell_diameter = cell_diameter
+        self.area = np.pi * cell_diameter * cell_height * 1e-6
+
+        self.add_param('time', val=np.linspace(0.0, 2100.0, nn), units='s', desc='node times')
+        self.add_param('current', val=400.0 * np.ones(nn), units='A', desc='pack current')
+        self.add_param('n_series', val=300.0, desc='number of cells in series')
+        self.add_param('n_parallel', val=20.0, desc='number of cells in parallel')
+        self.add_param('r', val=0.0046, units='ohm', desc='single cell resistance')
+        self.add_param('h', val=10.0, units='W/(m**2*K)', desc='convection coefficient')
+        self.add_param('cell_mass', val=170.0, units='g', desc='mass of a single cell')
+        self.add_param('cell_cp', val=1000.0, units='J/(kg*K)', desc='specific heat of a cell')
+        self.add_param('T_amb', val=293.15, units='K', desc='ambient temperature')
+        self.add_param('T_0', val=293.15, units='K', desc='initial cell temperature')
+        self.add_param('T_max', val=333.15, units='K', desc='maximum cell temperature')
+
+        self.add_output('temperature', val=293.15 * np.ones(nn), units='K', desc='cell temperature')
+        self.add_output('peak_temperature', val=293.15, units='K', desc='peak cell temperature')
+        self.add_output('cooling_power', val=0.0, units='W', desc='pack cooling power')
+
+    def _matrices(self, params):
+        # E[n, m] = exp(-(t_n - t_m)/tau) for m <= n, so T - T_amb = E[:, 0]*x0 + R*G.dot(qbar)
+        t = params['time']
+        R = 1.0 / (params['h'] * self.area)
+        tau = params['cell_mass'] * 1e-3 * params['cell_cp'] * R
+        dt = t[:, np.newaxis] - t[np.newaxis, :]
+        lower = np.tril(np.ones((len(t), len(t))))
+        E = np.exp(-np.maximum(dt, 0.0) / tau) * lower
+        # interval k contributes to node n only for k < n
+        G = (E[:, 1:] - E[:, :-1]) * lower[:, 1:]
+        return t, R, tau, dt * lower, E, G
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        thermal = pack_temperature(params['time'], params['current'], params['n_series'],
+                                   params['n_parallel'], params['r'], params['cell_mass'],
+                                   params['cell_cp'], params['h'], T_amb=params['T_amb'],
+                                   T_0=params['T_0'], T_max=params['T_max'],
+                                   cell_height=self.cell_height, cell_diameter=self.cell_diameter)
+
+        unknowns['temperature'] = thermal['temperature']
+        unknowns['peak_temperature'] = thermal['peak_temperature']
+        unknowns['cooling_power'] = thermal['cooling_power']
+
+    def linearize(self, params, unknowns, resids):
+        t, R, tau, dt, E, G = self._matrices(params)
+        lower = np.tril(np.ones(E.shape))
+        I = params['current']
+        n_s = params['n_series']
+        n_p = params['n_parallel']
+        r = params['r']
+        x0 = params['T_0'] - params['T_amb']
+        nn = len(t)
+
+        q = r * (I / n_p)**2
+        qbar = 0.5 * (q[1:] + q[:-1])
+        x = unknowns['temperature'] - params['T_amb']
+
+        # partials of the temperature rise x
+        dq_dI = 2.0 * r * I / n_p**2
+        dx = {}
+        dx['current'] = np.zeros((nn, nn))
+        dx['current'][:, 1:] += 0.5 * R * G * dq_dI[1:]
+        dx['current'][:, :-1] += 0.5 * R * G * dq_dI[:-1]
+        dx['r'] = R * G.dot(qbar) / r
+        dx['n_parallel'] = -2.0 * R * G.dot(qbar) / n_p
+        dx['T_0'] = E[:, 0]
+
+        dx_dtime = -np.diag(x) / tau
+        dx_dtime[:, 0] += x0 * E[:, 0] / tau
+        dx_dtime[:, 1:] += R * E[:, 1:] * qbar / tau
+        dx_dtime[:, :-1] -= R * E[:, :-1] * lower[:, 1:] * qbar / tau
+        dx['time'] = dx_dtime
+
+        dx_dR = G.dot(qbar)
+        dEdt = E * dt / tau**2
+        dx_dtau = x0 * dEdt[:, 0] + R * (dEdt[:, 1:] - dEdt[:, :-1]).dot(qbar)
+
+        # R = 1/(h*A) and tau = m*cp*R
+        dx['h'] = -(dx_dR * R + dx_dtau * tau) / params['h']
+        dx['cell_mass'] = dx_dtau * tau / params['cell_mass']
+        dx['cell_cp'] = dx_dtau * tau / params['cell_cp']
+
+        J = {}
+        for name, val in dx.items():
+            J['temperature', name] = val
+        J['temperature', 'T_amb'] = 1.0 - E[:, 0]
+
+        k = np.argmax(x)
+        for name, val in dx.items():
+            J['peak_temperature', name] = val[k:k + 1] if np.ndim(val) == 2 else val[k]
+        J['peak_temperature', 'T_amb'] = 1.0 - E[k, 0]
+
+        # cooling power n_cells*(T_n - T_max)/D_n at the active node, D_n = R*(1 - E[n, 0])
+        D = R * (1.0 - E[1:, 0])
+        ratio = (unknowns['temperature'][1:] - params['T_max']) / D
+        n = np.argmax(ratio) + 1
+        q_cool = ratio[n - 1]
+        if q_cool > 0.0:
+            dD = {'time': np.zeros(nn), 'h': 0.0, 'cell_mass': 0.0, 'cell_cp': 0.0}
+            dD['time'][n] = R * E[n, 0] / tau
+            dD['time'][0] = -R * E[n, 0] / tau
+            dD_dtau = -R * E[n, 0] * dt[n, 0] / tau**2
+            dD['h'] = -((1.0 - E[n, 0]) * R + dD_dtau * tau) / params['h']
+            dD['cell_mass'] = dD_dtau * tau / params['cell_mass']
+            dD['cell_cp'] = dD_dtau * tau / params['cell_cp']
+
+            n_cells = n_s * n_p
+            D_n = D[n - 1]
+            for name, val in dx.items():
+                dT = val[n:n + 1] if np.ndim(val) == 2 else val[n]
+                J['cooling_power', name] = n_cells * (dT - q_cool * dD.get(name, 0.0)) / D_n
+            J['cooling_power', 'T_amb'] = n_cells * (1.0 - E[n, 0]) / D_n
+            J['cooling_power', 'T_max'] = -n_cells / D_n
+            J['cooling_power', 'n_series'] = n_p * q_cool
+            J['cooling_power', 'n_parallel'] = J['cooling_power', 'n_parallel'] + n_s * q_cool
+        else:
+            for name in ('time', 'current'):
+                J['cooling_power', name] = np.zeros((1, nn))
+
+        return J
+
+
+if __name__ == '__main__':
+    # 35 minute trip: accelerate, cruise and brake, for 3 x 4 pack configurations
+    time = np.linspace(0.0, 2100.0, 3001)
+    current = np.interp(time, [0.0, 120.0, 1980.0, 2100.0], [1200.0, 420.0, 420.0, 0.0])
+    n_series = np.array([250.0, 300.0, 350.0])[:, np.newaxis]
+    n_parallel = np.array([10.0, 20.0, 30.0, 40.0])[:, np.newaxis, np.newaxis]
+
+    thermal = pack_temperature(time, current, n_series, n_parallel)
+    print('peak temperature, K (n_parallel x n_series):')
+    print(thermal['peak_temperature'])
+    print('cooling power, W:')
+    print(thermal['cooling_power'])
+
+    prob = Problem()
+    prob.root = Group()
+    prob.root.add('thermal', BatteryThermal(num_nodes=len(time)))
+    prob.setup()
+    prob['thermal.time'] = time
+    prob['thermal.current'] = current
+    prob.run()
+
+    print('Peak temperature: %f K' % prob['thermal.peak_temperature'])
+    print('Cooling power: %f W' % prob['thermal.cooling_power'])
@@ -1,10 +1,11 @@
 import numpy as np
 from hyperloop.Python.pod.drivetrain.battery import Battery
 from hyperloop.Python.pod.drivetrain.inverter import Inverter
-from openmdao.api import Group, NLGaussSeidel, \
+from openmdao.api import Group, RunOnce, \
     ScipyGMRES, Problem, SqliteRecorder
 
-from hyperloop.Python.pod.drivetrain.electric_motor import Motor
+from hyperloop.Python.pod.drivetrain.electric_motor import MotorGroup
+from hyperloop.Python.tools.solvers import AitkenGaussSeidel, RecordedNewton
 from sqlitedict import SqliteDict
 
 # from openmdao.api.PP import PetscKSP.
@@ -20,8 +21,8 @@ class Drivetrain(Group):
 
     Components
     ----------
-    Motor : ElectricMotor
-        Represents a BLDC electric motor
+    Motor : MotorGroup
+        Represents a BLDC electric motor, sized and balanced for its no load current
     Inverter : Inverter
         Represents an Inverter
     Battery : Battery
@@ -32,12 +33,30 @@ class Drivetrain(Group):
     .. [1] Gladin, Ali, Collins, "Conceptual Modeling of Electric and Hybrid-Electric Propulsion for UAS Applications"
        Georgia Tech, 2015
 
+    Args
+    ----
+    solver : str
+        Coupling solver. 'gauss_seidel' (default) or 'aitken' use Gauss-Seidel, without or
+        with Aitken relaxation, with the motor no load current balance solved inside the
+        motor group by Newton.  'newton' converges the whole drivetrain, including the
+        motor balance, with one Newton solve using the analytic partials.
+    atol : float
+        Absolute tolerance on the residual norm of the coupling solver. Default is 0.1
+        for Gauss-Seidel and 5e-5, the tolerance of the motor balance, for Newton
+    maxiter : int
+        Maximum number of coupling iterations
+
+    Attributes
+    ----------
+    history : ConvergenceHistory
+        Iteration count, residual norm and wall time of every iteration of the coupling
+        solver, one record per solve
     """
 
-    def __init__(self):
+    def __init__(self, solver='gauss_seidel', atol=None, maxiter=200):
         super(Drivetrain, self).__init__()
 
-        self.add('motor', Motor(), promotes=['speed', 'design_power', 'max_rpm'])
+        motor = self.add('motor', MotorGroup(), promotes=['speed', 'design_power', 'max_rpm'])
         self.add('inverter', Inverter())
         self.add('battery', Battery(), promotes=['des_time', 'time_of_flight'])
 
@@ -57,9 +76,19 @@ class Drivetrain(Group):
         # connect Battery outputs to Inverter inputs
         # self.connect('battery.output_voltage', 'inverter.input_voltage')
 
-        self.nl_solver = NLGaussSeidel()
-        self.nl_solver.options['atol'] = 0.1
-        self.nl_solver.options['maxiter'] = 200
+        if solver in ('gauss_seidel', 'aitken'):
+            self.nl_solver = AitkenGaussSeidel()
+            self.nl_solver.options['aitken'] = solver == 'aitken'
+            self.nl_solver.options['atol'] = 0.1 if atol is None else atol
+        elif solver == 'newton':
+            self.nl_solver = RecordedNewton()
+            self.nl_solver.options['atol'] = 5.0e-5 if atol is None else atol
+            motor.nl_solver = RunOnce()
+        else:
+            raise ValueError("solver must be 'gauss_seidel', 'aitken' or 'newton', not '%s'" % solver)
+        self.nl_solver.options['maxiter'] = maxiter
+        self.history = self.nl_solver.history
+
         self.ln_solver = ScipyGMRES()
         # self.ln_solver = PetscKSP()
 
@@ -84,6 +113,7 @@ if __name__ == '__main__':
     # top['InputVoltage.Voltage'] = 200.0
 
     top.run()
+    print('coupling solver: %d iterations, %f s' % (top.root.history.iter_count, top.root.history.wall_time))
     print
     print('bat out v: %f ' % top['battery.output_voltage'])
     print('invert in v: %f' % top['inverter.input_voltage'])
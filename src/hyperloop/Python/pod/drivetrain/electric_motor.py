@@ -14,7 +14,6 @@ class MotorBalance(Component):
 
     def __init__(self):
         super(MotorBalance, self).__init__()
-        self.deriv_options['type'] = 'fd'
         self.add_state('I0',
                        val=40.0,
                        desc='motor no load current',
@@ -39,6 +38,14 @@ class MotorBalance(Component):
         # print('resid: %f' % resids['I0'])
         # print('power_input: %f' % params['power_input'])
 
+    def linearize(self, params, unknowns, resids):
+        J = {}
+        J['I0', 'current'] = params['voltage'] / 1000
+        J['I0', 'voltage'] = params['current'] / 1000
+        J['I0', 'power_input'] = -1.0 / 1000
+        J['I0', 'I0'] = 0.0
+        return J
+
 
 class MotorGroup(Group):
     def __init__(self):
@@ -47,10 +54,10 @@ class MotorGroup(Group):
         self.add('Motor', Motor(), promotes=['*'])
         self.add('MotorSize', MotorSize(), promotes=['*'])
         self.add('MotorBalance', MotorBalance(), promotes=['power_input', 'current', 'voltage'])
-        self.connect('MotorSolver.I0', 'I0')
+        self.connect('MotorBalance.I0', 'I0')
 
         self.nl_solver = Newton()
-        self.nl_solver.options['maxiter'] = 1000
+        self.nl_solver.options['maxiter'] = 50
         self.nl_solver.options['atol'] = 5.0e-5
 
         self.ln_solver = ScipyGMRES()
@@ -105,13 +112,12 @@ class MotorSize(Component):
     """
     def __init__(self):
         super(MotorSize, self).__init__()
-        self.deriv_options['type'] = 'fd'
 
         self.add_param('max_current',
                        val=42.0,
                        desc='max motor phase current',
                        units='A')
-        self.add_param('speed', val=2000.0, desc='desired output shaft mechanical speed', units='RPM')
+        self.add_param('speed', val=2000.0, desc='desired output shaft mechanical speed', units='rpm')
         self.add_param('L_D_ratio',
                        val=0.822727,
                        desc='length to diameter ratio of motor',
@@ -119,7 +125,7 @@ class MotorSize(Component):
         self.add_param('max_rpm',
                        val=3500.0,
                        desc='maximum rotational speed of motor',
-                       units='RPM')
+                       units='rpm')
         self.add_param('design_power',
                        val=0.394 * 746,
                        desc='desired design value for motor power',
@@ -157,14 +163,9 @@ class MotorSize(Component):
         unknowns['w_base'] = params['kappa'] * w_max
         unknowns['max_torque'] = params['design_power'] / unknowns['w_base']
         unknowns['torque'] = params['design_power'] / w_max
-        unknowns['power_mech'] = unknowns['w_operating'] * unknowns['torque']
         unknowns['w_operating'] = params['speed'] * 2 * np.pi / 60.0
+        unknowns['power_mech'] = unknowns['w_operating'] * unknowns['torque']
 
-        # calc loss parameters
-        unknowns['power_iron_loss'] = self.calculate_iron_loss(unknowns['d_base'], params['speed'], unknowns['l_base'])
-        unknowns['winding_resistance'] = self.calculate_copper_loss(unknowns['d_base'], params['max_current'], params['n_phases'])
-        unknowns['power_windage_loss'] = self.calculate_windage_loss(unknowns['w_operating'], unknowns['d_base'], unknowns['l_base'])
-       
         # calc size
         unknowns['D2L'] = 293722.0 * np.power(unknowns['max_torque'], 0.7592)  # mm^3
         unknowns['d_base'] = np.power(unknowns['D2L'] / params['L_D_ratio'], 1.0 / 3.0) / 1000.0  # m
@@ -172,7 +173,71 @@ class MotorSize(Component):
 
         unknowns['mass'] = 0.0000070646 * np.power(unknowns['D2L'], 0.9386912061)  # kg, relation in GT paper (Figure 6)
 
-    def calculate_windage_loss(self, w_operating, d_base, l_base):
+        # calc loss parameters
+        unknowns['power_iron_loss'] = self.calculate_iron_loss(unknowns['d_base'], params['speed'], unknowns['l_base'])
+        unknowns['winding_resistance'] = self.calculate_copper_loss(unknowns['d_base'], params['max_current'], params['n_phases'])
+        unknowns['power_windage_loss'] = self.calculate_windage_loss(unknowns['w_operating'], unknowns['d_base'], unknowns['l_base'])
+
+    def linearize(self, params, unknowns, resids):
+        max_rpm = params['max_rpm']
+        kappa = params['kappa']
+        design_power = params['design_power']
+        L_D_ratio = params['L_D_ratio']
+        speed = params['speed']
+        max_current = params['max_current']
+
+        max_torque = unknowns['max_torque']
+        D2L = unknowns['D2L']
+        d_base = unknowns['d_base']
+        l_base = unknowns['l_base']
+        w_max = max_rpm * 2.0 * np.pi / 60.0
+
+        J = {}
+        J['w_base', 'kappa'] = w_max
+        J['w_base', 'max_rpm'] = kappa * 2.0 * np.pi / 60.0
+        J['torque', 'design_power'] = 1.0 / w_max
+        J['torque', 'max_rpm'] = -unknowns['torque'] / max_rpm
+        J['w_operating', 'speed'] = 2 * np.pi / 60.0
+        J['power_mech', 'speed'] = 2 * np.pi / 60.0 * unknowns['torque']
+        J['power_mech', 'design_power'] = unknowns['w_operating'] / w_max
+        J['power_mech', 'max_rpm'] = -unknowns['power_mech'] / max_rpm
+
+        # everything sized from max_torque = design_power/(kappa*w_max)
+        dTmax = {'design_power': max_torque / design_power,
+                 'kappa': -max_torque / kappa,
+                 'max_rpm': -max_torque / max_rpm}
+        dD2L = dict((name, 0.7592 * D2L / max_torque * val) for name, val in dTmax.items())
+        dd = dict((name, d_base / (3.0 * D2L) * val) for name, val in dD2L.items())
+        dd['L_D_ratio'] = -d_base / (3.0 * L_D_ratio)
+        dl = dict((name, L_D_ratio * val) for name, val in dd.items())
+        dl['L_D_ratio'] = d_base + L_D_ratio * dd['L_D_ratio']
+
+        # iron loss = K(freq)*m with core mass m proportional to d_base**2*l_base, copper
+        # resistance is proportional to d_base**2 and windage loss is zero
+        P_iron = unknowns['power_iron_loss']
+        R = unknowns['winding_resistance']
+        freq = speed * 6.0 / 60.0
+        Bp = 1.22
+        K = 0.0275 * Bp**2 * freq + 1.83e-5 * (Bp * freq)**2 + 2.77e-5 * (Bp * freq)**1.5
+        dK_dfreq = 0.0275 * Bp**2 + 2.0 * 1.83e-5 * Bp**2 * freq + 1.5 * 2.77e-5 * Bp**1.5 * freq**0.5
+
+        for name in ('design_power', 'kappa', 'max_rpm', 'L_D_ratio'):
+            if name in dD2L:
+                J['max_torque', name] = dTmax[name]
+                J['D2L', name] = dD2L[name]
+                J['mass', name] = 0.9386912061 * unknowns['mass'] / D2L * dD2L[name]
+            J['d_base', name] = dd[name]
+            J['l_base', name] = dl[name]
+            J['power_iron_loss', name] = P_iron * (2.0 * dd[name] / d_base + dl[name] / l_base)
+            J['winding_resistance', name] = 2.0 * R / d_base * dd[name]
+
+        J['power_iron_loss', 'speed'] = P_iron / K * dK_dfreq * 6.0 / 60.0
+        J['winding_resistance', 'max_current'] = -1.00112597971171 * R / max_current
+
+        return J
+
+    @staticmethod
+    def calculate_windage_loss(w_operating, d_base, l_base):
         return 0
     #      # calc Reynolds number losses
     #      Re = np.power(d_base, 2.0) / 4.0 * w_operating / 2.075e-5 * 0.05
@@ -195,7 +260,8 @@ class MotorSize(Component):
     #      # P_windage_total_loss = P_windage_face_loss + P_windage_face_loss
     #      P_windage_total_loss = 0
 
-    def calculate_copper_loss(self, d_base, max_current, n_phases):
+    @staticmethod
+    def calculate_copper_loss(d_base, max_current, n_phases):
         # D-axis resistance per motor phase at very high-speed (short-cruit)
         Rd = 0.0
 
@@ -209,7 +275,8 @@ class MotorSize(Component):
         resistance_per_turn = resistance_per_km_per_turn * winding_len / 1000.
         return resistance_per_turn * n_coil_turns * n_phases
 
-    def calculate_iron_loss(self, d_base, speed, l_base):
+    @staticmethod
+    def calculate_iron_loss(d_base, speed, l_base):
         pole_pairs = 6.0
         stator_core_density = 7650.0  # kg/m^3
         core_radius_ratio = 0  # r_inner / r_outter
@@ -287,7 +354,6 @@ class Motor(Component):
 
     def __init__(self):
         super(Motor, self).__init__()
-        self.deriv_options['type'] = 'fd'
         self.add_param('max_current',
                        val=42.0,
                        desc='max operating current',
@@ -338,6 +404,46 @@ class Motor(Component):
         
         unknowns['frequency'] = params['w_operating'] / np.pi * params['pole_pairs'] / 60.0
 
+    def linearize(self, params, unknowns, resids):
+        max_current = params['max_current']
+        I0 = params['I0']
+        torque = params['torque']
+        max_torque = params['max_torque']
+        R = params['winding_resistance']
+        w = params['w_operating']
+        n_phases = params['n_phases']
+
+        a = max_current - I0
+        current = I0 + torque * a / max_torque
+
+        # partials of current, then of voltage = current*R + w*max_torque/a
+        dI = {'I0': 1.0 - torque / max_torque,
+              'max_current': torque / max_torque,
+              'torque': a / max_torque,
+              'max_torque': -torque * a / max_torque**2}
+        dV = dict((name, R * val) for name, val in dI.items())
+        dV['I0'] += w * max_torque / a**2
+        dV['max_current'] -= w * max_torque / a**2
+        dV['max_torque'] += w / a
+        dV['w_operating'] = max_torque / a
+        dV['winding_resistance'] = current
+
+        J = {}
+        for name, val in dI.items():
+            J['current', name] = val
+            J['phase_current', name] = val / n_phases
+            J['power_input', name] = 2.0 * current * R * val
+        J['phase_current', 'n_phases'] = -current / n_phases**2
+        J['power_input', 'winding_resistance'] = current**2
+        for name in ('power_mech', 'power_windage_loss', 'power_iron_loss'):
+            J['power_input', name] = 1.0
+        for name, val in dV.items():
+            J['voltage', name] = val
+            J['phase_voltage', name] = val * np.sqrt(3.0 / 2.0)
+        J['frequency', 'w_operating'] = params['pole_pairs'] / np.pi / 60.0
+        J['frequency', 'pole_pairs'] = w / np.pi / 60.0
+        return J
+
 
 if __name__ == '__main__':
     from openmdao.api import SqliteRecorder
@@ -89,3 +89,21 @@ class Inverter(Component):
         unknowns['input_power'] = output_power / params['efficiency']
         unknowns['input_current'] = unknowns['input_power'] / params[
             'input_voltage']
+
+    def linearize(self, params, unknowns, resids):
+        k = 3.0 * np.sqrt(2.0 / 3.0)
+        V_out = params['output_voltage']
+        I_out = params['output_current']
+        eff = params['efficiency']
+        V_in = params['input_voltage']
+        P_in = V_out * I_out * k / eff
+
+        J = {}
+        J['input_power', 'output_voltage'] = I_out * k / eff
+        J['input_power', 'output_current'] = V_out * k / eff
+        J['input_power', 'efficiency'] = -P_in / eff
+        J['input_current', 'output_voltage'] = J['input_power', 'output_voltage'] / V_in
+        J['input_current', 'output_current'] = J['input_power', 'output_current'] / V_in
+        J['input_current', 'efficiency'] = J['input_power', 'efficiency'] / V_in
+        J['input_current', 'input_voltage'] = -P_in / V_in**2
+        return J
@@ -0,0 +1,267 @@
+"""
+Semiconductor loss model of a three phase two level inverter.
+The Inverter component takes a fixed efficiency; here the losses of the six switches (IGBT and
+diode) are computed from their conduction and switching characteristics for sinusoidal
+PWM, following the usual closed form averages over a fundamental period [1]_, for any number
+of operating points at once.  build_inverter_map tabulates the inverter efficiency and DC
+input power on the speed x torque envelope of a motor for lookup in mission energy accounting.
+
+References
+----------
+.. [1] Graovac, Purschel, "IGBT Power Losses Calculation Using the Data-Sheet Parameters",
+   Infineon Application Note, 2009
+"""
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import Component, Problem, Group
+
+from hyperloop.Python.pod.drivetrain.motor_map import MotorMap, motor_performance
+from hyperloop.Python.tools.partials import apply_diagonal
+
+# output power of the Inverter component, 3*sqrt(2/3)*output_voltage*output_current
+K_POWER = 3.0 * np.sqrt(2.0 / 3.0)
+
+# 600 A, 600 V class IGBT module: on state threshold voltage (V) and resistance (Ohms) of the
+# transistor and diode, switching energies (J) at the reference voltage (V) and current (A)
+DEFAULT_DEVICE = {'v_ce0': 0.8,
+                  'r_ce': 2.0e-3,
+                  'v_f0': 0.8,
+                  'r_f': 1.5e-3,
+                  'e_sw': 40.0e-3,
+                  'e_rr': 10.0e-3,
+                  'v_ref': 300.0,
+                  'i_ref': 600.0}
+
+
+def inverter_losses(output_voltage, output_current, input_voltage, power_factor=0.9,
+                    switching_frequency=10.0e3, device=DEFAULT_DEVICE):
+    """
+    Losses and input power of the inverter at any number of operating points.
+
+    Params
+    ------
+    output_voltage : float or array
+        amplitude of AC output voltage (V)
+    output_current : float or array
+        amplitude of AC output current (A)
+    input_voltage : float or array
+        DC input voltage (V)
+    power_factor : float or array
+        load power factor
+    switching_frequency : float
+        PWM carrier frequency (Hz)
+    device : dict
+        Switch characteristics, with the keys of DEFAULT_DEVICE
+
+    Returns
+    -------
+    losses : dict
+        Arrays with the broadcast shape of the inputs: output_power, conduction_loss,
+        switching_loss, input_power (W), input_current (A) and efficiency
+    """
+    V = np.asarray(output_voltage, dtype=float)
+    I = np.asarray(output_current, dtype=float)
+    V_dc = np.asarray(input_voltage, dtype=float)
+    d = device
+
+    a = 2.0 * V / V_dc * power_factor  # modulation index times power factor
+
+    p_transistor = d['v_ce0'] * I * (1.0 / (2.0 * np.pi) + a / 8.0) + \
+        d['r_ce'] * I**2 * (1.0 / 8.0 + a / (3.0 * np.pi))
+    p_diode = d['v_f0'] * I * (1.0 / (2.0 * np.pi) - a / 8.0) + \
+        d['r_f'] * I**2 * (1.0 / 8.0 - a / (3.0 * np.pi))
+    p_switching = switching_frequency * (d['e_sw'] + d['e_rr']) / np.pi * \
+        I / d['i_ref'] * V_dc / d['v_ref']
+
+    output_power = K_POWER * V * I
+    conduction_loss = 6.0 * (p_transistor + p_diode)
+    switching_loss = 6.0 * p_switching
+    input_power = output_power + conduction_loss + switching_loss
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        efficiency = np.where(input_power > 0.0, output_power / input_power, 0.0)
+
+    return {'output_power': output_power,
+            'conduction_loss': conduction_loss,
+            'switching_loss': switching_loss,
+            'input_power': input_power,
+            'input_current': input_power / V_dc,
+            'efficiency': efficiency}
+
+
+class InverterLosses(Component):
+    """
+    Notes
+    ------
+
+    Inverter with conduction and switching losses of its semiconductors at num_nodes operating
+    points at once.  With num_nodes = 1 all params and outputs are floats; otherwise the
+    operating point params and all outputs are arrays of length num_nodes.  The params match
+    those of Inverter, but with a fixed carrier frequency the losses do not depend on
+    output_frequency.
+
+    Params
+    ------
+    output_frequency : float
+        frequency of AC output. Default value is 60 Hz
+    output_voltage : float
+        amplitude of AC output voltage. Default value is 120 V
+    output_current : float
+        amplitude of AC output current. Default value is 2 A
+    input_voltage : float
+        DC input voltage. Default value is 100 V
+    power_factor : float
+        load power factor. Default value is .9
+    switching_frequency : float
+        PWM carrier frequency. Default value is 10 kHz
+
+    Returns
+    -------
+    input_power : float
+        DC input power
+    input_current : float
+        DC input current
+    conduction_loss : float
+        Conduction loss of the transistors and diodes
+    switching_loss : float
+        Switching loss of the transistors and diodes
+    efficiency : float
+        power out / power in
+
+    Args
+    ----
+    num_nodes : int
+        Number of operating points
+    device : dict
+        Switch characteristics, with the keys of DEFAULT_DEVICE
+    """
+
+    def __init__(self, num_nodes=1, device=DEFAULT_DEVICE):
+        super(InverterLosses, self).__init__()
+
+        self.deriv_options['type'] = 'user'
+
+        self.num_nodes = nn = num_nodes
+        self.device = device
+
+        def _val(val):
+            return val if nn == 1 else val * np.ones(nn)
+
+        self.add_param('output_frequency', val=_val(60.0), desc='frequency of AC output', units='Hz')
+        self.add_param('output_voltage', val=_val(120.0), desc='amplitude of AC output voltage', units='V')
+        self.add_param('output_current', val=_val(2.0), desc='amplitude of AC output current', units='A')
+        self.add_param('input_voltage', val=_val(100.0), desc='DC input voltage', units='V')
+        self.add_param('power_factor', val=_val(0.9), desc='load power factor')
+        self.add_param('switching_frequency', val=10.0e3, desc='PWM carrier frequency', units='Hz')
+
+        self.add_output('input_power', val=_val(10.0), desc='DC input power', units='W')
+        self.add_output('input_current', val=_val(0.48), desc='DC input current', units='A')
+        self.add_output('conduction_loss', val=_val(0.0), desc='conduction loss', units='W')
+        self.add_output('switching_loss', val=_val(0.0), desc='switching loss', units='W')
+        self.add_output('efficiency', val=_val(1.0), desc='power out / power in')
+
+        self._partials = {}
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        losses = inverter_losses(params['output_voltage'], params['output_current'],
+                                 params['input_voltage'], params['power_factor'],
+                                 params['switching_frequency'], self.device)
+
+        for name in ('input_power', 'input_current', 'conduction_loss', 'switching_loss', 'efficiency'):
+            unknowns[name] = losses[name]
+
+    def linearize(self, params, unknowns, resids):
+        d = self.device
+        V = params['output_voltage']
+        I = params['output_current']
+        V_dc = params['input_voltage']
+        pf = params['power_factor']
+        f_sw = params['switching_frequency']
+
+        a = 2.0 * V / V_dc * pf
+        da = {'output_voltage': 2.0 * pf / V_dc,
+              'input_voltage': -a / V_dc,
+              'power_factor': 2.0 * V / V_dc}
+
+        dPc_dI = 6.0 * (d['v_ce0'] * (1.0 / (2.0 * np.pi) + a / 8.0) +
+                        2.0 * d['r_ce'] * I * (1.0 / 8.0 + a / (3.0 * np.pi)) +
+                        d['v_f0'] * (1.0 / (2.0 * np.pi) - a / 8.0) +
+                        2.0 * d['r_f'] * I * (1.0 / 8.0 - a / (3.0 * np.pi)))
+        dPc_da = 6.0 * ((d['v_ce0'] - d['v_f0']) * I / 8.0 + (d['r_ce'] - d['r_f']) * I**2 / (3.0 * np.pi))
+
+        P_sw = unknowns['switching_loss']
+        P_out = K_POWER * V * I
+        P_in = unknowns['input_power']
+
+        dPc = dict((name, dPc_da * val) for name, val in da.items())
+        dPc['output_current'] = dPc_dI
+        dPsw = {'output_current': P_sw / I, 'input_voltage': P_sw / V_dc}
+        dPout = {'output_voltage': K_POWER * I, 'output_current': K_POWER * V}
+
+        partials = self._partials = {}
+        for name in ('output_voltage', 'output_current', 'input_voltage', 'power_factor'):
+            dPin = dPout.get(name, 0.0) + dPc.get(name, 0.0) + dPsw.get(name, 0.0)
+            partials['conduction_loss', name] = dPc.get(name, 0.0)
+            partials['switching_loss', name] = dPsw.get(name, 0.0)
+            partials['input_power', name] = dPin
+            partials['input_current', name] = dPin / V_dc
+            partials['efficiency', name] = (dPout.get(name, 0.0) * P_in - P_out * dPin) / P_in**2
+        partials['input_current', 'input_voltage'] = partials['input_current', 'input_voltage'] - P_in / V_dc**2
+
+        # switching_frequency is one value for all nodes
+        partials['switching_loss', 'switching_frequency'] = P_sw / f_sw
+        partials['input_power', 'switching_frequency'] = P_sw / f_sw
+        partials['input_current', 'switching_frequency'] = P_sw / f_sw / V_dc
+        partials['efficiency', 'switching_frequency'] = -P_out * P_sw / f_sw / P_in**2
+        return {}
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        apply_diagonal(self._partials, dparams, dresids, mode)
+
+
+def build_inverter_map(d_base, l_base, winding_resistance, max_torque, max_rpm, input_voltage,
+                       max_current=42.0, n_phases=3.0, power_factor=0.9, switching_frequency=10.0e3,
+                       device=DEFAULT_DEVICE, num_speed=101, num_torque=101, file_name=None):
+    """
+    Tabulates the inverter efficiency and DC input power over the speed x torque envelope of a
+    motor, (0, max_rpm] x [0, max_torque], on the grid of build_motor_map.  The inverter output
+    is the motor phase voltage and current, as connected in Drivetrain.
+
+    Returns
+    -------
+    inverter_map : MotorMap
+        Inverter efficiency and DC input power at each motor speed and torque
+    """
+    speed = np.linspace(max_rpm / num_speed, max_rpm, num_speed)
+    torque = np.linspace(0.0, max_torque, num_torque)
+
+    perf = motor_performance(speed[:, np.newaxis], torque[np.newaxis, :], d_base, l_base,
+                             winding_resistance, max_torque, max_current)
+    losses = inverter_losses(perf['voltage'] * np.sqrt(3.0 / 2.0), perf['current'] / n_phases,
+                             input_voltage, power_factor, switching_frequency, device)
+
+    inverter_map = MotorMap(speed, torque, losses['efficiency'], losses['input_power'])
+    if file_name is not None:
+        inverter_map.save(file_name)
+    return inverter_map
+
+
+if __name__ == '__main__':
+    from hyperloop.Python.pod.drivetrain.electric_motor import MotorSize
+
+    prob = Problem()
+    prob.root = Group()
+    prob.root.add('size', MotorSize())
+    prob.root.add('inverter', InverterLosses(num_nodes=5))
+    prob.setup()
+    prob['inverter.output_current'] = np.linspace(10.0, 400.0, 5)
+    prob['inverter.input_voltage'] = 500.0
+    prob.run()
+
+    print('Inverter efficiency: %s' % prob['inverter.efficiency'])
+
+    inverter_map = build_inverter_map(prob['size.d_base'], prob['size.l_base'],
+                                      prob['size.winding_resistance'], prob['size.max_torque'],
+                                      prob['size.max_rpm'], 500.0)
+    print('Peak inverter efficiency = %f' % inverter_map.efficiency.values.max())
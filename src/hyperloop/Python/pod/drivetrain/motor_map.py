@@ -0,0 +1,157 @@
+"""
+Efficiency map of a sized BLDC motor over its speed-torque envelope.
+Evaluates the equivalent circuit model of electric_motor.py (iron, windage and copper losses,
+current and voltage) on a whole speed x torque grid in one vectorized pass, and tabulates the
+efficiency and input power for fast interpolation in mission energy accounting.
+
+The no load current balance solved by MotorGroup with Newton, current*voltage = power_input,
+has a closed form.  With k_t = max_torque/(max_current - I0), current = I0 + torque/k_t and
+voltage = current*R + w*max_torque/(max_current - I0), the copper loss cancels and
+
+    I0 = max_current*c/(1 + c),    c = (power_iron_loss + power_windage_loss)/(w*max_torque)
+
+independent of the torque.
+"""
+from __future__ import print_function
+
+import numpy as np
+
+from hyperloop.Python.pod.drivetrain.electric_motor import MotorSize
+from hyperloop.Python.tools.cache import cache_path
+from hyperloop.Python.tools.interpolate import RegularGridInterpolant
+
+
+def motor_performance(speed, torque, d_base, l_base, winding_resistance, max_torque,
+                      max_current=42.0):
+    """
+    Motor losses and electrical operating point at any number of speed, torque points.
+
+    Params
+    ------
+    speed : float or array
+        shaft speed (RPM)
+    torque : float or array
+        shaft torque (N*m)
+    d_base, l_base : float
+        motor diameter and length from MotorSize (m)
+    winding_resistance : float
+        total resistance of copper winding from MotorSize (ohm)
+    max_torque : float
+        maximum torque from MotorSize (N*m)
+    max_current : float
+        max motor phase current (A)
+
+    Returns
+    -------
+    perf : dict
+        Arrays with the broadcast shape of speed and torque: I0 (A), current (A), voltage (V),
+        power_mech, power_iron_loss, power_windage_loss, power_copper_loss, power_input (W)
+        and efficiency
+    """
+    speed, torque = np.broadcast_arrays(np.asarray(speed, dtype=float), np.asarray(torque, dtype=float))
+    w = speed * 2.0 * np.pi / 60.0  # rad/s
+
+    power_iron_loss = MotorSize.calculate_iron_loss(d_base, speed, l_base) * np.ones(speed.shape)
+    power_windage_loss = MotorSize.calculate_windage_loss(w, d_base, l_base) * np.ones(speed.shape)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        c = (power_iron_loss + power_windage_loss) / (w * max_torque)
+        I0 = np.where(w > 0.0, max_current * c / (1.0 + c), max_current)
+
+    a = max_current - I0
+    current = I0 + torque * a / max_torque
+    with np.errstate(divide='ignore'):
+        voltage = current * winding_resistance + w * max_torque / a
+
+    power_mech = w * torque
+    power_copper_loss = current**2 * winding_resistance
+    power_input = power_mech + power_iron_loss + power_windage_loss + power_copper_loss
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        efficiency = np.where(power_input > 0.0, power_mech / power_input, 0.0)
+
+    return {'I0': I0,
+            'current': current,
+            'voltage': voltage,
+            'power_mech': power_mech,
+            'power_iron_loss': power_iron_loss,
+            'power_windage_loss': power_windage_loss,
+            'power_copper_loss': power_copper_loss,
+            'power_input': power_input,
+            'efficiency': efficiency}
+
+
+class MotorMap(object):
+    """
+    Efficiency and input power of a motor on a speed x torque grid.
+
+    Params
+    ------
+    speed : array
+        speed grid (RPM)
+    torque : array
+        torque grid (N*m)
+    efficiency, power_input : array
+        tables with shape (len(speed), len(torque))
+    """
+
+    def __init__(self, speed, torque, efficiency, power_input):
+        self.speed = np.asarray(speed, dtype=float)
+        self.torque = np.asarray(torque, dtype=float)
+        self.efficiency = RegularGridInterpolant((self.speed, self.torque), efficiency)
+        self.power_input = RegularGridInterpolant((self.speed, self.torque), power_input)
+
+    def save(self, file_name):
+        """Saves the map to a file in the cache directory (or an absolute path)"""
+        np.savez_compressed(cache_path(file_name),
+                            speed=self.speed,
+                            torque=self.torque,
+                            efficiency=self.efficiency.values,
+                            power_input=self.power_input.values)
+
+    @classmethod
+    def load(cls, file_name):
+        with np.load(cache_path(file_name)) as f:
+            return cls(f['speed'], f['torque'], f['efficiency'], f['power_input'])
+
+
+def build_motor_map(d_base, l_base, winding_resistance, max_torque, max_rpm, max_current=42.0,
+                    num_speed=101, num_torque=101, file_name=None):
+    """
+    Tabulates motor efficiency and input power over (0, max_rpm] x [0, max_torque].
+
+    The zero speed line is left out of the grid since efficiency is zero there by definition
+    and the interpolant would smear that over the first speed interval.
+
+    Returns
+    -------
+    motor_map : MotorMap
+    """
+    speed = np.linspace(max_rpm / num_speed, max_rpm, num_speed)
+    torque = np.linspace(0.0, max_torque, num_torque)
+
+    perf = motor_performance(speed[:, np.newaxis], torque[np.newaxis, :], d_base, l_base,
+                             winding_resistance, max_torque, max_current)
+
+    motor_map = MotorMap(speed, torque, perf['efficiency'], perf['power_input'])
+    if file_name is not None:
+        motor_map.save(file_name)
+    return motor_map
+
+
+if __name__ == '__main__':
+    from openmdao.api import Problem, Group
+
+    prob = Problem()
+    prob.root = Group()
+    prob.root.add('size', MotorSize())
+    prob.setup()
+    prob.run()
+
+    motor_map = build_motor_map(prob['size.d_base'], prob['size.l_base'],
+                                prob['size.winding_resistance'], prob['size.max_torque'],
+                                prob['size.max_rpm'])
+
+    print('Peak efficiency = %f' % motor_map.efficiency.values.max())
+    print('Efficiency at 2000 RPM, half torque = %f' %
+          motor_map.efficiency(2000.0, .5 * prob['size.max_torque']))
@@ -0,0 +1,129 @@
+"""
+Kantrowitz limit for pod and tube sizing.
+Evaluates the ratio of the mass flow the bypass can pass to the mass flow the pod pushes
+through the tube, from pod Mach number, blockage ratio and bypass Mach number.  The ratio is
+closed form in the isentropic area ratio, so it is evaluated directly, with analytic partials,
+and can be used as a constraint in sizing sweeps without nesting a Newton solve for the choked
+bypass.
+"""
+
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import IndepVarComp, Component, Group, Problem
+
+from hyperloop.Python.tools.isentropic import area_ratio, dlnf_dM
+from hyperloop.Python.tools.partials import apply_diagonal
+
+
+def kantrowitz_flow_ratio(M_pod, BR, M_bypass, gam=1.4):
+    '''
+    Bypass to tube mass flow ratio, W_bypass/W_tube = (1-BR)*(A/A*)(M_pod)/(A/A*)(M_bypass)
+    Flow is isentropic with equal total conditions in the tube and the bypass.  With M_bypass = 1
+    the pod is at the Kantrowitz limit when the ratio equals one, and chokes the tube below it.
+    '''
+    return (1.0 - BR) * area_ratio(M_pod, gam) / area_ratio(M_bypass, gam)
+
+
+class KantrowitzLimit(Component):
+    """
+    Notes
+    ------
+
+    Evaluates the bypass to tube mass flow ratio at num_nodes points at once.  W_ratio >= 1 means the bypass can pass the flow displaced by the pod at the
+    given bypass Mach number; with M_bypass = 1 it is the Kantrowitz limit constraint.
+    With num_nodes = 1 all params and outputs are floats; otherwise each one is an array of
+    length num_nodes.
+
+    Params
+    ------
+    pod mach : float
+        pod Mach number. Default value is .8
+    A pod : float
+        cross sectional area of the pod. Default value is 1.4 m**2. Value will be taken from pod geometry module
+    A tube : float
+        cross sectional area of the tube. Default value is 20.0 m**2. Value will be taken from pod mach module
+    bypass mach : float
+        Mach number of the flow passing around the pod. Default value is 1.0
+
+    Returns
+    -------
+    Flow ratio : float
+        ratio of the mass flow the bypass can pass to the mass flow demanded by the tube
+    Blockage ratio : float
+        ratio of pod area to tube area
+    """
+
+    def __init__(self, num_nodes=1, gam=1.4):
+        super(KantrowitzLimit, self).__init__()
+
+        self.deriv_options['type'] = 'user'
+
+        self.num_nodes = num_nodes
+        nn = num_nodes
+
+        self.gam = gam
+
+        def _val(val):
+            return val if nn == 1 else val * np.ones(nn)
+
+        self.add_param('M_pod', val=_val(.8), desc='pod mach number')
+        self.add_param('A_pod', val=_val(1.4), units='m**2', desc='pod area')
+        self.add_param('A_tube', val=_val(20.0), units='m**2', desc='tube area')
+        self.add_param('M_bypass', val=_val(1.0), desc='bypass mach number')
+
+        self.add_output('W_ratio', val=_val(0.0), desc='bypass to tube mass flow ratio')
+        self.add_output('BR', val=_val(0.0), desc='blockage ratio, A_pod/A_tube')
+
+        self._partials = {}
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        BR = params['A_pod'] / params['A_tube']
+
+        unknowns['BR'] = BR
+        unknowns['W_ratio'] = kantrowitz_flow_ratio(params['M_pod'], BR, params['M_bypass'], self.gam)
+
+    def linearize(self, params, unknowns, resids):
+        A_pod = params['A_pod']
+        A_tube = params['A_tube']
+        BR = A_pod / A_tube
+
+        W = unknowns['W_ratio']
+
+        # W = (1 - BR)*f(M_pod)/f(M_bypass)
+        dW_dM = W * dlnf_dM(params['M_pod'], self.gam)
+        dW_dBR = -area_ratio(params['M_pod'], self.gam) / area_ratio(params['M_bypass'], self.gam)
+        dW_dMb = -W * dlnf_dM(params['M_bypass'], self.gam)
+
+        dBR = {'A_pod': 1.0 / A_tube, 'A_tube': -A_pod / A_tube**2}
+
+        self._partials = {}
+        for name, val in (('M_pod', dW_dM), ('A_pod', dW_dBR * dBR['A_pod']),
+                          ('A_tube', dW_dBR * dBR['A_tube']), ('M_bypass', dW_dMb)):
+            self._partials['W_ratio', name] = val
+        for name, val in dBR.items():
+            self._partials['BR', name] = val
+
+        return {}
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        apply_diagonal(self._partials, dparams, dresids, mode)
+
+
+if __name__ == '__main__':
+
+    top = Problem()
+    root = top.root = Group()
+
+    params = (('M_pod', .8), ('A_pod', 1.4, {'units': 'm**2'}),
+              ('A_tube', 20.0, {'units': 'm**2'}))
+
+    root.add('input_vars', IndepVarComp(params), promotes=['M_pod', 'A_pod', 'A_tube'])
+    root.add('p', KantrowitzLimit(), promotes=['M_pod', 'A_pod', 'A_tube'])
+
+    top.setup()
+    top.run()
+
+    print('\n')
+    print('Blockage ratio is %f' % top['p.BR'])
+    print('Bypass to tube flow ratio at the Kantrowitz limit is %f' % top['p.W_ratio'])
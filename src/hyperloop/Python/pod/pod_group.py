@@ -2,84 +2,98 @@
 Group for Pod components containing the following components:
 Cycle Group, Pod Mach (Aero), DriveTrain group, Geometry, Levitation group, and Pod Mass
 """
-from openmdao.api import Component, Group, Problem
+from openmdao.api import Component, Group, Problem, IndepVarComp, NLGaussSeidel, ScipyGMRES
 from hyperloop.Python.pod.pod_mass import PodMass
 from hyperloop.Python.pod.drivetrain.drivetrain import Drivetrain
 from hyperloop.Python.pod.pod_mach import PodMach
-from hyperloop.Python.pod.cycle.cycle_group import Cycle
 from hyperloop.Python.pod.pod_geometry import PodGeometry
 from hyperloop.Python.pod.magnetic_levitation.levitation_group import LevGroup
 
 class PodGroup(Group):
-    def __init__(self):
+    """
+    Notes
+    -----
+    The pod mass sets the levitation and the magnet mass adds to the pod mass, so the group
+    is converged by Gauss-Seidel.
+
+    Args
+    ----
+    cycle : Group
+        Compressor cycle, promoting the outputs of the Cycle group.  Default is the pycycle
+        Cycle group; CycleSurrogate evaluates surrogates of it without pycycle
+    """
+    def __init__(self, cycle=None):
         super(PodGroup, self).__init__()
 
+        if cycle is None:
+            from hyperloop.Python.pod.cycle.cycle_group import Cycle
+            cycle = Cycle()
+
         self.add('pod_mass', PodMass())
         self.add('drivetrain', Drivetrain())
-        self.add('levitation_group', LevGroup(), promotes=['w_track', 'mag_drag', 'cost', 'w_track', 'mag_drag'])
+        self.add('levitation_group', LevGroup(), promotes=['w_track', 'mag_drag', 'cost'])
         self.add('pod_mach', PodMach(), promotes=['p_tube', 'M_pod', 'A_tube', 'prc'])
-        self.add('cycle', Cycle(), promotes=['comp.trq', 'comp.power', 'comp.Nmech', 'inlet.Fl_O:stat:area', 'nozzle.Fg', 
+        self.add('cycle', cycle, promotes=['comp.trq', 'comp.power', 'comp.Nmech', 'inlet.Fl_O:stat:area', 'nozzle.Fg', 
                                               'inlet.F_ram', 'nozzle.Fl_O:tot:T', 'nozzle.Fl_O:stat:W', 'fl_start.Fl_O:stat:P',
                                               'fl_start.Fl_O:stat:T', 'fl_start.Fl_O:tot:P', 'fl_start.Fl_O:tot:T',
                                               'fl_start.Fl_O:stat:rho', 'fl_start.Fl_O:stat:V', 'inlet.Fl_O:stat:MN',
                                               'inlet.Fl_O:stat:P', 'inlet.Fl_O:stat:T', 'inlet.Fl_O:tot:P', 'inlet.Fl_O:tot:T',
                                               'inlet.Fl_O:stat:W', 'comp.Fl_O:stat:MN', 'comp.Fl_O:stat:area',
                                               'comp.Fl_O:stat:P', 'comp.Fl_O:stat:T'])
-        self.add('pod_geometry', PodGeometry(), promotes=['BF', 'A_payload', 'p_tunnel', 'M_diff', 'M_duct', 'T_tunnel', 'S'])
+        self.add('pod_geometry', PodGeometry(), promotes=['A_payload', 'p_tunnel', 'M_dif', 'M_duct', 'T_tunnel', 'S'])
 
         self.connect('pod_geometry.A_pod', 'pod_mach.A_pod')
         self.connect('pod_geometry.L_pod', ['pod_mach.L', 'pod_mass.pod_len'])
-        self.connect('drivetrain.motor_mass', 'pod_mass.motor_mass')
-        self.connect('drivetrain.battery_mass', 'pod_mass.battery_mass')
-        self.connect('drivetrain.??', 'pod_geometry.L_bat')
-        self.connect('drivetrain.??', 'pod_geometry.L_motor')
+        self.connect('drivetrain.motor.mass', 'pod_mass.motor_mass')
+        self.connect('drivetrain.battery.battery_mass', 'pod_mass.battery_mass')
+        self.connect('drivetrain.motor.l_base', 'pod_geometry.L_motor')
         self.connect('pod_mass.pod_mass', 'levitation_group.m_pod')
         self.connect('pod_geometry.L_pod', 'levitation_group.l_pod')
-        self.connect('levitation_group.mag_drag', 'pod_mass.mag_drag')
+        self.connect('levitation_group.m_mag', 'pod_mass.mag_mass')
         self.connect('pod_geometry.D_pod', 'pod_mass.podgeo_d')
-        self.connect('cycle.comp_mass', 'pod_mass.comp_mass')
-        self.connect('pod_mass.BF', ['pod_mach.BF', 'pod_geometry.BF'])
-        self.connect('pod_mass.comp_inletArea', 'cycle.comp_inletArea')
+        self.connect('pod_mass.BF', 'pod_mach.BF')
 
         #npss cycle connections
-        self.connect('cycle.comp.Nmech', 'drivetrain.operating_rpm')
-        self.connect('cycle.comp.power', 'drivetrain.design_power')
+        self.connect('comp.Nmech', 'drivetrain.speed')
+        self.connect('comp.power', 'drivetrain.design_power')
         self.connect('cycle.comp_mass', 'pod_mass.comp_mass')
-        self.connect('cycle.comp.Fl_O:stat:area', 'pod_geometry.??')
+        self.connect('comp.Fl_O:stat:area', 'pod_mass.comp_inletArea')
+
+        self.nl_solver = NLGaussSeidel()
+        self.nl_solver.options['maxiter'] = 50
+        self.ln_solver = ScipyGMRES()
 
 if __name__ == "__main__":
+    import sys
+
+    from hyperloop.Python.pod.cycle.cycle_surrogate import CycleSurrogate
 
     prob = Problem()
     root = prob.root = Group()
-    root.add('Pod', PodGroup())
+    # 'surrogate' runs the pod with CycleSurrogate instead of pycycle
+    root.add('Pod', PodGroup(CycleSurrogate() if 'surrogate' in sys.argv else None))
 
-    params = (('p_tube', ??),
-             ('M_pod', ??),
-             ('A_payload', ??),
-             ('p_tunnel', ??),
-             ('M_diff', ??),
-             ('M_duct', ??),
-             ('T_tunnel', ??),
-             ('w_track', ??),
-             ('prc', ??))
+    params = (('p_tube', 850.0, {'units': 'Pa'}),
+              ('M_pod', .8),
+              ('A_payload', 1.4, {'units': 'm**2'}),
+              ('p_tunnel', 850.0, {'units': 'Pa'}),
+              ('M_dif', .6),
+              ('M_duct', .3),
+              ('T_tunnel', 298.0, {'units': 'K'}),
+              ('w_track', 2.0, {'units': 'm'}),
+              ('prc', 12.5))
 
     prob.root.add('des_vars', IndepVarComp(params))
-    prob.root.connect('des_vars.p_tube', 'Pod.pod_mach.p_tube')
-    prob.root.connect('des_vars.M_pod', ['Pod.pod_mach.M_pod', 'Pod.pod_geometry.M_pod'])
-    prob.root.connect('des_vars.A_payload', 'Pod.pod_geometry.A_payload')
-    prob.root.connect('des_vars.p_tunnel', 'Pod.pod_geometry.p_tunnel')
-    prob.root.connect('des_vars.M_diff', 'Pod.pod_geometry.M_diff')
-    prob.root.connect('des_vars.M_duct', 'Pod.pod_geometry.M_duct')
-    prob.root.connect('des_vars.T_tunnel', 'Pod.pod_geometry.T_tunnel')
-    prob.root.connect('des_vars.w_track', 'Pod.levitation_group.w_track')
+    for name in ('p_tube', 'A_payload', 'p_tunnel', 'M_dif', 'M_duct', 'T_tunnel', 'w_track'):
+        prob.root.connect('des_vars.%s' % name, 'Pod.%s' % name)
+    prob.root.connect('des_vars.M_pod', ['Pod.M_pod', 'Pod.pod_geometry.M_pod'])
+    prob.root.connect('des_vars.prc', ['Pod.prc', 'Pod.pod_geometry.prc'])
 
     prob.setup()
-    prob.root.list_connections()
     prob.run()
 
-    print('Tube Temperature: %f' % prob['Tube.Thermal.tubetemp'])
-    print(':%f' % prob['Cycle.'])
-    print(':%f' % prob['Aero.'])
-    print('%f' % prob['Geometry.'])
-    print('%f' % prob['LevGroup.'])
-    print('%f' % prob['Weight.'])
\ No newline at end of file
+    print('Pod mass: %f kg' % prob['Pod.pod_mass.pod_mass'])
+    print('Pod length: %f m' % prob['Pod.pod_geometry.L_pod'])
+    print('Tube area: %f m**2' % prob['Pod.A_tube'])
+    print('Compressor power: %f hp' % prob['Pod.comp.power'])
+    print('Magnetic drag: %f N' % prob['Pod.mag_drag'])
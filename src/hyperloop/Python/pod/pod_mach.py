@@ -9,8 +9,18 @@ from __future__ import print_function
 import numpy as np
 from openmdao.api import IndepVarComp, Component, Group, Problem, ExecComp
 
+from hyperloop.Python.tools.isentropic import mach_to_area, dlnf_dM, dlnf_dgam
+from hyperloop.Python.tools.partials import apply_diagonal
+
 class PodMach(Component):
     """
+    Notes
+    ------
+
+    Evaluates the pod aero sizing at num_nodes points at once, e.g. every node of a trajectory
+    speed schedule.  With num_nodes = 1 all params and outputs are floats; otherwise each one
+    is an array of length num_nodes.
+
     Params
     ------
     Ratio of specific heats : float
@@ -59,68 +69,80 @@ class PodMach(Component):
         returns free stream Reynolds number
     """
 
-    def __init__(self):
+    def __init__(self, num_nodes=1):
         super(PodMach, self).__init__()
 
-        self.add_param('gam', val=1.4, desc='ratio of specific heats')
+        self.deriv_options['type'] = 'user'
+
+        self.num_nodes = num_nodes
+        nn = num_nodes
+
+        def _val(val):
+            # Keep scalar defaults for a single node so PodMach still connects
+            # to the scalar outputs of PodGeometry and IndepVarComps
+            return val if nn == 1 else val * np.ones(nn)
+
+        self.add_param('gam', val=_val(1.4), desc='ratio of specific heats')
         self.add_param('R',
-                       val=287.0,
+                       val=_val(287.0),
                        units='J/(kg*K)',
                        desc='Ideal gas constant')
-        self.add_param('BF', val=.9, desc='A_diff/A_pod')
-        self.add_param('A_pod', val=1.4, units='m**2', desc='pod area')
-        self.add_param('L', val=22.0, units='m', desc='pod length')
+        self.add_param('BF', val=_val(.9), desc='A_diff/A_pod')
+        self.add_param('A_pod', val=_val(1.4), units='m**2', desc='pod area')
+        self.add_param('L', val=_val(22.0), units='m', desc='pod length')
         self.add_param('prc',
-                       val=12.5,
+                       val=_val(12.5),
                        units='m**2',
                        desc='pressure ratio of a compressor')
         self.add_param('p_tube',
-                       val=850.0,
+                       val=_val(850.0),
                        units='Pa',
                        desc='ambient pressure')
         self.add_param('T_ambient',
-                       val=298.0,
+                       val=_val(298.0),
                        units='K',
                        desc='ambient temperature')
         self.add_param('mu',
-                       val=1.846e-5,
+                       val=_val(1.846e-5),
                        units='kg/(m*s)',
                        desc='dynamic viscosity')
-        self.add_param('M_duct', val=.95, desc='maximum pod mach number')
+        self.add_param('M_duct', val=_val(.95), desc='maximum pod mach number')
         self.add_param(
             'M_diff',
-            val=.6,
+            val=_val(.6),
             desc='maximum pod mach number befor entering the compressor')
         self.add_param('cp',
-                       val=1009.0,
+                       val=_val(1009.0),
                        units='J/(kg*K)',
                        desc='specific heat')
         self.add_param('delta_star',
-                       val=.07,
+                       val=_val(.07),
                        units='m',
                        desc='Boundary layer displacement thickness')
 
-        self.add_param('M_pod', val=.8, desc='pod mach number')
+        self.add_param('M_pod', val=_val(.8), desc='pod mach number')
 
         self.add_output('pwr_comp',
-                        val=0.0,
+                        val=_val(0.0),
                         units='W',
                         desc='Compressor Power')
         self.add_output('A_inlet',
-                        val=0.0,
+                        val=_val(0.0),
                         units='m**2',
                         desc='Pod inlet area')
-        self.add_output('A_tube', val=0.0, units='m**2', desc='tube area')
-        self.add_output('A_bypass', val=0.0, units='m**2', desc='bypass area')
+        self.add_output('A_tube', val=_val(0.0), units='m**2', desc='tube area')
+        self.add_output('A_bypass', val=_val(0.0), units='m**2', desc='bypass area')
         self.add_output('A_duct_eff',
-                        val=0.0,
+                        val=_val(0.0),
                         units='m**2',
                         desc='effective duct area')
         self.add_output('A_diff',
-                        val=0.0,
+                        val=_val(0.0),
                         units='m**2',
                         desc='Area after diffuser')
-        self.add_output('Re', val=0.0, desc='Reynolds Number')
+        self.add_output('Re', val=_val(0.0), desc='Reynolds Number')
+
+        self._partials = {}
 
     def solve_nonlinear(self, params, unknowns, resids):
         """
@@ -198,13 +220,6 @@ class PodMach(Component):
         delta_star = params['delta_star']
         M_pod = params['M_pod']
 
-        def mach_to_area(M1, M2, gam):
-            '''(A2/A1) = f(M2)/f(M1) where f(M) = (1/M)*((2/(gam+1))*(1+((gam-1)/2)*M**2))**((gam+1)/(2*(gam-1)))'''
-            A_ratio = (M1 / M2) * (((1.0 + ((gam - 1.0) / 2.0) * (M2**2.0)) /
-                                    (1.0 + ((gam - 1.0) / 2.0) * (M1**2.0)))**(
-                                        (gam + 1.0) / (2.0 * (gam - 1.0))))
-            return A_ratio
-
         #Define intermediate variables
         rho_inf = p_tube / (R *
                             T_ambient)  #Calculate density of free stream flow
@@ -216,11 +231,11 @@ class PodMach(Component):
 
         A_diff = BF * A_pod  #Calculate diffuser output area based on blockage factor input
 
-        #Calculate inlet area. Inlet is necessary if free stream Mach number is greater than max compressore mach number M_diff
-        if M_pod > M_diff:
-            A_inlet = A_diff * mach_to_area(M_diff, M_pod, gam)
-        else:
-            A_inlet = A_diff
+        #Calculate inlet area. Inlet is necessary if free stream Mach number is greater than max compressore mach number M_diff.
+        #The branch is masked so that every node of a speed schedule is evaluated in the same pass;
+        #nodes below M_diff see mach_to_area(M_diff, M_diff) = 1
+        M_inlet = np.where(M_pod > M_diff, M_pod, M_diff)
+        A_inlet = A_diff * mach_to_area(M_diff, M_inlet, gam)
 
         eps = mach_to_area(M_pod, M_duct, gam)
         A_tube = (A_pod + np.pi * (((r_pod + delta_star)**2.0) - (r_pod**2.0)) -
@@ -239,6 +254,109 @@ class PodMach(Component):
         unknowns['A_diff'] = A_diff
         unknowns['Re'] = Re
 
+    def linearize(self, params, unknowns, resids):
+        """
+        Note
+        ------
+
+        Analytic partials of the PodMach outputs. Every output at a node depends only on the params
+        at the same node, so each partial is kept as one value per node and applied in
+        apply_linear.  The inlet branch is differentiated on the side of M_diff that each node falls on.
+        """
+
+        gam = params['gam']
+        BF = params['BF']
+        A_pod = params['A_pod']
+        L = params['L']
+        prc = params['prc']
+        p_tube = params['p_tube']
+        R = params['R']
+        T_ambient = params['T_ambient']
+        mu = params['mu']
+        M_duct = params['M_duct']
+        M_diff = params['M_diff']
+        cp = params['cp']
+        delta_star = params['delta_star']
+        M_pod = params['M_pod']
+
+        Re = unknowns['Re']
+        A_inlet = unknowns['A_inlet']
+        A_tube = unknowns['A_tube']
+        pwr_comp = unknowns['pwr_comp']
+
+        inlet = M_pod > M_diff
+        r_pod = np.sqrt(A_pod / np.pi)
+        eps = mach_to_area(M_pod, M_duct, gam)
+        k = (gam - 1.0) / 2.0
+        c = (gam - 1.0) / gam
+
+        #Reynolds number, Re = p*M*L*sqrt(gam)/(mu*sqrt(R*T)).  Partials with respect to M_pod are
+        #formed without dividing by M_pod so that they stay finite at a standing start (v = 0)
+        dRe = {'p_tube': Re / p_tube,
+               'M_pod': p_tube * L * np.sqrt(gam / (R * T_ambient)) / mu,
+               'L': Re / L,
+               'gam': Re / (2.0 * gam),
+               'mu': -Re / mu,
+               'R': -Re / (2.0 * R),
+               'T_ambient': -Re / (2.0 * T_ambient)}
+
+        dA_diff = {'BF': A_pod, 'A_pod': BF}
+
+        #A_inlet = A_diff*f(M_pod)/f(M_diff) above M_diff, A_diff below it
+        dA_inlet = {'BF': A_inlet / BF,
+                    'A_pod': A_inlet / A_pod,
+                    'M_pod': A_inlet * inlet * dlnf_dM(np.where(inlet, M_pod, M_diff), gam),
+                    'M_diff': -A_inlet * inlet * dlnf_dM(M_diff, gam),
+                    'gam': A_inlet * inlet * (dlnf_dgam(M_pod, gam) - dlnf_dgam(M_diff, gam))}
+
+        #eps = f(M_duct)/f(M_pod)
+        eps_M = ((1.0 + k * M_duct**2) / (1.0 + k * M_pod**2))**((gam + 1.0) / (2.0 * (gam - 1.0))) / M_duct
+        deps = {'M_duct': eps * dlnf_dM(M_duct, gam),
+                'M_pod': -eps_M * (M_pod**2 - 1.0) / (1.0 + k * M_pod**2),
+                'gam': eps * (dlnf_dgam(M_duct, gam) - dlnf_dgam(M_pod, gam))}
+
+        #Boundary layer annulus, pi*((r_pod + delta_star)**2 - r_pod**2)
+        dA_annulus = {'A_pod': delta_star / r_pod,
+                      'delta_star': 2.0 * np.pi * (r_pod + delta_star)}
+
+        #A_tube = (A_pod + A_annulus - eps*A_inlet)/(1 - eps)
+        dA_tube = {}
+        for name in ('A_pod', 'BF', 'delta_star', 'M_pod', 'M_diff', 'M_duct', 'gam'):
+            dN = -eps * dA_inlet.get(name, 0.0) - A_inlet * deps.get(name, 0.0) + dA_annulus.get(name, 0.0)
+            if name == 'A_pod':
+                dN = dN + 1.0
+            dA_tube[name] = (dN + A_tube * deps.get(name, 0.0)) / (1.0 - eps)
+
+        #pwr_comp = p*M*sqrt(gam*T/R)*A_inlet*cp*(1 + k*M**2)*(prc**c - 1)
+        dpwr = {'p_tube': pwr_comp / p_tube,
+                'R': -pwr_comp / (2.0 * R),
+                'T_ambient': pwr_comp / (2.0 * T_ambient),
+                'cp': pwr_comp / cp,
+                'prc': pwr_comp * c * prc**(c - 1.0) / (prc**c - 1.0)}
+        pwr_M = p_tube * np.sqrt(gam * T_ambient / R) * A_inlet * cp * (1.0 + k * M_pod**2) * (prc**c - 1.0)
+        dpwr['M_pod'] = pwr_M + pwr_comp * 2.0 * k * M_pod / (1.0 + k * M_pod**2)
+        dpwr['gam'] = pwr_comp * (1.0 / (2.0 * gam) + 0.5 * M_pod**2 / (1.0 + k * M_pod**2) +
+                                  prc**c * np.log(prc) / (gam**2 * (prc**c - 1.0)))
+        for name in dA_inlet:
+            dpwr[name] = dpwr.get(name, 0.0) + pwr_comp / A_inlet * dA_inlet[name]
+
+        dA_bypass = dict((name, dA_tube[name] - dA_inlet.get(name, 0.0)) for name in dA_tube)
+
+        dA_duct_eff = dict((name, dA_tube[name] - dA_annulus.get(name, 0.0)) for name in dA_tube)
+        dA_duct_eff['A_pod'] = dA_duct_eff['A_pod'] - 1.0
+
+        self._partials = {}
+        for out, partials in (('Re', dRe), ('A_diff', dA_diff), ('A_inlet', dA_inlet),
+                              ('A_tube', dA_tube), ('pwr_comp', dpwr),
+                              ('A_bypass', dA_bypass), ('A_duct_eff', dA_duct_eff)):
+            for name, val in partials.items():
+                self._partials[out, name] = val * np.ones(self.num_nodes)
+
+        return {}
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        apply_diagonal(self._partials, dparams, dresids, mode)
+
 
 if __name__ == '__main__':
     top = Problem()
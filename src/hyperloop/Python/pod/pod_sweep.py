@@ -0,0 +1,71 @@
+"""
+Pod sizing design sweep.
+Runs a Latin hypercube over pod Mach number, tube pressure, payload area and compressor pressure
+ratio through PodGroup, with CycleSurrogate as its cycle, and the Kantrowitz limit on a pool of
+worker processes.  Each worker loads the surrogate training data and builds its own PodGroup.
+"""
+from __future__ import print_function
+
+import sys
+
+from openmdao.api import IndepVarComp, Group, Problem
+
+from hyperloop.Python.pod.cycle.cycle_surrogate import CycleSurrogate
+from hyperloop.Python.pod.kantrowitz import KantrowitzLimit
+from hyperloop.Python.pod.pod_group import PodGroup
+from hyperloop.Python.tools.sweep import latin_hypercube, run_sweep
+
+SWEEP_BOUNDS = {'des_vars.M_pod': (.5, .95),
+                'des_vars.p_tube': (500.0, 2000.0),
+                'des_vars.A_payload': (1.0, 3.0),
+                'des_vars.prc': (8.0, 20.0)}
+
+SWEEP_OUTPUTS = ['pod.pod_geometry.A_pod', 'pod.pod_geometry.L_pod', 'pod.A_tube',
+                 'pod.pod_mach.pwr_comp', 'pod.pod_mass.pod_mass', 'pod.comp.power', 'kantrowitz.W_ratio']
+
+
+def pod_sizing_problem(training_data='flow_path_samples.npz'):
+    """
+    Builds the sizing Problem used by the sweep.  Module level so that worker processes
+    can unpickle it and build their own copy.
+
+    Args
+    ----
+    training_data : str
+        CycleSurrogate training data from cycle_surrogate.sample_flow_path, or the name of the
+        file it was saved to
+    """
+    prob = Problem()
+    root = prob.root = Group()
+
+    params = (('M_pod', .8),
+              ('p_tube', 850.0, {'units': 'Pa'}),
+              ('A_payload', 1.4, {'units': 'm**2'}),
+              ('prc', 12.5))
+
+    root.add('des_vars', IndepVarComp(params))
+    root.add('pod', PodGroup(cycle=CycleSurrogate(training_data)))
+    root.add('kantrowitz', KantrowitzLimit())
+
+    root.connect('des_vars.M_pod', ['pod.M_pod', 'pod.pod_geometry.M_pod',
+                                    'pod.cycle.FlowPath.fl_start.MN_target', 'kantrowitz.M_pod'])
+    root.connect('des_vars.p_tube', ['pod.p_tube', 'pod.p_tunnel'])
+    root.connect('des_vars.A_payload', 'pod.A_payload')
+    root.connect('des_vars.prc', ['pod.prc', 'pod.pod_geometry.prc', 'pod.cycle.FlowPath.comp.PRdes'])
+    root.connect('pod.pod_geometry.A_pod', 'kantrowitz.A_pod')
+    root.connect('pod.A_tube', 'kantrowitz.A_tube')
+
+    return prob
+
+
+if __name__ == '__main__':
+
+    num_cases = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    path = sys.argv[2] if len(sys.argv) > 2 else 'pod_sweep'
+
+    cases = latin_hypercube(SWEEP_BOUNDS, num_cases, seed=0)
+    data = run_sweep(pod_sizing_problem, cases, SWEEP_OUTPUTS, path)
+
+    print('\n')
+    print('%d of %d cases converged, results in %s' % (data['success'].sum(), num_cases, path))
+    print('Smallest tube area = %f m^2' % data['pod.A_tube'].min())
@@ -0,0 +1,43 @@
+import numpy as np
+
+from hyperloop.Python.tools import air_thermo
+from hyperloop.Python.tests.util import create_problem
+
+
+class TestAirThermo(object):
+    def test_properties(self):
+
+        T = np.array([220.0, 298.15, 650.0, 1500.0])
+        P = np.array([50.0, 101325.0, 850.0, 2.0e6])
+        props = air_thermo.air_properties(T, P)
+
+        # standard day air
+        assert np.isclose(props['Cp'][1], 1005.0, rtol=.01)
+        assert np.isclose(props['gamma'][1], 1.4, rtol=.01)
+        assert abs(props['h'][1]) < 1e-9
+        assert abs(props['s'][1]) < 1e-9
+
+        d_dT, d_dP = air_thermo.air_property_derivs(T, P)
+        for name in air_thermo.PROPERTIES:
+            fd_T = (air_thermo.air_properties(T + 1e-3, P)[name] -
+                    air_thermo.air_properties(T - 1e-3, P)[name]) / 2e-3
+            fd_P = (air_thermo.air_properties(T, P * (1.0 + 1e-6))[name] -
+                    air_thermo.air_properties(T, P * (1.0 - 1e-6))[name]) / (2e-6 * P)
+            assert np.allclose(d_dT[name], fd_T, rtol=1e-6, atol=1e-10)
+            assert np.allclose(d_dP[name], fd_P, rtol=1e-6, atol=1e-10)
+
+    def test_flow_start(self):
+
+        prob = create_problem(air_thermo.AirFlowStart())
+        prob.setup(check=False)
+        prob['des_vars.P'] = .304434211
+        prob['des_vars.T'] = 1710.0
+        prob['des_vars.W'] = 1.08
+        prob.run()
+
+        assert np.isclose(prob['comp.Fl_O:tot:Cp'], .269, rtol=.01)
+        assert np.isclose(prob['comp.Fl_O:stat:W'], 1.08)
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, val in data['comp'].items():
+            assert val['rel error'][0] < 1e-4 or val['abs error'][0] < 1e-6
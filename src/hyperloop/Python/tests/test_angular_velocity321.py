@@ -1,7 +1,9 @@
 import pytest
 from src.hyperloop.Python import angular_velocity321
 import numpy as np
-from openmdao.api import Group, Problem
+from openmdao.api import Group, Problem, IndepVarComp
+
+from hyperloop.Python.tests import util
 
 
 def create_problem(component):
@@ -31,6 +33,50 @@ class TestMissionDrag(object):
 
         prob.run()
 
-        assert np.isclose(prob['comp.omega_b'][0], .1, rtol = 0.01)
+        assert np.isclose(prob['comp.omega_b'][0], 0.0, rtol = 0.01)
         assert np.isclose(prob['comp.omega_b'][1], 0.1, rtol = 0.01)
-        assert np.isclose(prob['comp.omega_b'][2], 0.0, rtol = 0.01)
\ No newline at end of file
+        assert np.isclose(prob['comp.omega_b'][2], 0.1, rtol = 0.01)
+
+    def test_num_nodes(self):
+
+        nn = 5
+        psi = np.linspace(0.0, 1.0, nn)
+        theta = np.linspace(-.3, .3, nn)
+        phi = np.linspace(.2, -.1, nn)
+        psi_dot = .1 * np.ones(nn)
+        theta_dot = np.linspace(-.05, .05, nn)
+        phi_dot = np.linspace(0.0, .02, nn)
+
+        values = dict(psi=psi, theta=theta, phi=phi, psi_dot=psi_dot, theta_dot=theta_dot, phi_dot=phi_dot)
+        prob = util.create_problem(angular_velocity321.AngularVelocity321(num_nodes=nn), values=values)
+        prob.setup(check=False)
+        prob.run()
+
+        omega_x = phi_dot - psi_dot*np.sin(theta)
+        omega_y = theta_dot*np.cos(phi) + psi_dot*np.sin(phi)*np.cos(theta)
+        omega_z = -theta_dot*np.sin(phi) + psi_dot*np.cos(phi)*np.cos(theta)
+
+        assert prob['comp.omega_b'].shape == (nn, 3)
+        assert np.allclose(prob['comp.omega_b'], np.column_stack([omega_x, omega_y, omega_z]))
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        assert len(data['comp']) == 6
+        for key, err in data['comp'].items():
+            assert err['abs error'][0] < 1e-6, key
+
+        # forward and reverse totals through the elementwise partials
+        indeps = ['des_vars.theta', 'des_vars.phi', 'des_vars.psi_dot']
+        fwd = prob.calc_gradient(indeps, ['comp.omega_b'], mode='fwd')
+        assert np.allclose(prob.calc_gradient(indeps, ['comp.omega_b'], mode='rev'), fwd)
+        assert np.allclose(prob.calc_gradient(indeps, ['comp.omega_b'], mode='fd'), fwd, atol=1e-5)
+
+    def test_single_node_partials(self):
+
+        values = dict(theta=.2, phi=-.1, psi_dot=.1, theta_dot=.05, phi_dot=.01)
+        prob = util.create_problem(angular_velocity321.AngularVelocity321(), values=values)
+        prob.setup(check=False)
+        prob.run()
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, err in data['comp'].items():
+            assert err['abs error'][0] < 1e-6, key
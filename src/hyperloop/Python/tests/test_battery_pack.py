@@ -0,0 +1,55 @@
+import numpy as np
+
+from hyperloop.Python.pod.drivetrain import battery_pack
+from hyperloop.Python.tests.util import create_problem
+
+
+CELLS = (battery_pack.DEFAULT_CELL,
+         dict(battery_pack.DEFAULT_CELL, q_n=4.5, r=0.006, cell_mass=95.0, cell_height=50.0,
+              cell_diameter=26.0, cell_cost=11.0))
+
+
+class TestBatteryPack(object):
+    def test_search_vs_brute_force(self):
+
+        des_power, des_voltage, energy = 20e3, 100.0, 2e3
+        configs = battery_pack.search_pack_configurations(des_power, des_voltage, energy, cells=CELLS,
+                                                          max_series=200, max_parallel=100, pareto=False)
+
+        n_series, n_parallel = np.meshgrid(np.arange(1.0, 201.0), np.arange(1.0, 101.0), indexing='ij')
+        for index, cell in enumerate(CELLS):
+            perf = battery_pack.pack_performance(n_series, n_parallel, des_power, **cell)
+            with np.errstate(invalid='ignore'):
+                feasible = (perf['voltage'] >= des_voltage) & (perf['energy'] >= energy) & \
+                           (perf['cell_current'] <= 3.0 * cell['q_n'])
+
+            # the search returns the smallest feasible n_parallel for every feasible n_series
+            found = configs['cell'] == index
+            rows = np.nonzero(feasible.any(axis=1))[0]
+            assert np.array_equal(np.sort(configs['n_series'][found]), n_series[rows, 0])
+            for n_s, n_p in zip(configs['n_series'][found], configs['n_parallel'][found]):
+                assert n_p == n_parallel[int(n_s) - 1][feasible[int(n_s) - 1]].min()
+
+    def test_pareto_set(self):
+
+        configs = battery_pack.search_pack_configurations(400e3, 300.0, 25e3, cells=CELLS)
+
+        # the lighter cell is more expensive per unit energy, so both appear in the Pareto set
+        assert set(configs['cell']) == set([0, 1])
+        assert np.all(np.diff(configs['mass']) >= 0.0)
+        assert np.all(np.diff(configs['cost']) <= 0.0)
+        assert np.all(configs['voltage'] >= 300.0) and np.all(configs['energy'] >= 25e3)
+
+        objectives = np.array([[1.0, 2.0], [2.0, 1.0], [2.0, 2.0], [1.0, 2.0], [0.5, 3.0]])
+        assert np.array_equal(battery_pack.pareto_front(objectives), [True, True, False, False, True])
+
+    def test_partials(self):
+
+        prob = create_problem(battery_pack.BatteryPack(), {'des_power': 3e5, 'n_series': 250.0,
+                                                           'n_parallel': 30.0})
+        prob.setup(check=False)
+        prob.run()
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, val in data['comp'].items():
+            assert val['rel error'][0] < 1e-3 or val['abs error'][0] < 1e-6
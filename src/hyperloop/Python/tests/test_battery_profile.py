@@ -0,0 +1,55 @@
+import numpy as np
+
+from hyperloop.Python.pod.drivetrain import battery_profile
+from hyperloop.Python.tests.util import create_problem
+
+
+class TestBatteryProfile(object):
+    def test_constant_current(self):
+
+        # constant current matches the time*current discharge of Battery
+        time = np.linspace(0.0, 3600.0, 1001)
+        profile = battery_profile.discharge_profile(time, 10.0, 4.0, current=8.0 * np.ones(1001))
+
+        assert np.allclose(profile['discharge'], 2.0 * time / 3600.0)
+        assert np.isclose(profile['soc'][-1], 1.0 - 2.0 / 6.8)
+        assert np.allclose(profile['heat_rate'], 10.0 * .0046 * 8.0**2 / 4.0)
+        assert profile['feasible']
+
+    def test_configurations(self):
+
+        # power draw solved for the current, for 3 x 4 pack configurations at once
+        time = np.linspace(0.0, 600.0, 3001)
+        power = np.interp(time, [0.0, 60.0, 540.0, 600.0], [400e3, 150e3, 150e3, 0.0])
+        n_series = np.array([250.0, 300.0, 350.0])[:, np.newaxis]
+        n_parallel = np.array([10.0, 20.0, 30.0, 40.0])[:, np.newaxis, np.newaxis]
+
+        profile = battery_profile.discharge_profile(time, n_series, n_parallel, power=power)
+
+        assert profile['voltage'].shape == (4, 3, 3001)
+        assert profile['feasible'].shape == (4, 3)
+        assert np.allclose(profile['voltage'][1:] * profile['current'][1:], power)
+        assert not profile['feasible'][0].any() and profile['feasible'][1:].all()
+
+        single = battery_profile.discharge_profile(time, 300.0, 30.0, current=profile['current'][2, 1])
+        for name in ('soc', 'voltage', 'heat', 'energy'):
+            assert np.allclose(single[name], profile[name][2, 1])
+        assert np.isclose(single['energy'][-1], np.trapz(power, time), rtol=1e-6)
+
+    def test_partials(self):
+
+        t = np.sort(np.random.RandomState(0).uniform(0.0, 3000.0, 9))
+        t[0] = 0.0
+        values = {'time': t, 'current': np.random.RandomState(1).uniform(50.0, 300.0, 9)}
+
+        component = battery_profile.BatteryProfile(num_nodes=9)
+        component.deriv_options['step_size'] = 1e-7
+        prob = create_problem(component, values)
+        prob.setup(check=False)
+        prob.run()
+
+        # fwd and rev against fd, and fwd against rev
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, val in data['comp'].items():
+            for k in range(3):
+                assert val['rel error'][k] < 1e-4 or val['abs error'][k] < 1e-6, key
@@ -0,0 +1,66 @@
+import numpy as np
+from scipy.integrate import odeint
+
+from hyperloop.Python.pod.drivetrain import battery_thermal
+from hyperloop.Python.tests.util import create_problem
+
+
+TIME = np.linspace(0.0, 2100.0, 201)
+CURRENT = np.interp(TIME, [0.0, 120.0, 1980.0, 2100.0], [1200.0, 420.0, 420.0, 0.0])
+
+
+class TestBatteryThermal(object):
+    def test_vs_ode(self):
+
+        thermal = battery_thermal.pack_temperature(TIME, CURRENT, 300.0, 10.0, T_0=300.0)
+
+        R, tau = battery_thermal.thermal_properties()
+        dT_dt = lambda T, t: (.0046 * (np.interp(t, TIME, CURRENT) / 10.0)**2 - (T - 293.15) / R) / .170e3
+        exact = odeint(dT_dt, 300.0, TIME, hmax=1.0)[:, 0]
+
+        assert np.allclose(thermal['temperature'], exact, atol=.05)
+        assert np.isclose(thermal['peak_temperature'], exact.max(), atol=.05)
+
+        # long runs restart the closed form and settle at the steady temperature rise q*R
+        time = np.linspace(0.0, 1e5, 5001)
+        thermal = battery_thermal.pack_temperature(time, 400.0 * np.ones(5001), 300.0, 20.0, h=200.0)
+        R, tau = battery_thermal.thermal_properties(h=200.0)
+        assert np.isclose(thermal['temperature'][-1], 293.15 + .0046 * 20.0**2 * R)
+
+    def test_configurations(self):
+
+        n_series = np.array([250.0, 300.0, 350.0])[:, np.newaxis]
+        n_parallel = np.array([10.0, 20.0, 30.0, 40.0])[:, np.newaxis, np.newaxis]
+        thermal = battery_thermal.pack_temperature(TIME, CURRENT, n_series, n_parallel)
+
+        assert thermal['temperature'].shape == (4, 3, 201)
+        assert thermal['cooling_power'].shape == (4, 3)
+        for i, j in ((0, 2), (2, 1)):
+            single = battery_thermal.pack_temperature(TIME, CURRENT, n_series[j, 0], n_parallel[i, 0, 0])
+            assert np.allclose(single['temperature'], thermal['temperature'][i, j])
+            assert np.isclose(single['cooling_power'], thermal['cooling_power'][i, j])
+
+        # the cooling power holds the hottest pack exactly to T_max
+        q_cool = thermal['cooling_power'][0, 0] / 2500.0
+        R, tau = battery_thermal.thermal_properties()
+        cooled = thermal['temperature'][0, 0] - q_cool * R * (1.0 - np.exp(-TIME / tau))
+        assert q_cool > 0.0 and np.isclose(cooled.max(), 333.15)
+        assert np.all(thermal['cooling_power'][1:] == 0.0)
+
+    def test_partials(self):
+
+        time = np.sort(np.random.RandomState(0).uniform(0.0, 2100.0, 9))
+        time[0] = 0.0
+        current = np.random.RandomState(1).uniform(300.0, 1500.0, 9)
+
+        for T_max in (333.15, 300.0):
+            component = battery_thermal.BatteryThermal(num_nodes=9)
+            component.deriv_options['step_size'] = 1e-7
+            prob = create_problem(component, {'time': time, 'current': current, 'T_0': 310.0,
+                                              'T_max': T_max})
+            prob.setup(check=False)
+            prob.run()
+
+            data = prob.check_partial_derivatives(out_stream=None)
+            for key, val in data['comp'].items():
+                assert val['rel error'][0] < 1e-4 or val['abs error'][0] < 1e-6
@@ -0,0 +1,48 @@
+import numpy as np
+
+from hyperloop.Python.tube import booster_section
+
+
+class TestBoosterSection(object):
+    def test_batched_matches_single(self):
+
+        mass = np.array([2000.0, 3500.0, 5000.0])
+        layout = np.array([[30.0] * 10, [50.0] * 10, [40.0] * 10])
+        P1 = np.array([3000.0, 2500.0, 3500.0])[:, np.newaxis] * np.ones(10)
+        launch = booster_section.simulate_boost(mass, layout, P1=P1)
+
+        assert np.all(launch['reached'])
+        for i in range(3):
+            single = booster_section.simulate_boost(mass[i], layout[i], P1=P1[i])
+            for key in ('section_length', 'launch_time', 'peak_power', 'energy'):
+                assert np.isclose(launch[key][i], single[key][0])
+
+    def test_section_length_and_energy(self):
+
+        mass = np.array([2000.0, 4000.0])
+        launch = booster_section.simulate_boost(mass, 10.0 * np.ones(80), P1=3000.0)
+
+        # in a uniform section the force depends on speed only, dx = m*v*dv/(F - D)
+        v = np.linspace(324.0, 335.0, 2001)
+        block_start = np.linspace(0.0, 800.0, 81) * np.ones((mass.size, 1))
+        blocks = np.ones((mass.size, 80))
+        dx_dv = np.zeros((v.size, mass.size))
+        for i, vi in enumerate(v):
+            f = booster_section.boost_forces(np.ones(mass.size), vi * np.ones(mass.size), mass, block_start,
+                                             3000.0 * blocks, 450.0 * blocks, np.inf * blocks)
+            dx_dv[i] = mass * vi / (f['thrust'] - f['drag'])
+        length = np.trapz(dx_dv, v, axis=0)
+        assert np.allclose(launch['section_length'], length, rtol=1e-3)
+
+        # thrust work goes to kinetic energy and drag
+        kinetic = .5 * mass * (335.0**2 - 324.0**2)
+        assert np.allclose(launch['thrust_work'], kinetic + launch['drag_work'], rtol=1e-3)
+        assert np.all(launch['energy'] > launch['thrust_work'])
+
+    def test_short_section(self):
+
+        launch = booster_section.simulate_boost([2000.0, 2000.0], [[1.0] * 50, [10.0] * 50], P1=3000.0)
+
+        assert np.all(launch['reached'] == [False, True])
+        assert launch['section_length'][0] >= 50.0
+        assert launch['peak_power'][0] > 0.0
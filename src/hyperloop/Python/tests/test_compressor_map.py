@@ -0,0 +1,77 @@
+import numpy as np
+from openmdao.api import Group, Problem, IndepVarComp, ExecComp
+
+from hyperloop.Python.pod.cycle import compressor_map
+
+
+def map_problem():
+    # analytic stand-in for the off-design FlowPath, which needs pycycle
+    prob = Problem()
+    root = prob.root = Group()
+    root.add('des_vars', IndepVarComp([('Nc', 10000.0), ('Wc', 4.0)]))
+    root.add('comp', ExecComp(['PR = 1.0 + 5.0*(Nc/10000.0)**2 - .1*(Wc - 4.0)**2',
+                               'eff = .9 - .02*(Wc - 4.0)**2 - .1*(Nc/10000.0 - 1.0)**2']))
+    root.connect('des_vars.Nc', 'comp.Nc')
+    root.connect('des_vars.Wc', 'comp.Wc')
+    return prob
+
+
+def create_problem(component):
+    root = Group()
+    prob = Problem(root)
+    prob.root.add('comp', component)
+    return prob
+
+
+class TestCompressorMap(object):
+    def test_build_and_lookup(self, tmpdir, monkeypatch):
+
+        monkeypatch.setenv('HYPERLOOP_CACHE', str(tmpdir))
+        Nc = np.linspace(6000.0, 12000.0, 31)
+        Wc = np.linspace(1.0, 8.0, 36)
+        compressor_map.build_compressor_map(Nc, Wc, 'map.npz', factory=map_problem,
+                                            inputs=('des_vars.Nc', 'des_vars.Wc'),
+                                            outputs=('comp.PR', 'comp.eff'), num_workers=0)
+
+        component = compressor_map.CompressorMapLookup(num_nodes=3, comp_map='map.npz')
+        prob = create_problem(component)
+        prob.root.add('des_vars', IndepVarComp([('Nc', np.array([7100.0, 9050.0, 11300.0])),
+                                                ('Wc', np.array([2.1, 4.3, 6.5])),
+                                                ('W', np.array([1.0, 4.0, 6.0]))]))
+        for name in ('Nc', 'Wc', 'W'):
+            prob.root.connect('des_vars.%s' % name, 'comp.%s' % name)
+
+        prob.setup(check=False)
+        prob.run()
+
+        Nc = prob['des_vars.Nc']
+        Wc = prob['des_vars.Wc']
+        assert np.allclose(prob['comp.PR'], 1.0 + 5.0 * (Nc / 10000.0)**2 - .1 * (Wc - 4.0)**2, rtol=1e-3)
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, val in data['comp'].items():
+            assert val['rel error'][0] < 1e-4 or val['abs error'][0] < 1e-6
+
+    def test_fill_speed_lines(self):
+
+        table = np.array([[np.nan, 2.0, 3.0, np.nan, np.nan],
+                          [1.0, np.nan, 3.0, 4.0, 5.0]])
+        filled = compressor_map._fill_speed_lines(table)
+
+        assert np.array_equal(filled, [[2.0, 2.0, 3.0, 3.0, 3.0], [1.0, 1.0, 3.0, 4.0, 5.0]])
+
+    def test_check_map_scalars(self):
+
+        prob = Problem()
+        prob.root = Group()
+        flow_path = prob.root.add('FlowPath', Group())
+        flow_path.add('comp', ExecComp('PR = 2.0*s_PR'))
+        prob.setup(check=False)
+
+        try:
+            compressor_map.check_map_scalars(prob, 'params')
+        except ValueError as err:
+            assert 'FlowPath.comp.map.s_Nc' in str(err)
+            assert 'FlowPath.comp.s_PR' in str(err)
+        else:
+            assert False, 'missing map scalars were not reported'
@@ -0,0 +1,90 @@
+from collections import OrderedDict
+
+import numpy as np
+from openmdao.api import Group, Problem, IndepVarComp, Component, Newton, ScipyGMRES
+
+from hyperloop.Python.pod.cycle.cycle_cache import CachedCycle
+from hyperloop.Python.tools.cache import ResultCache
+
+
+class Cubic(Component):
+    # stand-in for the cycle: solves x**3 + x = a with Newton and counts residual evaluations
+    count = 0
+
+    def __init__(self):
+        super(Cubic, self).__init__()
+        self.add_param('a', 2.0)
+        self.add_state('x', 1.0)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        pass
+
+    def apply_nonlinear(self, params, unknowns, resids):
+        Cubic.count += 1
+        resids['x'] = unknowns['x']**3 + unknowns['x'] - params['a']
+
+    def linearize(self, params, unknowns, resids):
+        return {('x', 'x'): 3.0 * unknowns['x']**2 + 1.0, ('x', 'a'): -1.0}
+
+
+def cubic_problem():
+    prob = Problem()
+    root = prob.root = Group()
+    root.add('des_vars', IndepVarComp('a', 2.0))
+    root.add('cubic', Cubic())
+    root.connect('des_vars.a', 'cubic.a')
+    root.nl_solver = Newton()
+    root.nl_solver.options['atol'] = 1e-12
+    root.ln_solver = ScipyGMRES()
+    return prob
+
+
+def create_problem(component):
+    root = Group()
+    prob = Problem(root)
+    prob.root.add('comp', component)
+    return prob
+
+
+class TestCycleCache(object):
+    def test_hits_and_seeding(self, tmpdir, monkeypatch):
+
+        monkeypatch.setenv('HYPERLOOP_CACHE', str(tmpdir))
+        component = CachedCycle(cubic_problem,
+                                inputs=OrderedDict([('a', ('des_vars.a', 2.0, None))]),
+                                outputs=OrderedDict([('x', ('cubic.x', 1.0, None))]),
+                                cache_file='cubic.pkl')
+        prob = create_problem(component)
+        prob.setup(check=False)
+
+        prob['comp.a'] = 1000.0
+        prob.run()
+        assert np.isclose(prob['comp.x'], 9.96666679, rtol=1e-6)
+        cold = Cubic.count
+
+        # exact hit does not run the cycle
+        prob.run()
+        assert Cubic.count == cold
+        assert component.cache.hits == 1
+
+        # near miss starts from the cached state and converges in fewer iterations
+        Cubic.count = 0
+        prob['comp.a'] = 1000.5
+        prob.run()
+        assert np.isclose(prob['comp.x']**3 + prob['comp.x'], 1000.5)
+        assert Cubic.count < cold
+
+        component.save_cache()
+        assert len(ResultCache(file_name='cubic.pkl')) == 2
+
+    def test_lru_eviction(self):
+
+        cache = ResultCache(maxsize=2, sig_digits=4)
+        cache.put([1.0], {'y': 1.0})
+        cache.put([2.0], {'y': 2.0})
+        assert cache.get([1.00001]) is not None
+        cache.put([3.0], {'y': 3.0})
+
+        assert cache.get([2.0]) is None
+        assert cache.get([1.0])[0]['y'] == 1.0
+        assert cache.nearest([2.9])[0]['y'] == 3.0
@@ -0,0 +1,81 @@
+import numpy as np
+from openmdao.api import Group, Problem, IndepVarComp
+
+from hyperloop.Python.pod.cycle import cycle_surrogate
+from hyperloop.Python.pod.pod_group import PodGroup
+from hyperloop.Python.tests.util import cycle_training_data
+
+
+def create_problem(component):
+    root = Group()
+    prob = Problem(root)
+    prob.root.add('comp', component)
+    params = [(name, meta[0], {'units': meta[1]}) if meta[1] else (name, meta[0])
+              for name, meta in cycle_surrogate.SURROGATE_INPUTS.items()]
+    prob.root.add('des_vars', IndepVarComp(params))
+    prob.root.connect('des_vars.vehicleMach', 'comp.FlowPath.fl_start.MN_target')
+    for name in ('P', 'T', 'W'):
+        prob.root.connect('des_vars.%s' % name, 'comp.FlowPath.fl_start.%s' % name)
+    prob.root.connect('des_vars.PRdes', 'comp.FlowPath.comp.PRdes')
+    return prob
+
+
+class TestCycleSurrogate(object):
+    def test_kriging_vs_training_function(self, tmpdir, monkeypatch):
+
+        monkeypatch.setenv('HYPERLOOP_CACHE', str(tmpdir))
+        np.savez(str(tmpdir.join('samples.npz')), **cycle_training_data(60))
+
+        prob = create_problem(cycle_surrogate.CycleSurrogate('samples.npz', surrogate='kriging'))
+        prob.setup(check=False)
+        prob.run()
+
+        scale = (1.0 + .8**2) * .1885057735 * 4.53592 * 6.0**.3
+        assert np.isclose(prob['comp.comp.power'], scale + 5.91096, rtol=.01)
+        assert np.isclose(prob['comp.nozzle.Fg'], scale + 5.91096, rtol=.01)
+        assert prob['comp.comp_mass'] > 0.0
+
+    def test_total_derivatives(self):
+
+        prob = create_problem(cycle_surrogate.CycleSurrogate(cycle_training_data(60)))
+        prob.setup(check=False)
+        prob.run()
+
+        of = ['comp.comp.power', 'comp.comp_mass']
+        wrt = ['des_vars.W', 'des_vars.PRdes']
+        J = prob.calc_gradient(wrt, of, mode='fwd')
+        J_fd = prob.calc_gradient(wrt, of, mode='fd')
+        assert np.allclose(J, J_fd, rtol=1e-4)
+
+    def test_flow_start(self):
+
+        prob = Problem(Group())
+        prob.root.add('des_vars', IndepVarComp([('MN_target', .8), ('P', .1885, {'units': 'psi'}),
+                                                ('T', 591.1, {'units': 'degR'}), ('W', 10.0, {'units': 'lbm/s'})]))
+        prob.root.add('comp', cycle_surrogate.FlowStart())
+        for name in ('MN_target', 'P', 'T', 'W'):
+            prob.root.connect('des_vars.%s' % name, 'comp.%s' % name)
+        prob.setup(check=False)
+        prob.run()
+
+        # static temperature and speed of sound of air at M = .8
+        assert np.isclose(prob['comp.Fl_O:stat:T'], 591.1 / 1.128)
+        assert np.isclose(prob['comp.Fl_O:stat:V'] / .8, np.sqrt(1.4 * 53.3533 * 32.174 * 591.1 / 1.128))
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, err in data['comp'].items():
+            assert err['rel error'][0] < 1e-5 or err['abs error'][0] < 1e-8, key
+
+    def test_pod_group(self):
+
+        prob = Problem(Group())
+        prob.root.add('pod', PodGroup(cycle=cycle_surrogate.CycleSurrogate(cycle_training_data(60))))
+        prob.setup(check=False)
+        prob.run()
+
+        scale = (1.0 + .8**2) * .1885057735 * 4.53592 * 6.0**.3
+        assert np.isclose(prob['pod.comp.power'], scale + 5.91096, rtol=.01)
+        assert np.isclose(prob['pod.drivetrain.design_power'], prob['pod.comp.power'] * 745.7, rtol=1e-3)
+        assert np.isclose(prob['pod.drivetrain.speed'], prob['pod.comp.Nmech'])
+        assert prob['pod.pod_mass.comp_mass'] == prob['pod.cycle.comp_mass']
+        assert prob['pod.fl_start.Fl_O:stat:rho'] > 0.0
@@ -1,5 +1,6 @@
 from __future__ import print_function
 
+import numpy as np
 from openmdao.api import Group, Problem
 
 from hyperloop.Python.pod.drivetrain.drivetrain import Drivetrain
@@ -41,3 +42,20 @@ class TestDrivetrain(object):
         # prob['comp.Inverter.OutputCurrent'] = 11.0613
         # prob['comp.Inverter.InputVoltage'] = 24
         # prob['comp.Inverter.OutputFrequency'] = 200
+
+    def test_solvers(self):
+        results = {}
+        for solver in ('gauss_seidel', 'aitken', 'newton'):
+            drivetrain = Drivetrain(solver=solver)
+            prob = create_problem(drivetrain)
+            prob.setup(check=False)
+            prob.run()
+
+            solve = drivetrain.history.solves[-1]
+            assert solve['converged']
+            assert drivetrain.history.iter_count == len(solve['iteration'])
+            assert len(solve['norm']) == len(solve['time'])
+            results[solver] = (prob['comp.motor.I0'], prob['comp.inverter.input_power'])
+
+        for solver in ('aitken', 'newton'):
+            assert np.allclose(results[solver], results['gauss_seidel'], rtol=1e-5)
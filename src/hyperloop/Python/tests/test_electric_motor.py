@@ -0,0 +1,37 @@
+import numpy as np
+from openmdao.api import Problem, IndepVarComp
+
+from hyperloop.Python.pod.drivetrain import electric_motor
+from hyperloop.Python.pod.drivetrain.motor_map import motor_performance
+from hyperloop.Python.tests.util import create_problem
+
+
+class TestElectricMotor(object):
+    def test_partials(self):
+
+        cases = ((electric_motor.MotorSize(), {'speed': 2500.0, 'design_power': 1.0e5, 'max_current': 300.0}),
+                 (electric_motor.Motor(), {'w_operating': 200.0, 'max_torque': 300.0, 'torque': 100.0,
+                                           'I0': 5.0, 'winding_resistance': .02, 'max_current': 400.0}))
+
+        for component, values in cases:
+            prob = create_problem(component, values)
+            prob.setup(check=False)
+            prob.run()
+
+            data = prob.check_partial_derivatives(out_stream=None)
+            for key, val in data['comp'].items():
+                assert val['rel error'][0] < 1e-4 or val['abs error'][0] < 1e-6
+
+    def test_motor_group_balance(self):
+
+        prob = Problem()
+        prob.root = electric_motor.MotorGroup()
+        prob.root.add('init_vars', IndepVarComp('max_current', 42.0, units='A'), promotes=['max_current'])
+        prob.setup(check=False)
+        prob.run()
+
+        # Newton solution matches the closed form I0 of the motor map
+        perf = motor_performance(prob['speed'], prob['torque'], prob['d_base'], prob['l_base'],
+                                 prob['winding_resistance'], prob['max_torque'], 42.0)
+        assert np.isclose(prob['I0'], perf['I0'], rtol=1e-4)
+        assert np.isclose(prob['current'] * prob['voltage'], prob['power_input'], rtol=1e-5)
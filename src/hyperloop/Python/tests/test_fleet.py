@@ -0,0 +1,99 @@
+import numpy as np
+
+from hyperloop.Python.mission import fleet
+from hyperloop.Python.mission.timetable import TrackNetwork
+
+LINE = ['A', 'B', 'C']
+
+
+def create_network():
+    network = TrackNetwork(ds=100.0, v_line=300.0, a_accel=2.0, a_brake=2.0)
+    for name in LINE:
+        network.add_station(name)
+    network.add_link('A', 'B', 60000.0)
+    network.add_link('B', 'C', 40000.0, kappa_h=1.0 / 3000.0)
+    return network
+
+
+class TestFleet(object):
+    def test_single_pod(self):
+        network = create_network()
+        result = fleet.simulate_fleet(network, LINE, num_pods=1, duration=3600.0, dwell=30.0,
+                                      turnaround=120.0)
+        runs = result['runs']
+
+        # nothing to wait for: departs when ready, after dwell or turnaround
+        assert np.allclose(runs['depart'], runs['ready'])
+        assert list(runs['leg'][:5]) == [0, 1, 2, 3, 0]
+        assert list(runs['origin'][:5]) == ['A', 'B', 'C', 'B', 'A']
+        assert np.allclose(runs['ready'][1] - runs['arrive'][0], 30.0)
+        assert np.allclose(runs['ready'][2] - runs['arrive'][1], 120.0)
+
+        legs = runs['arrive'] - runs['depart']
+        assert np.isclose(legs[0], network.trip('A', 'B')['time'])
+
+    def test_block_headway(self):
+        network = create_network()
+        headway = 20.0
+        result = fleet.simulate_fleet(network, LINE, num_pods=20, duration=7200.0, dispatch_interval=5.0,
+                                      headway=headway, block_length=5000.0)
+        runs = result['runs']
+
+        # pods departing on the same leg are spaced by the longest block occupancy plus headway
+        trip = network.trip('A', 'B')
+        t = np.concatenate([[0.0], np.cumsum(np.diff(trip['s']) / (0.5 * (trip['v'][1:] + trip['v'][:-1])))])
+        edges = np.linspace(0.0, trip['s'][-1], 13)
+        t_edges = np.interp(edges, trip['s'], t)
+        spacing = np.max(t_edges[1:] - t_edges[:-1]) + headway
+
+        depart = np.sort(runs['depart'][runs['leg'] == 0])
+        assert np.all(np.diff(depart) >= spacing - 1e-6)
+        assert np.any(runs['depart'] > runs['ready'])
+
+    def test_loads(self):
+        network = create_network()
+        result = fleet.simulate_fleet(network, LINE, num_pods=6, duration=3600.0, dt_bin=30.0,
+                                      boosters=[(10000.0, 12000.0)])
+        runs = result['runs']
+
+        assert result['pods'].shape == (2, 120, result['block_edges'].size - 1)
+        assert np.isclose(result['block_edges'][-1], 100000.0, rtol=1e-3)
+
+        # pod-seconds in the tube are the leg run times within the simulated time
+        inside = np.sum(np.minimum(runs['arrive'], 3600.0) - runs['depart'])
+        assert np.isclose(result['pods'].sum() * 30.0, inside, rtol=1e-3)
+
+        loads = fleet.tube_loads(result)
+        assert np.allclose(loads['num_pods'], result['pods'].sum(axis=(0, 2)))
+        assert np.all(loads['total_heat_rate_pods'] >= 0.0)
+        assert np.max(loads['prop_power']) > 0.0
+
+        assert result['booster_utilization'].shape == (2, 1)
+        assert np.all(result['booster_utilization'] > 0.0)
+
+        # every run of the leg holding the booster launches through it
+        launches = result['launches']
+        assert launches[0][0].size == np.sum(runs['leg'] == 0)
+        assert launches[1][0].size == np.sum(runs['leg'] == 3)
+        assert np.all(np.diff(launches[0][0]) > 0.0)
+
+        power = fleet.tube_power(loads, vac_power=1.0e5)
+        assert np.allclose(power, loads['prop_power'] + 1.0e5)
+
+    def test_continuous_runs(self):
+        network = create_network()
+        result = fleet.simulate_fleet(network, LINE, num_pods=7, duration=7200.0, dispatch_interval=20.0)
+        runs = result['runs']
+
+        # backward pods enter service at the end of the line
+        first = [np.argmax(runs['pod'] == pod) for pod in range(7)]
+        assert list(runs['origin'][first]) == ['A', 'C'] * 3 + ['A']
+
+        # every run of a pod starts where its previous run ended
+        for pod in range(7):
+            mine = runs['pod'] == pod
+            order = np.argsort(runs['depart'][mine])
+            origin = runs['origin'][mine][order]
+            destination = runs['destination'][mine][order]
+            assert np.sum(mine) > 3
+            assert np.all(origin[1:] == destination[:-1])
@@ -0,0 +1,45 @@
+import numpy as np
+
+from hyperloop.Python.tube import grid_demand
+
+
+def direct_demand(times, pulse, num_steps, dt=1.0):
+    """Superposition of the pulses one launch at a time"""
+    demand = np.zeros(num_steps + pulse.size + 1)
+    for t in times:
+        j = int(np.floor(t / dt))
+        frac = t / dt - j
+        demand[j:j + pulse.size] += (1.0 - frac) * pulse
+        demand[j + 1:j + 1 + pulse.size] += frac * pulse
+    return demand[:num_steps]
+
+
+class TestGridDemand(object):
+    def test_matches_direct_superposition(self):
+        rng = np.random.RandomState(1)
+        times = np.sort(rng.uniform(0.0, 3600.0, 200))
+
+        for size in (5, 200):
+            pulse = rng.uniform(1e5, 1e6, size)
+            expected = direct_demand(times, pulse, 3600).reshape(-1, 60)
+
+            # chunks shorter than the pulse recount the launches still running
+            demand = grid_demand.grid_demand({'a': [(times, pulse)]}, 3600.0, interval=60.0, chunk=120.0)
+            assert np.allclose(demand['a']['mean'], expected.mean(axis=1))
+            assert np.allclose(demand['a']['max'], expected.max(axis=1))
+            assert np.isclose(demand['a']['peak'], expected.max())
+
+    def test_totals_and_energy(self):
+        pulse = grid_demand.launch_pulse(2.5, 5e6)
+        assert np.allclose(pulse, [2e6, 2e6, 1e6])
+
+        day = np.arange(100.0, 80000.0, 30.0)
+        substations = {'a': [(day, pulse)], 'b': [(day + 7.3, pulse), (day + 15.0, pulse)]}
+        demand = grid_demand.grid_demand(substations, 86400.0, base_load={'a': 1e5})
+
+        assert np.isclose(demand['a']['energy'], day.size * 5e6 + 1e5 * 86400.0)
+        assert np.isclose(demand['b']['energy'], 2 * day.size * 5e6)
+        assert np.allclose(demand['total']['mean'], demand['a']['mean'] + demand['b']['mean'])
+        assert demand['total']['peak'] <= demand['a']['peak'] + demand['b']['peak']
+        assert 0.0 < demand['total']['load_factor'] < 1.0
+        assert demand['time'].size == 96
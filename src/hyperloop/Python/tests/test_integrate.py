@@ -0,0 +1,16 @@
+import numpy as np
+
+from hyperloop.Python.tools.integrate import cumulative_trapezoid
+
+
+class TestIntegrate(object):
+    def test_cumulative_trapezoid(self):
+
+        t = np.sort(np.random.RandomState(0).uniform(0.0, 2.0, 200))
+        y = np.vstack((t, 3.0 * t**2))
+        integral = cumulative_trapezoid(y, t)
+
+        assert integral.shape == (2, 200)
+        assert np.allclose(integral[:, -1], np.trapz(y, t))
+        assert np.allclose(integral[0], .5 * (t**2 - t[0]**2))
+        assert np.allclose(integral[1], t**3 - t[0]**3, atol=1e-3)
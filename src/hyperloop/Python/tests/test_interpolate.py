@@ -0,0 +1,20 @@
+import numpy as np
+
+from hyperloop.Python.tools.interpolate import RegularGridInterpolant
+
+
+class TestInterpolate(object):
+    def test_interpolant_is_exact_for_multilinear(self):
+
+        x = np.linspace(0., 1., 5)
+        y = np.linspace(-1., 2., 7)
+        f = lambda x, y: 1.0 + 2.0 * x - 3.0 * y + .5 * x * y
+        interp = RegularGridInterpolant((x, y), f(x[:, np.newaxis], y[np.newaxis, :]))
+
+        xi = np.array([.1, .45, .99])
+        yi = np.array([-.8, .3, 1.9])
+        val, (dx, dy) = interp.evaluate(xi, yi)
+
+        assert np.allclose(val, f(xi, yi))
+        assert np.allclose(dx, 2.0 + .5 * yi)
+        assert np.allclose(dy, -3.0 + .5 * xi)
@@ -0,0 +1,85 @@
+import numpy as np
+
+from hyperloop.Python.pod.drivetrain import inverter_losses
+from hyperloop.Python.pod.drivetrain.motor_map import motor_performance
+from hyperloop.Python.tests.util import create_problem
+
+
+INPUTS = ('output_voltage', 'output_current', 'input_voltage', 'power_factor', 'switching_frequency')
+
+
+def inverter_problem(num_nodes):
+    return create_problem(inverter_losses.InverterLosses(num_nodes=num_nodes), names=INPUTS)
+
+
+class TestInverterLosses(object):
+    def test_batched_matches_scalar(self):
+
+        V = np.linspace(50.0, 250.0, 6)
+        I = np.linspace(20.0, 400.0, 6)
+
+        prob = inverter_problem(6)
+        prob.setup(check=False)
+        prob['des_vars.output_voltage'] = V
+        prob['des_vars.output_current'] = I
+        prob['des_vars.input_voltage'] = 600.0 * np.ones(6)
+        prob.run()
+
+        for i in range(6):
+            single = inverter_problem(1)
+            single.setup(check=False)
+            single['des_vars.output_voltage'] = V[i]
+            single['des_vars.output_current'] = I[i]
+            single['des_vars.input_voltage'] = 600.0
+            single.run()
+
+            for name in ('input_power', 'input_current', 'conduction_loss', 'switching_loss', 'efficiency'):
+                assert np.isclose(prob['comp.%s' % name][i], single['comp.%s' % name])
+
+        P_out = inverter_losses.K_POWER * V * I
+        assert np.allclose(prob['comp.input_power'],
+                           P_out + prob['comp.conduction_loss'] + prob['comp.switching_loss'])
+        assert np.allclose(prob['comp.efficiency'], P_out / prob['comp.input_power'])
+        assert np.all((prob['comp.efficiency'] > .9) & (prob['comp.efficiency'] < 1.0))
+
+    def test_partials(self):
+
+        prob = inverter_problem(4)
+        prob.setup(check=False)
+        prob['des_vars.output_voltage'] = np.array([40.0, 90.0, 160.0, 230.0])
+        prob['des_vars.output_current'] = np.array([15.0, 120.0, 260.0, 390.0])
+        prob['des_vars.input_voltage'] = np.array([500.0, 550.0, 600.0, 650.0])
+        prob['des_vars.power_factor'] = np.array([.7, .8, .85, .95])
+        prob.run()
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, err in data['comp'].items():
+            assert err['rel error'][0] < 1e-4 or err['abs error'][0] < 1e-6, key
+
+    def test_total_derivatives(self):
+
+        # switching_frequency is one value for all nodes, summed over them in rev mode
+        prob = inverter_problem(4)
+        prob.setup(check=False)
+        prob['des_vars.output_current'] = np.array([15.0, 120.0, 260.0, 390.0])
+        prob.run()
+
+        indeps = ['des_vars.switching_frequency', 'des_vars.output_current']
+        outputs = ['comp.efficiency', 'comp.input_power']
+        fwd = prob.calc_gradient(indeps, outputs, mode='fwd')
+        assert np.allclose(prob.calc_gradient(indeps, outputs, mode='rev'), fwd)
+        assert np.allclose(prob.calc_gradient(indeps, outputs, mode='fd'), fwd, rtol=1e-3)
+
+    def test_map_interpolation(self, tmpdir):
+
+        file_name = str(tmpdir.join('inverter_map.npz'))
+        inverter_losses.build_inverter_map(.48, .4, .03, 1.6, 3500.0, 400.0, file_name=file_name)
+        loaded = inverter_losses.MotorMap.load(file_name)
+
+        speed = np.array([520.0, 1333.0, 3100.0])
+        torque = np.array([.3, .81, 1.52])
+        perf = motor_performance(speed, torque, .48, .4, .03, 1.6)
+        exact = inverter_losses.inverter_losses(perf['voltage'] * np.sqrt(3.0 / 2.0), perf['current'] / 3.0, 400.0)
+
+        assert np.allclose(loaded.efficiency(speed, torque), exact['efficiency'], atol=1e-3)
+        assert np.allclose(loaded.power_input(speed, torque), exact['input_power'], rtol=1e-3)
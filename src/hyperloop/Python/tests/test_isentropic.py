@@ -0,0 +1,45 @@
+import numpy as np
+
+from hyperloop.Python.tools import isentropic
+
+
+class TestIsentropic(object):
+    def test_area_ratio_round_trip(self):
+
+        gam = np.array([1.3, 1.4, 1.67])
+        M_sub = np.linspace(.05, .99, 20)[:, np.newaxis]
+        M_sup = np.linspace(1.01, 5.0, 20)[:, np.newaxis]
+
+        AR = isentropic.area_ratio(M_sub, gam)
+        assert np.allclose(isentropic.mach_from_area_ratio(AR, gam), M_sub)
+
+        AR = isentropic.area_ratio(M_sup, gam)
+        assert np.allclose(isentropic.mach_from_area_ratio(AR, gam, supersonic=True), M_sup)
+
+    def test_mach_from_area_ratio_edge_cases(self):
+
+        M = isentropic.mach_from_area_ratio([.5, 1.0, 1.6875], supersonic=[False, False, True])
+
+        assert np.isnan(M[0])
+        assert M[1] == 1.0
+        assert np.isclose(M[2], 2.0, rtol=1e-4)
+
+        assert np.isclose(isentropic.mach_from_area_ratio(1.3398), .5, rtol=1e-4)
+
+    def test_derivs(self):
+
+        M = np.array([.3, .7, 2.0])
+        gam = 1.4
+        h = 1e-6
+
+        AR, dAR_dM, dAR_dgam = isentropic.area_ratio_derivs(M, gam)
+        fd_M = (isentropic.area_ratio(M + h, gam) - isentropic.area_ratio(M - h, gam)) / (2 * h)
+        fd_gam = (isentropic.area_ratio(M, gam + h) - isentropic.area_ratio(M, gam - h)) / (2 * h)
+        assert np.allclose(dAR_dM, fd_M, rtol=1e-6)
+        assert np.allclose(dAR_dgam, fd_gam, rtol=1e-6)
+
+        dM_dAR, dM_dgam = isentropic.mach_from_area_ratio_derivs(M, gam)
+        sup = M > 1.0
+        fd_AR = (isentropic.mach_from_area_ratio(AR + h, gam, sup) -
+                 isentropic.mach_from_area_ratio(AR - h, gam, sup)) / (2 * h)
+        assert np.allclose(dM_dAR, fd_AR, rtol=1e-5)
@@ -0,0 +1,46 @@
+import numpy as np
+from openmdao.api import Group, Problem, IndepVarComp
+
+from hyperloop.Python.pod import kantrowitz
+from hyperloop.Python.tools.isentropic import area_ratio
+
+def create_problem(component):
+    root = Group()
+    prob = Problem(root)
+    prob.root.add('comp', component)
+    return prob
+
+
+class TestKantrowitz(object):
+    def test_flow_ratio(self):
+
+        # no blockage passes the tube flow at the pod Mach number
+        M = np.array([.3, .55, .8])
+        assert np.allclose(kantrowitz.kantrowitz_flow_ratio(M, 0.0, M), 1.0)
+
+        # at the Kantrowitz limit the bypass chokes with 1 - BR = A*/A at the pod Mach number
+        BR = 1.0 - 1.0 / area_ratio(M)
+        assert np.allclose(kantrowitz.kantrowitz_flow_ratio(M, BR, 1.0), 1.0)
+
+    def test_partials(self):
+
+        component = kantrowitz.KantrowitzLimit(num_nodes=3)
+
+        prob = create_problem(component)
+        prob.root.add('des_vars', IndepVarComp([('M_pod', np.array([.4, .62, .83])),
+                                                ('A_pod', np.array([1.4, 2.1, 3.3])),
+                                                ('A_tube', 20.0 * np.ones(3)),
+                                                ('M_bypass', np.array([.97, .8, .66]))]))
+        for name in ('M_pod', 'A_pod', 'A_tube', 'M_bypass'):
+            prob.root.connect('des_vars.%s' % name, 'comp.%s' % name)
+
+        prob.setup(check=False)
+        prob.run()
+
+        assert np.allclose(prob['comp.BR'], np.array([1.4, 2.1, 3.3]) / 20.0)
+        assert np.allclose(prob['comp.W_ratio'],
+                           kantrowitz.kantrowitz_flow_ratio(prob['comp.M_pod'], prob['comp.BR'], prob['comp.M_bypass']))
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, val in data['comp'].items():
+            assert val['abs error'][0] < 1e-4 * max(1.0, np.abs(val['J_fd']).max())
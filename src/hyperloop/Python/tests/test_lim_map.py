@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from openmdao.api import Group, Problem
+
+from hyperloop.Python import lim_map
+from hyperloop.Python.LIM import Thrust
+
+
+def create_problem():
+    root = Group()
+    prob = Problem(root)
+    prob.root.add('comp', Thrust())
+    return prob
+
+
+class TestLIMMap(object):
+    def test_matches_thrust_component(self):
+
+        V_r = np.array([5.0, 15.5, 40.0])
+        f = np.array([30.0, 60.0, 200.0])
+        V1 = np.array([300.0, 450.0, 600.0])
+        perf = lim_map.slim_thrust(V_r, f, V1)
+
+        prob = create_problem()
+        prob.setup(check=False)
+        for i in range(3):
+            prob['comp.V_r'] = V_r[i]
+            prob['comp.f'] = f[i]
+            prob['comp.V1'] = V1[i]
+            prob['comp.V_s'] = perf['V_s'][i]
+            prob.run()
+
+            assert np.isclose(perf['slip_ratio'][i], prob['comp.slip_ratio'])
+            assert np.isclose(perf['thrust'][i], prob['comp.thrust'], rtol=1e-6)
+
+    def test_optimal_slip(self):
+
+        # closed form against a brute force search of the thrust at fixed frequency
+        R2 = np.array([.082, .01, 1e-6])
+        S = np.linspace(1e-4, 1.0 - 1e-4, 200001)[:, np.newaxis]
+        g = S * (1.0 - S) / (R2**2 + S**2 * lim_map.DEFAULT_LIM['X_m']**2)
+        assert np.allclose(lim_map.optimal_slip(R2), S[np.argmax(g, axis=0), 0], atol=1e-4)
+
+        schedule = lim_map.frequency_schedule(np.linspace(1.0, 300.0, 50))
+        assert np.allclose(schedule['slip_ratio'], lim_map.optimal_slip())
+
+    def test_acceleration_run(self):
+
+        run = lim_map.acceleration_run(15000.0, 300.0, f_max=2000.0)
+
+        assert np.all(np.diff(run['time']) > 0.0)
+        assert np.all(np.diff(run['distance']) > 0.0)
+        assert np.all(run['f'] <= 2000.0)
+        # once frequency limited the slip falls below optimal
+        limited = run['f'] == 2000.0
+        assert np.any(limited)
+        assert np.all(run['slip_ratio'][limited] < lim_map.optimal_slip())
+
+    def test_acceleration_run_above_synchronous(self):
+
+        # V_s = 2*pole_pitch*f_max = 271.8 m/s, so 300 m/s is never reached
+        with pytest.raises(ValueError):
+            lim_map.acceleration_run(15000.0, 300.0, f_max=1000.0)
+
+    def test_thrust_map(self):
+
+        thrust_map = lim_map.build_thrust_map(300.0, 2500.0)
+        V_r = np.array([12.0, 150.0, 280.0])
+        f = np.array([100.0, 1200.0, 2300.0])
+        exact = lim_map.slim_thrust(V_r, f)
+
+        assert np.allclose(thrust_map.efficiency(V_r, f), exact['efficiency'], atol=1e-2)
+        assert np.allclose(thrust_map.thrust(V_r, f), exact['thrust'], rtol=1e-2)
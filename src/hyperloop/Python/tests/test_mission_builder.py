@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+
+from hyperloop.Python.mission import mission_builder
+
+TRIP = [{'kind': 'boost', 'v_final': 300.0},
+        {'kind': 'cruise', 'distance': 10000.0},
+        {'kind': 'grade', 'distance': 3000.0, 'theta': .02},
+        {'kind': 'coast', 'distance': 2000.0},
+        {'kind': 'brake', 'v_final': 0.0}]
+
+
+class TestMissionBuilder(object):
+    def test_segments_are_continuous(self):
+
+        history = mission_builder.simulate_segments(TRIP)
+
+        assert [sim['kind'] for sim in history] == [segment['kind'] for segment in TRIP]
+        for prev, sim in zip(history[:-1], history[1:]):
+            for key in ('t', 'x', 'z', 'v'):
+                assert sim[key][0] == prev[key][-1]
+
+    def test_end_conditions(self):
+
+        boost, cruise, grade, coast, brake = mission_builder.simulate_segments(TRIP)
+
+        assert np.isclose(boost['v'][-1], 300.0)
+        assert np.all(np.diff(boost['v']) > 0.0)
+
+        # cruise and grade thrust holds the entry speed
+        assert np.allclose(cruise['v'], 300.0)
+        assert np.allclose(grade['v'], 300.0)
+        assert np.isclose(cruise['x'][-1] - cruise['x'][0], 10000.0)
+        assert np.isclose(grade['z'][-1] - grade['z'][0], -3000.0 * np.tan(.02))
+
+        assert coast['thrust'] == 0.0
+        assert coast['v'][-1] < coast['v'][0]
+
+        assert np.isclose(brake['v'][-1], 0.0)
+        assert brake['thrust'] == mission_builder.SEGMENT_THRUST['brake']
+
+    def test_brake_distance_too_long(self):
+
+        # braking from 50 m/s stops well short of 5 km
+        with pytest.raises(ValueError) as err:
+            mission_builder.simulate_segments([{'kind': 'boost', 'v_final': 50.0},
+                                               {'kind': 'brake', 'distance': 5000.0}])
+        assert 'brake segment 1 comes to rest' in str(err.value)
+
+        boost, brake = mission_builder.simulate_segments([{'kind': 'boost', 'v_final': 50.0},
+                                                          {'kind': 'brake', 'distance': 50.0}])
+        assert np.isclose(brake['x'][-1] - brake['x'][0], 50.0)
+        assert np.all(brake['v'] > 0.0)
+
+    def test_cruise_from_rest(self):
+
+        with pytest.raises(ValueError) as err:
+            mission_builder.simulate_segments([{'kind': 'cruise', 'distance': 1000.0}])
+        assert 'cruise segment 0 comes to rest after 0.0 m' in str(err.value)
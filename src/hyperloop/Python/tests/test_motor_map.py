@@ -0,0 +1,29 @@
+import numpy as np
+
+from hyperloop.Python.pod.drivetrain import motor_map
+
+
+class TestMotorMap(object):
+    def test_closed_form_balance(self):
+
+        speed = np.linspace(100.0, 3500.0, 35)[:, np.newaxis]
+        torque = np.linspace(0.0, 1.6, 17)[np.newaxis, :]
+        perf = motor_map.motor_performance(speed, torque, .48, .4, .03, 1.6)
+
+        # current*voltage = power_input is the balance MotorBalance drives to zero
+        assert perf['I0'].shape == (35, 17)
+        assert np.allclose(perf['current'] * perf['voltage'], perf['power_input'])
+        assert np.all((perf['efficiency'] >= 0.0) & (perf['efficiency'] < 1.0))
+
+    def test_map_interpolation(self, tmpdir):
+
+        file_name = str(tmpdir.join('motor_map.npz'))
+        motor_map.build_motor_map(.48, .4, .03, 1.6, 3500.0, file_name=file_name)
+        loaded = motor_map.MotorMap.load(file_name)
+
+        speed = np.array([520.0, 1333.0, 3100.0])
+        torque = np.array([.3, .81, 1.52])
+        exact = motor_map.motor_performance(speed, torque, .48, .4, .03, 1.6)
+
+        assert np.allclose(loaded.efficiency(speed, torque), exact['efficiency'], atol=1e-3)
+        assert np.allclose(loaded.power_input(speed, torque), exact['power_input'], rtol=1e-3)
@@ -0,0 +1,102 @@
+import numpy as np
+
+from hyperloop.Python.mission import passenger_comfort
+from hyperloop.Python.tests.util import create_problem
+
+PARAMS = ('v', 'theta', 'phi', 'kappa_h', 'kappa_v', 'dkappa_h_ds', 'dkappa_v_ds', 'v_dot', 'phi_dot', 'g')
+
+
+def comfort_problem(nn):
+    return create_problem(passenger_comfort.PassengerComfort(num_nodes=nn), names=PARAMS)
+
+
+class TestPassengerComfort(object):
+    def test_coordinated_bank(self):
+
+        prob = comfort_problem(3)
+        prob.setup(check=False)
+
+        # straight and level, a 5 km turn banked to cancel the lateral load, and unbanked
+        kappa = np.array([0.0, 1.0 / 5000.0, 1.0 / 5000.0])
+        prob['des_vars.v'] = 335.0 * np.ones(3)
+        prob['des_vars.kappa_h'] = kappa
+        prob['des_vars.phi'] = np.array([0.0, np.arctan(335.0**2 / 5000.0 / 9.81), 0.0])
+        prob.run()
+
+        assert np.allclose(prob['comp.a_lat'], [0.0, 0.0, 335.0**2 / 5000.0])
+        assert np.allclose(prob['comp.a_vert'], [9.81, np.hypot(9.81, 335.0**2 / 5000.0), 9.81])
+        assert np.allclose(prob['comp.jerk_lat'], 0.0)
+        assert np.allclose(prob['comp.jerk_vert'], 0.0)
+
+    def test_jerk_along_spiral(self):
+
+        # accelerate and roll into a clothoid crest; jerk against differenced accelerations
+        dt = 1e-3
+        t = np.array([-dt, 0.0, dt])
+        v0, v_dot = 200.0, 2.0
+        v = v0 + v_dot * t
+        s = v0 * t + .5 * v_dot * t**2
+        kh0, dkh = 1e-4, 2e-8
+        kv0, dkv = 5e-5, -1e-8
+        kappa_v = kv0 + dkv * s
+        theta = .02 + kv0 * s + .5 * dkv * s**2
+        phi_dot = .01
+
+        prob = comfort_problem(3)
+        prob.setup(check=False)
+        prob['des_vars.v'] = v
+        prob['des_vars.theta'] = theta
+        prob['des_vars.phi'] = .1 + phi_dot * t
+        prob['des_vars.kappa_h'] = kh0 + dkh * s
+        prob['des_vars.kappa_v'] = kappa_v
+        prob['des_vars.dkappa_h_ds'] = dkh * np.ones(3)
+        prob['des_vars.dkappa_v_ds'] = dkv * np.ones(3)
+        prob['des_vars.v_dot'] = v_dot * np.ones(3)
+        prob['des_vars.phi_dot'] = phi_dot * np.ones(3)
+        prob.run()
+
+        for name in ('lat', 'vert'):
+            a = prob['comp.a_%s' % name]
+            assert np.isclose(prob['comp.jerk_%s' % name][1], (a[2] - a[0]) / (2.0 * dt), rtol=1e-5)
+
+    def test_partials(self):
+
+        nn = 4
+        prob = comfort_problem(nn)
+        prob.setup(check=False)
+        prob['des_vars.v'] = np.linspace(100.0, 300.0, nn)
+        prob['des_vars.theta'] = np.linspace(-.1, .1, nn)
+        prob['des_vars.phi'] = np.linspace(0.0, .3, nn)
+        prob['des_vars.kappa_h'] = np.linspace(1e-4, 3e-4, nn)
+        prob['des_vars.kappa_v'] = np.linspace(-1e-4, 1e-4, nn)
+        prob['des_vars.dkappa_h_ds'] = 1e-7 * np.ones(nn)
+        prob['des_vars.dkappa_v_ds'] = -1e-7 * np.ones(nn)
+        prob['des_vars.v_dot'] = np.ones(nn)
+        prob['des_vars.phi_dot'] = np.linspace(0.0, .03, nn)
+        prob.root.comp.deriv_options['check_step_size'] = 1e-7
+        prob.run()
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        assert len(data['comp']) == 40
+        for key, err in data['comp'].items():
+            assert err['rel error'][0] < 1e-4 or err['abs error'][0] < 1e-6, key
+
+    def test_track_curvature(self):
+
+        prob = create_problem(passenger_comfort.TrackCurvature(num_nodes=3),
+                              {'v': np.array([0.0, 100.0, 335.0]),
+                               'theta': np.array([0.0, .1, -.05]),
+                               'psi_dot': np.array([0.0, .02, 335.0 / 5000.0]),
+                               'theta_dot': np.array([0.0, -.01, .03])})
+        prob.setup(check=False)
+        prob.run()
+
+        # at rest the curvature of a straight track is zero, not nan
+        assert np.allclose(prob['comp.kappa_h'], [0.0, .02 / (100.0 * np.cos(.1)), 1.0 / (5000.0 * np.cos(.05))])
+        assert np.allclose(prob['comp.kappa_v'], [0.0, -1e-4, .03 / 335.0])
+
+        prob['des_vars.v'][0] = 50.0
+        prob.run()
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, err in data['comp'].items():
+            assert err['rel error'][0] < 1e-5 or err['abs error'][0] < 1e-8, key
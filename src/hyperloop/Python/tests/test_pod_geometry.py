@@ -1,7 +1,8 @@
 import numpy as np
-from openmdao.api import Group, Problem
+from openmdao.api import Group, Problem, IndepVarComp
 
 from hyperloop.Python.pod import pod_geometry
+from hyperloop.Python.tests import util
 
 def create_problem(component):
     root = Group()
@@ -51,3 +52,34 @@ class TestMissionDrag(object):
         assert np.isclose(prob['comp.L_pod'], 18.921240, rtol = 0.01)
         assert np.isclose(prob['comp.S'], 30.435701, rtol = 0.01)
 
+    def test_batch_matches_scalar(self):
+
+        M_pod = np.array([.3, .6, .8])
+        prc = np.array([8.0, 12.5, 20.0])
+
+        prob = create_problem(pod_geometry.PodGeometry(num_nodes=3))
+        prob.setup(check=False)
+        prob['comp.M_pod'] = M_pod
+        prob['comp.prc'] = prc
+        prob.run()
+
+        for i in range(3):
+            scalar = create_problem(pod_geometry.PodGeometry())
+            scalar.setup(check=False)
+            scalar['comp.M_pod'] = M_pod[i]
+            scalar['comp.prc'] = prc[i]
+            scalar.run()
+
+            for name in ('A_pod', 'D_pod', 'L_pod', 'S'):
+                assert np.isclose(prob['comp.%s' % name][i], scalar['comp.%s' % name])
+
+    def test_partials(self):
+
+        values = {'M_pod': np.array([0.0, .5, .9]), 'A_inlet': np.array([.8, 1.1, 1.5])}
+        prob = util.create_problem(pod_geometry.PodGeometry(num_nodes=3), values=values)
+        prob.setup(check=False)
+        prob.run()
+
+        data = prob.check_partial_derivatives(out_stream=None)
+        for key, val in data['comp'].items():
+            assert val['rel error'][0] < 1e-4 or val['abs error'][0] < 1e-6
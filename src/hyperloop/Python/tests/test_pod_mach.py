@@ -2,6 +2,7 @@ import numpy as np
 from openmdao.api import Group, Problem
 
 from hyperloop.Python.pod import pod_mach
+from hyperloop.Python.tests import util
 
 def create_problem(component):
     root = Group()
@@ -38,3 +39,34 @@ class TestPodMach(object):
 
         assert np.isclose(prob['comp.Re'], 3278799.304354, rtol=0.1)
         assert np.isclose(prob['comp.A_tube'], 18.600833, rtol=0.1)
+
+    def test_speed_schedule_matches_scalar(self):
+
+        M_pod = np.array([0.0, .3, .6, .7, .8])
+
+        prob = create_problem(pod_mach.PodMach(num_nodes=len(M_pod)))
+        prob.setup()
+        prob['comp.M_pod'] = M_pod
+        prob.run()
+
+        for i, M in enumerate(M_pod):
+            scalar = create_problem(pod_mach.PodMach())
+            scalar.setup()
+            scalar['comp.M_pod'] = M
+            scalar.run()
+
+            for name in ('pwr_comp', 'A_inlet', 'A_tube', 'A_bypass', 'Re'):
+                assert np.isclose(prob['comp.' + name][i], scalar['comp.' + name])
+
+    def test_partials(self):
+
+        prob = util.create_problem(pod_mach.PodMach(num_nodes=3))
+        prob.setup(check=False)
+        prob['des_vars.M_pod'] = np.array([.4, .7, .8])
+        prob['des_vars.mu'] = np.ones(3)
+        prob.run()
+
+        data = prob.check_partial_derivatives(out_stream=None)
+
+        for key, err in data['comp'].items():
+            assert err['rel error'][0] < 1.0e-4 or err['abs error'][0] < 1.0e-6, key
@@ -0,0 +1,105 @@
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import Group, Problem, Component, IndepVarComp, ScipyGMRES
+
+from hyperloop.Python.tools.solvers import AitkenGaussSeidel, RecordedNewton
+
+
+class Link(Component):
+    # y = a*u + x
+    def __init__(self, a):
+        super(Link, self).__init__()
+        self.a = a
+        self.add_param('u', 0.0)
+        self.add_param('x', 0.0)
+        self.add_output('y', 0.0)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        unknowns['y'] = self.a * params['u'] + params['x']
+
+    def linearize(self, params, unknowns, resids):
+        return {('y', 'u'): self.a, ('y', 'x'): 1.0}
+
+
+def create_problem(solver):
+    # y1 = -.9*y2 + x, y2 = .9*y1 has the fixed point y1 = x/1.81, y2 = .9*y1.
+    # Gauss-Seidel oscillates about it and reduces the error by .81 per iteration
+    root = Group()
+    prob = Problem(root)
+    root.add('x', IndepVarComp('x', 1.0))
+    root.add('d1', Link(-.9))
+    root.add('d2', Link(.9))
+    root.connect('x.x', 'd1.x')
+    root.connect('d1.y', 'd2.u')
+    root.connect('d2.y', 'd1.u')
+    root.nl_solver = solver
+    root.ln_solver = ScipyGMRES()
+    root.nl_solver.options['atol'] = 1e-10
+    root.nl_solver.options['rtol'] = 1e-12
+    root.nl_solver.options['maxiter'] = 500
+    return prob
+
+
+class TestSolvers(object):
+    def test_aitken_gauss_seidel(self):
+        counts = {}
+        for aitken in (False, True):
+            solver = AitkenGaussSeidel()
+            solver.options['aitken'] = aitken
+            prob = create_problem(solver)
+            prob.setup(check=False)
+            prob.run()
+
+            assert np.isclose(prob['d1.y'], 1.0 / 1.81, rtol=1e-8)
+            assert np.isclose(prob['d2.y'], .9 / 1.81, rtol=1e-8)
+            assert solver.history.solves[-1]['converged']
+            counts[aitken] = solver.history.iter_count
+
+        assert counts[True] < counts[False] / 4
+
+    def test_history(self):
+        solver = AitkenGaussSeidel()
+        solver.options['aitken'] = False
+        prob = create_problem(solver)
+        prob.setup(check=False)
+        prob.run()
+        prob['x.x'] = 2.0
+        prob.run()
+
+        history = solver.history
+        assert len(history.solves) == 2
+        for solve in history.solves:
+            assert np.array_equal(solve['iteration'], np.arange(1, len(solve['iteration']) + 1))
+            assert solve['iteration'][-1] == solver.iter_count
+            assert np.all(np.diff(solve['time']) >= 0.0)
+            assert np.allclose(solve['norm'][2:] / solve['norm'][1:-1], .81, rtol=1e-4)
+            assert solve['norm'][-1] < 1e-10
+
+        summary = history.summary()
+        assert np.array_equal(summary['iter_count'], [s['iteration'][-1] for s in history.solves])
+        assert summary['converged'].all()
+        assert history.wall_time == history.solves[-1]['time'][-1]
+
+    def test_history_maxiter(self):
+        solver = AitkenGaussSeidel()
+        solver.options['aitken'] = False
+        prob = create_problem(solver)
+        solver.options['maxiter'] = 5
+        solver.options['iprint'] = -1
+        prob.setup(check=False)
+        prob.run()
+
+        assert solver.history.iter_count == 5
+        assert not solver.history.solves[-1]['converged']
+
+    def test_recorded_newton(self):
+        prob = create_problem(RecordedNewton())
+        prob.setup(check=False)
+        prob.run()
+
+        history = prob.root.nl_solver.history
+        assert np.isclose(prob['d1.y'], 1.0 / 1.81)
+        assert history.solves[-1]['converged']
+        assert history.iter_count == prob.root.nl_solver.iter_count
+        assert history.iter_count <= 2
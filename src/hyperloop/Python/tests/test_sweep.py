@@ -0,0 +1,76 @@
+import numpy as np
+from openmdao.api import Component, Group, Problem, IndepVarComp
+
+from hyperloop.Python.pod import pod_sweep
+from hyperloop.Python.tools import sweep
+from hyperloop.Python.tests.util import cycle_training_data
+
+
+class SquareRoot(Component):
+    def __init__(self):
+        super(SquareRoot, self).__init__()
+        self.add_param('x', val=1.0)
+        self.add_output('y', val=1.0)
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        if params['x'] < 0.0:
+            raise ValueError('negative x')
+        unknowns['y'] = np.sqrt(params['x'])
+
+
+def square_root_problem():
+    prob = Problem(Group())
+    prob.root.add('des_vars', IndepVarComp('x', 1.0))
+    prob.root.add('comp', SquareRoot())
+    prob.root.connect('des_vars.x', 'comp.x')
+    return prob
+
+
+class TestSweep(object):
+    def test_latin_hypercube(self):
+
+        cases = sweep.latin_hypercube({'x': (0.0, 1.0), 'y': (10.0, 20.0)}, 50, seed=1)
+
+        assert list(cases) == ['x', 'y']
+        # one sample in each stratum of each variable
+        assert np.array_equal(np.sort(np.floor(cases['x'] * 50)), np.arange(50))
+        assert np.array_equal(np.sort(np.floor((cases['y'] - 10.0) * 5)), np.arange(50))
+
+    def test_pod_sweep(self, tmpdir, monkeypatch):
+
+        monkeypatch.setenv('HYPERLOOP_CACHE', str(tmpdir))
+        np.savez(str(tmpdir.join('samples.npz')), **cycle_training_data(60))
+
+        cases = sweep.latin_hypercube(pod_sweep.SWEEP_BOUNDS, 12, seed=0)
+        serial = sweep.run_sweep(pod_sweep.pod_sizing_problem, cases, pod_sweep.SWEEP_OUTPUTS,
+                                 str(tmpdir.join('serial')), num_workers=0, chunk_size=5,
+                                 factory_args=('samples.npz', ))
+        parallel = sweep.run_sweep(pod_sweep.pod_sizing_problem, cases, pod_sweep.SWEEP_OUTPUTS,
+                                   str(tmpdir.join('parallel')), num_workers=2, chunk_size=5,
+                                   factory_args=('samples.npz', ))
+
+        assert np.all(serial['success'] == 1.0)
+        assert np.array_equal(serial['case'], np.arange(12))
+        for name in list(cases) + pod_sweep.SWEEP_OUTPUTS:
+            assert np.allclose(serial[name], parallel[name])
+
+        prob = pod_sweep.pod_sizing_problem('samples.npz')
+        prob.setup(check=False)
+        for name, vals in cases.items():
+            prob[name] = vals[7]
+        prob.run()
+        assert np.isclose(serial['pod.A_tube'][7], prob['pod.A_tube'])
+
+    def test_failed_cases(self, tmpdir):
+
+        cases = {'des_vars.x': np.array([4.0, -1.0, 9.0, -2.0])}
+        path = str(tmpdir.join('sweep'))
+        data = sweep.run_sweep(square_root_problem, cases, ['comp.y'], path, num_workers=0, chunk_size=3)
+
+        assert np.array_equal(data['success'], [1.0, 0.0, 1.0, 0.0])
+        assert np.allclose(data['comp.y'][[0, 2]], [2.0, 3.0])
+        assert np.all(np.isnan(data['comp.y'][[1, 3]]))
+
+        errors = sweep.read_errors(path)
+        assert sorted(errors) == [1, 3]
+        assert 'ValueError: negative x' in errors[1]
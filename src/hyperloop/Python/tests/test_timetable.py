@@ -0,0 +1,66 @@
+import numpy as np
+
+from hyperloop.Python.mission import timetable
+
+
+def create_network():
+    network = timetable.TrackNetwork(ds=100.0, v_line=300.0, a_accel=2.0, a_brake=2.0)
+    for name in ('A', 'B', 'C'):
+        network.add_station(name)
+    network.add_junction('J')
+
+    network.add_link('A', 'J', 40000.0)
+    network.add_link('J', 'B', 30000.0, kappa_h=1.0 / 2000.0)
+    network.add_link('J', 'C', 50000.0)
+    network.add_link('B', 'C', 200000.0)
+    return network
+
+
+class TestTimetable(object):
+    def test_straight_trip(self):
+        # accelerate to line speed, cruise and brake
+        v_lim = 300.0 * np.ones(1001)
+        v, time = timetable.speed_profile(v_lim, 100.0, a_accel=2.0, a_brake=2.0)
+
+        assert v[0] == 0.0 and v[-1] == 0.0
+        assert np.isclose(np.max(v), 300.0)
+        assert np.isclose(time, 100000.0 / 300.0 + 300.0 / 2.0, rtol=1e-2)
+
+    def test_curve_speed_limit(self):
+        # unbanked, the lateral load is v**2*kappa
+        v = timetable.curve_speed_limit(1.0 / 5000.0, a_lat_max=1.0, phi_max=0.0)
+        assert np.isclose(v, np.sqrt(5000.0))
+        assert timetable.curve_speed_limit(0.0, 0.0) == np.inf
+
+        # banking raises the limit
+        assert timetable.curve_speed_limit(1.0 / 5000.0) > v
+
+    def test_routes_and_times(self):
+        network = create_network()
+        times = network.timetable()
+
+        assert network.trip('A', 'C')['route'] == ['A', 'J', 'C']
+        assert network.trip('B', 'C')['route'] == ['B', 'J', 'C']
+        assert np.allclose(times, times.T)
+        assert np.all(np.diag(times) == 0.0)
+
+        # the curve slows trips through J - B below line speed
+        trip = network.trip('A', 'B')
+        on_curve = trip['s'] > 41000.0
+        assert np.all(trip['v'][on_curve] <= timetable.curve_speed_limit(1.0 / 2000.0) + 1e-9)
+
+    def test_profiles_are_cached(self):
+        network = create_network()
+        network.timetable()
+
+        assert len(network._profiles) == 6
+        assert len(network._limits) == len(network.links)
+        assert network.trip('A', 'B') is network.trip('A', 'B')
+
+    def test_mission_segments(self):
+        network = create_network()
+        boost, cruise, brake = network.mission_segments('A', 'C')
+
+        assert np.isclose(boost['v_final'], 300.0, atol=1.0)
+        assert cruise['distance'] > 0.0
+        assert brake['v_final'] == 0.0
@@ -0,0 +1,59 @@
+import numpy as np
+
+from hyperloop.Python.mission import trip_energy
+
+
+def lgl_grid(t0, tf, num_seg, seg_ncn):
+    x, _ = trip_energy.lgl_nodes(seg_ncn)
+    bounds = np.linspace(t0, tf, num_seg + 1)
+    return np.concatenate([bounds[i] + .5 * (x + 1.0) * (bounds[i + 1] - bounds[i]) for i in range(num_seg)])
+
+
+class TestTripEnergy(object):
+    def test_lgl_quadrature(self):
+
+        for n in (3, 4, 5, 8):
+            x, w = trip_energy.lgl_nodes(n)
+            assert np.isclose(np.sum(w), 2.0)
+            # exact up to degree 2n - 3
+            assert np.isclose(np.sum(w * x**(2 * n - 4)), 2.0 / (2 * n - 3))
+
+        time = lgl_grid(0.0, 10.0, 3, 4)
+        weights = trip_energy.collocation_weights(time, 3, 4)
+        assert np.isclose(np.sum(weights * time**4), 10.0**5 / 5.0)
+
+        trapz = trip_energy.collocation_weights(time)
+        assert np.isclose(np.sum(trapz * time), 50.0)
+
+    def test_batch(self):
+
+        num_seg, seg_ncn = 3, 5
+        time = lgl_grid(0.0, 300.0, num_seg, seg_ncn)
+        v = 335.0 * np.sin(np.pi * time / 300.0)
+        v_dot = 335.0 * np.pi / 300.0 * np.cos(np.pi * time / 300.0)
+        mass = np.array([[2000.0], [3100.0], [4000.0]])
+
+        batch = trip_energy.trip_energy(time * np.ones((3, 1)), v * np.ones((3, 1)), v_dot * np.ones((3, 1)),
+                                        num_seg, seg_ncn, mass=mass)
+        assert batch['total'].shape == (3,)
+
+        for i in range(3):
+            single = trip_energy.trip_energy(time, v, v_dot, num_seg, seg_ncn, mass=mass[i, 0])
+            for name in ('propulsion', 'compressor', 'vacuum', 'total'):
+                assert np.isclose(batch[name][i], single[name])
+
+        assert np.allclose(batch['total'], batch['propulsion'] + batch['compressor'] + batch['vacuum'])
+        assert np.allclose(batch['duration'], 300.0)
+
+    def test_cruise(self):
+
+        time = lgl_grid(0.0, 1000.0, 2, 4)
+        v = 300.0 * np.ones(time.size)
+        energy = trip_energy.trip_energy(time, v, np.zeros(time.size), 2, 4,
+                                         vacuum_power=1.0e5, pods_in_tube=4.0)
+
+        # drag of PodThrustAndDrag, which has no drag coefficient
+        rho = 850.0 / (287.0 * 298.0)
+        drag = .5 * rho * 300.0**2 * 1.4 + 150.0
+        assert np.isclose(energy['propulsion'], drag * 300.0 * 1000.0 / .8)
+        assert np.isclose(energy['vacuum'], 1.0e5 / 4.0 * 1000.0)
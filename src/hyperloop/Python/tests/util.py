@@ -0,0 +1,37 @@
+"""
+Problems for testing a single component, and stand-in data for models that need pycycle.
+"""
+from openmdao.api import Group, Problem, IndepVarComp
+
+from hyperloop.Python.pod.cycle import cycle_surrogate
+from hyperloop.Python.tools.sweep import latin_hypercube
+
+
+def create_problem(component, values=None, names=None):
+    """
+    Problem with the component as 'comp' and its params, or only the given names, connected
+    to an IndepVarComp 'des_vars' with their default values, unless given in values
+    """
+    values = values or {}
+
+    prob = Problem(Group())
+    prob.root.add('comp', component)
+
+    # params the component declares, before setup
+    meta = component._init_params_dict
+    params = [(name, values.get(name, meta[name]['val'])) for name in names or meta]
+    prob.root.add('des_vars', IndepVarComp(params))
+    for name, val in params:
+        prob.root.connect('des_vars.%s' % name, 'comp.%s' % name)
+    return prob
+
+
+def cycle_training_data(num_samples):
+    """Smooth stand-in for the FlowPath samples CycleSurrogate is trained on, which need pycycle"""
+    bounds = dict((name, meta[2]) for name, meta in cycle_surrogate.SURROGATE_INPUTS.items())
+    data = dict(latin_hypercube(bounds, num_samples, seed=1))
+    scale = (1.0 + data['vehicleMach']**2) * data['P'] * data['W'] * data['PRdes']**.3
+    for element, outputs in cycle_surrogate.SURROGATE_OUTPUTS.items():
+        for i, (name, units) in enumerate(outputs):
+            data['%s.%s' % (element, name)] = (i + 1.0) * scale + .01 * data['T']
+    return data
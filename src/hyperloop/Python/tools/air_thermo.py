@@ -0,0 +1,137 @@
+"""
+Ideal gas thermodynamic properties of air.
+For pure air the chemical equilibrium solve done by pycycle's janaf thermo reduces to an ideal gas
+with temperature dependent Cp.  air_properties evaluates h, s, Cp and gamma in closed form from
+the Cp polynomial for air in Cengel & Boles (Table A-2c), and air_property_derivs gives their
+exact T and P derivatives.
+
+AirFlowStart uses them in place of pycycle's FlowStart for components that only need the total
+conditions of an air flow station, such as the nozzle_air and bearing_air stations of TubeTemp.
+"""
+from __future__ import print_function
+
+import numpy as np
+from openmdao.api import Component
+from openmdao.units.units import convert_units as cu
+
+MW_AIR = 28.97  # kg/kmol
+R_AIR = 8314.4598 / MW_AIR  # J/(kg*K)
+CP_COEFFS = (28.11, 0.1967e-2, 0.4802e-5, -1.966e-9)  # Cp = a + b*T + c*T**2 + d*T**3, kJ/(kmol*K)
+T_REF = 298.15  # K, h = s = 0 at T_REF, P_REF
+P_REF = 101325.0  # Pa
+
+PROPERTIES = ('h', 's', 'Cp', 'gamma')
+
+
+def air_cp(T):
+    """Specific heat at constant pressure of air, J/(kg*K)"""
+    a, b, c, d = CP_COEFFS
+    return (a + b * T + c * T**2 + d * T**3) * 1000.0 / MW_AIR
+
+
+def air_properties(T, P):
+    """Exact ideal gas properties of air at T (K) and P (Pa): h (J/kg), s (J/(kg*K)), Cp (J/(kg*K)) and gamma"""
+    a, b, c, d = CP_COEFFS
+    k = 1000.0 / MW_AIR
+
+    def _h(T):
+        return a * T + b / 2.0 * T**2 + c / 3.0 * T**3 + d / 4.0 * T**4
+
+    def _s0(T):
+        return a * np.log(T) + b * T + c / 2.0 * T**2 + d / 3.0 * T**3
+
+    Cp = air_cp(T)
+    return {'h': k * (_h(T) - _h(T_REF)),
+            's': k * (_s0(T) - _s0(T_REF)) - R_AIR * np.log(P / P_REF),
+            'Cp': Cp,
+            'gamma': Cp / (Cp - R_AIR)}
+
+
+def air_property_derivs(T, P):
+    """Returns dicts of the partials of the properties of air_properties with respect to T and P"""
+    a, b, c, d = CP_COEFFS
+    T, P = np.broadcast_arrays(np.asarray(T, dtype=float), np.asarray(P, dtype=float))
+
+    Cp = air_cp(T)
+    dCp_dT = (b + 2.0 * c * T + 3.0 * d * T**2) * 1000.0 / MW_AIR
+    dgamma_dCp = -R_AIR / (Cp - R_AIR)**2
+
+    d_dT = {'h': Cp, 's': Cp / T, 'Cp': dCp_dT, 'gamma': dgamma_dCp * dCp_dT}
+    d_dP = {'h': np.zeros(T.shape), 's': -R_AIR / P, 'Cp': np.zeros(T.shape), 'gamma': np.zeros(T.shape)}
+    return d_dT, d_dP
+
+
+class AirFlowStart(Component):
+    """
+    Notes
+    ------
+
+    Air flow station from ideal gas thermodynamics.  Takes the same P, T and W params as
+    pycycle's FlowStart, in the same units, and provides the total condition outputs, so
+    it can replace FlowStart(thermo_data=janaf, elements=AIR_MIX) for pure air.
+
+    Params
+    ------
+    P : float
+        Total pressure. Default value is 14.696 psi
+    T : float
+        Total temperature. Default value is 518.67 degR
+    W : float
+        Mass flow. Default value is 1.0 lbm/s
+
+    Returns
+    -------
+    Fl_O:tot:T, Fl_O:tot:P : float
+        Total temperature and pressure
+    Fl_O:tot:h, Fl_O:tot:S : float
+        Total enthalpy and entropy, zero at 298.15 K and 1 atm
+    Fl_O:tot:Cp, Fl_O:tot:gamma : float
+        Specific heat at constant pressure and ratio of specific heats
+    Fl_O:stat:W : float
+        Mass flow
+    """
+
+    def __init__(self):
+        super(AirFlowStart, self).__init__()
+
+        self.add_param('P', 14.696, desc='total pressure', units='psi')
+        self.add_param('T', 518.67, desc='total temperature', units='degR')
+        self.add_param('W', 1.0, desc='mass flow', units='lbm/s')
+
+        self.add_output('Fl_O:tot:T', 518.67, desc='total temperature', units='degR')
+        self.add_output('Fl_O:tot:P', 14.696, desc='total pressure', units='psi')
+        self.add_output('Fl_O:tot:h', 0.0, desc='total enthalpy', units='Btu/lbm')
+        self.add_output('Fl_O:tot:S', 0.0, desc='total entropy', units='Btu/(lbm*degR)')
+        self.add_output('Fl_O:tot:Cp', 0.24, desc='specific heat at constant pressure', units='Btu/(lbm*degR)')
+        self.add_output('Fl_O:tot:gamma', 1.4, desc='ratio of specific heats')
+        self.add_output('Fl_O:stat:W', 1.0, desc='mass flow', units='lbm/s')
+
+        # unit conversion factors between the properties (SI) and the flow station (English)
+        self._T = cu(1.0, 'degR', 'degK')
+        self._P = cu(1.0, 'psi', 'Pa')
+        self._h = cu(1.0, 'J/kg', 'Btu/lbm')
+        self._s = cu(1.0, 'J/(kg*degK)', 'Btu/(lbm*degR)')
+
+    def solve_nonlinear(self, params, unknowns, resids):
+        props = air_properties(params['T'] * self._T, params['P'] * self._P)
+
+        unknowns['Fl_O:tot:T'] = params['T']
+        unknowns['Fl_O:tot:P'] = params['P']
+        unknowns['Fl_O:tot:h'] = props['h'] * self._h
+        unknowns['Fl_O:tot:S'] = props['s'] * self._s
+        unknowns['Fl_O:tot:Cp'] = props['Cp'] * self._s
+        unknowns['Fl_O:tot:gamma'] = props['gamma']
+        unknowns['Fl_O:stat:W'] = params['W']
+
+    def linearize(self, params, unknowns, resids):
+        d_dT, d_dP = air_property_derivs(params['T'] * self._T, params['P'] * self._P)
+
+        J = {}
+        J['Fl_O:tot:T', 'T'] = 1.0
+        J['Fl_O:tot:P', 'P'] = 1.0
+        J['Fl_O:stat:W', 'W'] = 1.0
+        for out, name, scale in (('Fl_O:tot:h', 'h', self._h), ('Fl_O:tot:S', 's', self._s),
+                                 ('Fl_O:tot:Cp', 'Cp', self._s), ('Fl_O:tot:gamma', 'gamma', 1.0)):
+            J[out, 'T'] = d_dT[name] * scale * self._T
+            J[out, 'P'] = d_dP[name] * scale * self._P
+        return J
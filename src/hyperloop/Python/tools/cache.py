@@ -0,0 +1,112 @@
+"""
+On-disk caching of precomputed data.
+
+Files are stored in a cache directory, by default ~/.hyperloop_cache, which can be moved by
+setting the HYPERLOOP_CACHE environment variable.
+
+ResultCache memoizes the results of expensive analyses, such as converged cycle points, in memory
+with least recently used eviction and optional persistence to the cache directory.
+"""
+from __future__ import print_function
+
+import os
+import pickle
+from collections import OrderedDict
+
+import numpy as np
+
+
+def cache_dir():
+    """Returns the cache directory, creating it if it does not exist"""
+    path = os.environ.get('HYPERLOOP_CACHE',
+                          os.path.join(os.path.expanduser('~'), '.hyperloop_cache'))
+    if not os.path.isdir(path):
+        try:
+            os.makedirs(path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+    return path
+
+
+def cache_path(file_name):
+    """Full path of file_name in the cache directory. Absolute paths are returned unchanged"""
+    if os.path.isabs(file_name):
+        return file_name
+    return os.path.join(cache_dir(), file_name)
+
+
+class ResultCache(object):
+    """
+    Least recently used cache of converged results, keyed by a rounded input vector.
+
+    Each entry stores the outputs of an analysis and, optionally, the full converged state
+    vector, so that a near miss can be used as the starting point for a new solve.
+
+    Params
+    ------
+    maxsize : int
+        Maximum number of entries. The least recently used entry is evicted first
+    sig_digits : int
+        Inputs are rounded to this many significant digits to form the key
+    file_name : str
+        Pickle file in the cache directory (or absolute path) to persist the cache to.
+        Loaded on construction if it exists. None keeps the cache in memory only
+    """
+
+    def __init__(self, maxsize=256, sig_digits=10, file_name=None):
+        self.maxsize = maxsize
+        self.sig_digits = sig_digits
+        self.file_name = file_name
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+        if file_name is not None and os.path.exists(cache_path(file_name)):
+            with open(cache_path(file_name), 'rb') as f:
+                self._entries = OrderedDict(pickle.load(f))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def key(self, x):
+        """Rounded, hashable key for the input vector x"""
+        return tuple(float('%.*e' % (self.sig_digits - 1, xi)) for xi in np.ravel(x))
+
+    def get(self, x):
+        """Returns the (outputs, state) entry stored for x, or None"""
+        key = self.key(x)
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries[key] = entry
+        self.hits += 1
+        return entry
+
+    def nearest(self, x):
+        """Returns the (outputs, state) entry whose inputs are closest to x in relative terms, or None"""
+        if not self._entries:
+            return None
+        x = np.ravel(x)
+        keys = np.array(list(self._entries.keys()))
+        dist = np.sum(((keys - x) / (np.abs(x) + 1e-30))**2, axis=1)
+        return self._entries[tuple(keys[np.argmin(dist)])]
+
+    def put(self, x, outputs, state=None):
+        """Stores the outputs (and converged state vector) for x, evicting the oldest entry if full"""
+        key = self.key(x)
+        self._entries.pop(key, None)
+        self._entries[key] = (outputs, None if state is None else np.array(state))
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def save(self):
+        """Writes the cache to file_name"""
+        if self.file_name is None:
+            return
+        path = cache_path(self.file_name)
+        tmp_path = '%s.%d' % (path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(list(self._entries.items()), f, protocol=2)
+        os.rename(tmp_path, path)
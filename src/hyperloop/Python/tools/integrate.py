@@ -0,0 +1,20 @@
+"""
+Vectorized cumulative integration of sampled histories.
+"""
+from __future__ import print_function
+
+import numpy as np
+
+
+def cumulative_trapezoid(y, t):
+    """
+    Cumulative trapezoid integral of y over t along the last axis, zero at the first node.
+    y may have any leading dimensions; t broadcasts against it.
+    """
+    y = np.asarray(y, dtype=float)
+    t = np.asarray(t, dtype=float)
+    area = 0.5 * (y[..., 1:] + y[..., :-1]) * np.diff(t, axis=-1)
+
+    out = np.zeros(area.shape[:-1] + (area.shape[-1] + 1, ))
+    np.cumsum(area, axis=-1, out=out[..., 1:])
+    return out
@@ -0,0 +1,94 @@
+"""
+Vectorized interpolation on regular (rectilinear) grids with analytic gradients.
+"""
+from __future__ import print_function
+
+import numpy as np
+
+
+class RegularGridInterpolant(object):
+    """
+    Multilinear interpolation of a table defined on a rectilinear grid.
+
+    Unlike scipy.interpolate.RegularGridInterpolator, evaluation also returns the gradient of the
+    interpolant with respect to each coordinate, which is what OpenMDAO components need for their
+    partials.  Points outside the grid are clamped to the boundary, and the gradient along a
+    clamped coordinate is zero.
+
+    Params
+    ------
+    grid : tuple of arrays
+        Strictly increasing coordinates along each of the n dimensions
+    values : array
+        Table values with shape (len(grid[0]), ..., len(grid[n-1]))
+    """
+
+    def __init__(self, grid, values):
+        self.grid = tuple(np.asarray(g, dtype=float) for g in grid)
+        self.values = np.asarray(values, dtype=float)
+        self.ndim = len(self.grid)
+
+        if self.values.shape != tuple(len(g) for g in self.grid):
+            raise ValueError('values has shape %s but the grid has shape %s' %
+                             (self.values.shape, tuple(len(g) for g in self.grid)))
+        for g in self.grid:
+            if len(g) < 2 or np.any(np.diff(g) <= 0.0):
+                raise ValueError('grid coordinates must be strictly increasing with at least two points')
+
+    def __call__(self, *x):
+        """Interpolated values at points x[0], ..., x[n-1], which broadcast together"""
+        return self.evaluate(*x, gradient=False)
+
+    def evaluate(self, *x, **kwargs):
+        """
+        Interpolated values, and optionally gradients, at points x[0], ..., x[n-1].
+
+        Returns
+        -------
+        f : array
+            Interpolated values with the broadcast shape of the inputs
+        df : list of arrays
+            Only if gradient=True. Partial of f with respect to each coordinate
+        """
+        gradient = kwargs.get('gradient', True)
+
+        x = np.broadcast_arrays(*[np.asarray(xi, dtype=float) for xi in x])
+        if len(x) != self.ndim:
+            raise ValueError('expected %d coordinates, got %d' % (self.ndim, len(x)))
+        shape = x[0].shape
+
+        idx = []
+        t = []
+        inv_h = []
+        for g, xi in zip(self.grid, x):
+            xi = xi.ravel()
+            i = np.clip(np.searchsorted(g, xi, side='right') - 1, 0, len(g) - 2)
+            h = g[i + 1] - g[i]
+            ti = (xi - g[i]) / h
+            clamped = (ti < 0.0) | (ti > 1.0)
+            idx.append(i)
+            t.append(np.clip(ti, 0.0, 1.0))
+            inv_h.append(np.where(clamped, 0.0, 1.0 / h))
+
+        n = idx[0].size
+        f = np.zeros(n)
+        df = [np.zeros(n) for d in range(self.ndim)] if gradient else None
+
+        # accumulate the contribution of each of the 2**ndim corners of the enclosing cell
+        for corner in range(2**self.ndim):
+            bits = [(corner >> d) & 1 for d in range(self.ndim)]
+            v = self.values[tuple(i + b for i, b in zip(idx, bits))]
+            w = [ti if b else 1.0 - ti for ti, b in zip(t, bits)]
+
+            f += v * np.prod(w, axis=0)
+
+            if gradient:
+                for d in range(self.ndim):
+                    dw = inv_h[d] if bits[d] else -inv_h[d]
+                    others = [w[k] for k in range(self.ndim) if k != d]
+                    df[d] += v * dw * (np.prod(others, axis=0) if others else 1.0)
+
+        f = f.reshape(shape)
+        if not gradient:
+            return f
+        return f, [dfi.reshape(shape) for dfi in df]
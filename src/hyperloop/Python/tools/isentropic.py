@@ -0,0 +1,165 @@
+"""
+Vectorized isentropic flow relations for a calorically perfect gas.
+
+Forward relations take Mach number and return total-to-static or area ratios.
+The inverse relation, mach_from_area_ratio, is a safeguarded Newton solve that
+handles whole arrays of area ratios at once on either the subsonic or the
+supersonic branch.  All functions broadcast over M (or A/A*) and gam, and the
+derivative helpers give the analytic partials needed by OpenMDAO components.
+
+Area ratios are A/A* where A* is the sonic throat area:
+    f(M) = (1/M)*((2/(gam+1))*(1+((gam-1)/2)*M**2))**((gam+1)/(2*(gam-1)))
+"""
+from __future__ import print_function
+
+import numpy as np
+
+
+def temperature_ratio(M, gam=1.4):
+    """Total to static temperature ratio, Tt/T"""
+    return 1.0 + ((gam - 1.0) / 2.0) * M**2
+
+
+def pressure_ratio(M, gam=1.4):
+    """Total to static pressure ratio, Pt/P"""
+    return temperature_ratio(M, gam)**(gam / (gam - 1.0))
+
+
+def density_ratio(M, gam=1.4):
+    """Total to static density ratio, rhot/rho"""
+    return temperature_ratio(M, gam)**(1.0 / (gam - 1.0))
+
+
+def area_ratio(M, gam=1.4):
+    """Area to sonic throat area ratio, A/A*"""
+    e = (gam + 1.0) / (2.0 * (gam - 1.0))
+    return (1.0 / M) * ((2.0 / (gam + 1.0)) * temperature_ratio(M, gam))**e
+
+
+def mach_to_area(M1, M2, gam=1.4):
+    '''(A2/A1) = f(M2)/f(M1) where f(M) = (1/M)*((2/(gam+1))*(1+((gam-1)/2)*M**2))**((gam+1)/(2*(gam-1)))'''
+    A_ratio = (M1 / M2) * (((1.0 + ((gam - 1.0) / 2.0) * (M2**2.0)) /
+                            (1.0 + ((gam - 1.0) / 2.0) * (M1**2.0)))**(
+                                (gam + 1.0) / (2.0 * (gam - 1.0))))
+    return A_ratio
+
+
+def mass_flow_parameter(M, gam=1.4):
+    """Mass flow parameter, W*sqrt(R*Tt)/(Pt*A*sqrt(gam)) = M*(Tt/T)**(-(gam+1)/(2*(gam-1)))"""
+    e = (gam + 1.0) / (2.0 * (gam - 1.0))
+    return M * temperature_ratio(M, gam)**(-e)
+
+
+def dlnf_dM(M, gam=1.4):
+    '''Derivative of ln(f(M)) with respect to M, where f(M) = A/A* '''
+    return (M**2 - 1.0) / (M * temperature_ratio(M, gam))
+
+
+def dlnf_dgam(M, gam=1.4):
+    '''Derivative of ln(f(M)) with respect to gam, where f(M) = A/A* '''
+    e = (gam + 1.0) / (2.0 * (gam - 1.0))
+    de = -1.0 / (gam - 1.0)**2
+    X = temperature_ratio(M, gam)
+    return de * (np.log(2.0 / (gam + 1.0)) + np.log(X)) + e * (0.5 * M**2 / X - 1.0 / (gam + 1.0))
+
+
+def area_ratio_derivs(M, gam=1.4):
+    """Returns A/A* along with its partials with respect to M and gam"""
+    AR = area_ratio(M, gam)
+    return AR, AR * dlnf_dM(M, gam), AR * dlnf_dgam(M, gam)
+
+
+def mach_from_area_ratio(AR, gam=1.4, supersonic=False, tol=1.0e-12, maxiter=50):
+    """
+    Solves A/A* = AR for Mach number on the subsonic or supersonic branch.
+
+    Newton's method is applied to ln(f(M)) - ln(AR), which is close to linear in ln(M) on both
+    branches.  Every element keeps a bracket on its root and any step that leaves the bracket is
+    replaced by bisection, so the iteration cannot jump to the other branch or diverge.  Only the
+    elements that have not converged are updated on each pass.
+
+    Params
+    ------
+    AR : float or array
+        Area ratio A/A*.  Values below 1 have no solution and return nan
+    gam : float or array
+        Ratio of specific heats. Default value is 1.4
+    supersonic : bool or array
+        Selects the supersonic branch. Default is the subsonic branch
+    tol : float
+        Convergence tolerance on |ln(f(M)) - ln(AR)|
+    maxiter : int
+        Maximum number of Newton iterations
+
+    Returns
+    -------
+    M : float or array
+        Mach number with the broadcast shape of AR, gam and supersonic
+    """
+    AR, gam, supersonic = np.broadcast_arrays(np.asarray(AR, dtype=float),
+                                              np.asarray(gam, dtype=float),
+                                              np.asarray(supersonic, dtype=bool))
+    shape = AR.shape
+    AR = AR.ravel()
+    gam = gam.ravel()
+    supersonic = supersonic.ravel()
+
+    e = (gam + 1.0) / (2.0 * (gam - 1.0))
+    c = (2.0 / (gam + 1.0))**e
+
+    # Brackets on each branch: f is decreasing on (0, 1] and increasing on [1, inf)
+    lo = np.where(supersonic, 1.0, 0.0)
+    hi = np.where(supersonic, np.inf, 1.0)
+
+    # Asymptotic initial guesses: f ~ c/M as M -> 0 and f ~ c*((gam-1)/2)**e*M**(2e-1) as M -> inf
+    M = np.where(supersonic,
+                 np.maximum((AR / (c * ((gam - 1.0) / 2.0)**e))**(1.0 / (2.0 * e - 1.0)), 1.0 + 1.0e-3),
+                 np.minimum(c / AR, 1.0 - 1.0e-3))
+
+    valid = AR >= 1.0
+    active = valid & (AR > 1.0)
+    M[valid & (AR == 1.0)] = 1.0
+    lnAR = np.log(np.where(valid, AR, 1.0))
+
+    for i in range(maxiter):
+        if not active.any():
+            break
+        idx = np.nonzero(active)[0]
+        Mi = M[idx]
+        gi = gam[idx]
+
+        res = np.log(area_ratio(Mi, gi)) - lnAR[idx]
+        done = np.abs(res) < tol
+        active[idx[done]] = False
+
+        # shrink the bracket: on the subsonic branch a positive residual means M is too small
+        sup = supersonic[idx]
+        too_small = (res > 0) != sup
+        lo[idx] = np.where(too_small, Mi, lo[idx])
+        hi[idx] = np.where(too_small, hi[idx], Mi)
+
+        M_new = Mi - res / dlnf_dM(Mi, gi)
+        upper = np.where(np.isinf(hi[idx]), 2.0 * Mi, hi[idx])
+        outside = ~((M_new > lo[idx]) & (M_new < upper))
+        M_new = np.where(outside, 0.5 * (lo[idx] + upper), M_new)
+        M[idx] = np.where(done, Mi, M_new)
+
+    M[~valid] = np.nan
+
+    M = M.reshape(shape)
+    return M[()] if M.ndim == 0 else M
+
+
+def mach_from_area_ratio_derivs(M, gam=1.4):
+    """
+    Partials of the inverse relation M(A/A*, gam), evaluated at a solved Mach number.
+
+    Returns
+    -------
+    dM_dAR : float or array
+        Partial of M with respect to A/A*
+    dM_dgam : float or array
+        Partial of M with respect to gam at constant A/A*
+    """
+    AR, dAR_dM, dAR_dgam = area_ratio_derivs(M, gam)
+    return 1.0 / dAR_dM, -dAR_dgam / dAR_dM
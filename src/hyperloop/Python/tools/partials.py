@@ -0,0 +1,39 @@
+"""
+Elementwise partials of components evaluated at num_nodes points.
+When every output at a node depends only on the params at that node, each partial is a
+diagonal matrix.  Rather than returning dense num_nodes x num_nodes blocks from linearize, a
+component keeps one vector per (output, param) pair and applies them in apply_linear, which
+keeps the memory and time of its partials linear in num_nodes:
+
+    def linearize(self, params, unknowns, resids):
+        self._partials = {('out', 'x'): dout_dx, ...}
+        return {}
+
+    def apply_linear(self, params, unknowns, dparams, dunknowns, dresids, mode):
+        apply_diagonal(self._partials, dparams, dresids, mode)
+
+A param with a single value shared by all nodes gets the sum over the nodes in rev mode.  An
+output with several values per node, of shape (num_nodes, k), takes partials of that shape
+with respect to params of shape (num_nodes,).
+"""
+from __future__ import print_function
+
+import numpy as np
+
+
+def apply_diagonal(partials, dparams, dresids, mode):
+    """Applies the elementwise partials, a dict of (output, param) to value at each node"""
+    for (out, name), val in partials.items():
+        if out not in dresids or name not in dparams:
+            continue
+        dp = dparams[name]
+        if mode == 'fwd':
+            dresids[out] += val * np.reshape(dp, np.shape(dp) + (1, ) * (np.ndim(val) - np.ndim(dp)))
+        else:
+            d = val * dresids[out]
+            if np.size(d) == np.size(dp):
+                dparams[name] += d
+            elif np.ndim(d) > np.ndim(dp) and np.shape(d)[:np.ndim(dp)] == np.shape(dp):
+                dparams[name] += np.reshape(d, np.shape(dp) + (-1, )).sum(axis=-1)
+            else:
+                dparams[name] += np.sum(d)
@@ -0,0 +1,293 @@
+"""
+Instrumented nonlinear solvers.
+ConvergenceHistory is a case recorder that keeps the residual norm and wall time of every
+solver iteration in memory, one record per solve, so a batch of design evaluations can be
+checked for iteration counts and stalls after the fact.  AitkenGaussSeidel and
+RecordedNewton are NLGaussSeidel and Newton with a ConvergenceHistory attached, and
+AitkenGaussSeidel optionally applies Aitken's dynamic relaxation to the Gauss-Seidel update.
+"""
+from __future__ import print_function
+
+import time
+from math import isnan
+
+import numpy as np
+from openmdao.api import NLGaussSeidel, Newton
+from openmdao.core.system import AnalysisError
+from openmdao.recorders.base_recorder import BaseRecorder
+from openmdao.solvers.solver_base import error_wrap_nl
+from openmdao.util.record_util import update_local_meta, create_local_meta
+
+
+class ConvergenceHistory(BaseRecorder):
+    """
+    Records the iteration count, residual norm and wall time of each iteration of the
+    solver it is added to.  A new solve is started by `start`, or automatically when the
+    iteration count does not increase.
+
+    Attributes
+    ----------
+    solves : list of dict
+        One dict per solve with arrays 'iteration', 'norm' and 'time' (s since the start
+        of the solve), and 'converged' once the solver has finished
+    """
+
+    def __init__(self):
+        super(ConvergenceHistory, self).__init__()
+        self.options['record_metadata'] = False
+        self._parallel = True
+        self.solves = []
+        self._t0 = None
+
+    def reset(self):
+        """Clears all recorded solves"""
+        self.solves = []
+        self._t0 = None
+
+    def start(self):
+        """Marks the start of a solve"""
+        self.solves.append({'iteration': [], 'norm': [], 'time': [], 'converged': None})
+        self._t0 = time.time()
+
+    def finish(self, converged):
+        """Marks the end of the current solve"""
+        if self.solves:
+            solve = self.solves[-1]
+            for key in ('iteration', 'norm', 'time'):
+                solve[key] = np.array(solve[key])
+            solve['converged'] = converged
+
+    def record_metadata(self, group):
+        pass
+
+    def record_derivatives(self, derivs, metadata):
+        pass
+
+    def record_iteration(self, params, unknowns, resids, metadata):
+        iteration = metadata['coord'][-1][0]
+        if not self.solves or self.solves[-1]['converged'] is not None or \
+                (len(self.solves[-1]['iteration']) and iteration <= self.solves[-1]['iteration'][-1]):
+            self.start()
+            self._t0 = metadata['timestamp']
+
+        if hasattr(resids, 'norm'):
+            norm = resids.norm()
+        else:
+            norm = np.sqrt(sum(np.sum(np.asarray(val)**2) for val in resids.values()))
+
+        solve = self.solves[-1]
+        solve['iteration'].append(iteration)
+        solve['norm'].append(norm)
+        solve['time'].append(metadata['timestamp'] - self._t0)
+
+    @property
+    def iter_count(self):
+        """Number of iterations of the last solve"""
+        if not self.solves or not len(self.solves[-1]['iteration']):
+            return 0
+        return int(self.solves[-1]['iteration'][-1])
+
+    @property
+    def wall_time(self):
+        """Wall time of the last solve, s"""
+        if not self.solves or not len(self.solves[-1]['time']):
+            return 0.0
+        return float(self.solves[-1]['time'][-1])
+
+    def summary(self):
+        """Iteration counts, wall times and convergence flags of all solves as arrays"""
+        return {'iter_count': np.array([s['iteration'][-1] if len(s['iteration']) else 0
+                                        for s in self.solves]),
+                'wall_time': np.array([s['time'][-1] if len(s['time']) else 0.0 for s in self.solves]),
+                'converged': np.array([bool(s['converged']) for s in self.solves])}
+
+
+class AitkenGaussSeidel(NLGaussSeidel):
+    """
+    Nonlinear Gauss-Seidel with optional Aitken dynamic relaxation and a ConvergenceHistory
+    in `self.history`.  Each iteration is recorded after its residual norm is evaluated.
+
+    With Aitken relaxation the Gauss-Seidel update du_n is scaled by
+
+        theta_n = theta_n-1*(1 - (du_n - du_n-1).du_n/|du_n - du_n-1|**2)
+
+    clipped to [aitken_min_factor, aitken_max_factor].
+
+    Options
+    -------
+    options['aitken'] : bool(True)
+        Set to False for plain Gauss-Seidel.
+    options['aitken_initial_factor'] : float(1.0)
+        Relaxation factor of the first update.
+    options['aitken_min_factor'] : float(0.1)
+        Lower bound on the relaxation factor.
+    options['aitken_max_factor'] : float(1.5)
+        Upper bound on the relaxation factor.
+    """
+
+    def __init__(self):
+        super(AitkenGaussSeidel, self).__init__()
+
+        opt = self.options
+        opt.add_option('aitken', True,
+                       desc='Set to True to use Aitken relaxation.')
+        opt.add_option('aitken_initial_factor', 1.0, lower=0.0,
+                       desc='Relaxation factor of the first update.')
+        opt.add_option('aitken_min_factor', 0.1, lower=0.0,
+                       desc='Lower bound on the Aitken relaxation factor.')
+        opt.add_option('aitken_max_factor', 1.5, lower=0.0,
+                       desc='Upper bound on the Aitken relaxation factor.')
+
+        self.history = ConvergenceHistory()
+        self.add_recorder(self.history)
+
+    @error_wrap_nl
+    def solve(self, params, unknowns, resids, system, metadata=None):
+        """ Solves the system using Gauss Seidel, with Aitken relaxation if enabled.
+
+        Args
+        ----
+        params : `VecWrapper`
+            `VecWrapper` containing parameters. (p)
+
+        unknowns : `VecWrapper`
+            `VecWrapper` containing outputs and states. (u)
+
+        resids : `VecWrapper`
+            `VecWrapper` containing residuals. (r)
+
+        system : `System`
+            Parent `System` object.
+
+        metadata : dict, optional
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+        """
+        atol = self.options['atol']
+        rtol = self.options['rtol']
+        utol = self.options['utol']
+        maxiter = self.options['maxiter']
+        iprint = self.options['iprint']
+        aitken = self.options['aitken']
+        theta_min = self.options['aitken_min_factor']
+        theta_max = self.options['aitken_max_factor']
+
+        self.history.start()
+        self.iter_count = 1
+
+        local_meta = create_local_meta(metadata, system.pathname)
+        system.ln_solver.local_meta = local_meta
+        update_local_meta(local_meta, (self.iter_count,))
+
+        system.children_solve_nonlinear(local_meta)
+
+        if maxiter == 1:
+            self.recorders.record_iteration(system, local_meta)
+            self.history.finish(True)
+            return
+
+        resids = system.resids
+        unknowns_cache = np.zeros(unknowns.vec.shape)
+        delta_prev = None
+        theta = self.options['aitken_initial_factor']
+
+        system.apply_nonlinear(params, unknowns, resids)
+        normval = resids.norm()
+        basenorm = normval if normval > atol else 1.0
+        u_norm = 1.0e99
+
+        self.recorders.record_iteration(system, local_meta)
+
+        if iprint == 2:
+            self.print_norm(self.print_name, system, 1, normval, basenorm)
+
+        while self.iter_count < maxiter and \
+                normval > atol and \
+                normval/basenorm > rtol and \
+                u_norm > utol:
+
+            self.iter_count += 1
+            update_local_meta(local_meta, (self.iter_count,))
+            unknowns_cache[:] = unknowns.vec
+
+            system.children_solve_nonlinear(local_meta)
+
+            if aitken:
+                delta = unknowns.vec - unknowns_cache
+                if delta_prev is not None:
+                    ddelta = delta - delta_prev
+                    den = ddelta.dot(ddelta)
+                    if den > 0.0:
+                        theta = theta * (1.0 - ddelta.dot(delta) / den)
+                        theta = min(max(theta, theta_min), theta_max)
+                unknowns.vec[:] = unknowns_cache + theta * delta
+                delta_prev = delta
+
+            system.apply_nonlinear(params, unknowns, resids)
+            normval = resids.norm()
+            u_norm = np.linalg.norm(unknowns.vec - unknowns_cache)
+
+            self.recorders.record_iteration(system, local_meta)
+
+            if iprint == 2:
+                self.print_norm(self.print_name, system, self.iter_count, normval,
+                                basenorm, u_norm=u_norm)
+
+        if iprint == 1:
+            self.print_norm(self.print_name, system, self.iter_count, normval,
+                            basenorm, u_norm=u_norm)
+
+        fail = self.iter_count >= maxiter or isnan(normval)
+        self.history.finish(not fail)
+
+        if fail:
+            msg = 'FAILED to converge after %d iterations' % self.iter_count
+        else:
+            msg = 'Converged in %d iterations' % self.iter_count
+
+        if iprint > 0 or (fail and iprint > -1):
+            self.print_norm(self.print_name, system, self.iter_count, normval,
+                            basenorm, msg=msg)
+
+        if fail and self.options['err_on_maxiter']:
+            raise AnalysisError("Solve in '%s': AitkenGaussSeidel %s" %
+                                (system.pathname, msg))
+
+
+class RecordedNewton(Newton):
+    """
+    Newton solver with a ConvergenceHistory in `self.history`.  Iterations are recorded
+    after each Newton step; the initial residual is not.
+    """
+
+    def __init__(self):
+        super(RecordedNewton, self).__init__()
+
+        self.history = ConvergenceHistory()
+        self.add_recorder(self.history)
+
+    def solve(self, params, unknowns, resids, system, metadata=None):
+        """ Solves the system with Newton's method and marks the solve in the history.
+
+        Args
+        ----
+        params : `VecWrapper`
+            `VecWrapper` containing parameters. (p)
+
+        unknowns : `VecWrapper`
+            `VecWrapper` containing outputs and states. (u)
+
+        resids : `VecWrapper`
+            `VecWrapper` containing residuals. (r)
+
+        system : `System`
+            Parent `System` object.
+
+        metadata : dict, optional
+            Dictionary containing execution metadata (e.g. iteration coordinate).
+        """
+        self.history.start()
+        try:
+            super(RecordedNewton, self).solve(params, unknowns, resids, system, metadata)
+        finally:
+            converged = self.iter_count < self.options['maxiter'] and not isnan(resids.norm())
+            self.history.finish(converged)
@@ -0,0 +1,244 @@
+"""
+Parallel design sweeps over an OpenMDAO Problem.
+
+Cases from a design-of-experiments table are split into chunks and run on a pool of worker
+processes.  Each worker builds and sets up its Problem once, from a picklable factory function,
+and reuses it for every case it is given.  Results are streamed to a columnar store as chunks
+finish: a directory holding a header.json and one raw float64 file per column, which can be read
+back with read_columns while the sweep is still running.  Cases that raise are recorded with
+success = 0 and nan outputs, and their tracebacks are kept in errors.json, read with read_errors.
+
+    cases = latin_hypercube({'des_vars.M_pod': (.5, .95), 'des_vars.prc': (8.0, 20.0)}, 1000)
+    run_sweep(make_problem, cases, ['pod_mach.A_tube', 'pod_mach.pwr_comp'], 'sweep_out')
+    results = read_columns('sweep_out')
+"""
+from __future__ import print_function
+
+import json
+import os
+import re
+import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+
+def latin_hypercube(bounds, num_cases, seed=None):
+    """
+    Latin hypercube sample over a box.
+
+    Params
+    ------
+    bounds : dict
+        Maps variable path to (lower, upper)
+    num_cases : int
+        Number of cases
+    seed : int
+        Seed for the random number generator
+
+    Returns
+    -------
+    cases : OrderedDict
+        Maps variable path to an array of num_cases values.  Each variable has exactly one
+        value in each of num_cases equal width strata of its range
+    """
+    rng = np.random.RandomState(seed)
+    cases = OrderedDict()
+    for name in sorted(bounds):
+        lower, upper = bounds[name]
+        u = (rng.permutation(num_cases) + rng.uniform(size=num_cases)) / num_cases
+        cases[name] = lower + (upper - lower) * u
+    return cases
+
+
+class ColumnWriter(object):
+    """
+    Appends rows to a columnar store, one raw float64 file per column.
+
+    Params
+    ------
+    path : str
+        Directory to write to.  Created if missing; existing columns are overwritten
+    columns : list of str
+        Column names, e.g. variable paths
+    """
+
+    def __init__(self, path, columns):
+        self.path = path
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+        self.columns = list(columns)
+        self.files = OrderedDict((name, '%03d_%s.f64' % (i, re.sub(r'[^\w.]', '_', name)))
+                                 for i, name in enumerate(self.columns))
+
+        with open(os.path.join(path, 'header.json'), 'w') as f:
+            json.dump({'columns': self.columns, 'files': self.files, 'dtype': '<f8'}, f, indent=2)
+
+        self._handles = dict((name, open(os.path.join(path, file_name), 'wb'))
+                             for name, file_name in self.files.items())
+
+    def write(self, data):
+        """Appends rows. data maps every column name to an array of equal length"""
+        for name in self.columns:
+            self._handles[name].write(np.asarray(data[name], dtype='<f8').tobytes())
+            self._handles[name].flush()
+
+    def close(self):
+        for handle in self._handles.values():
+            handle.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def read_columns(path):
+    """
+    Reads a columnar store written by ColumnWriter.
+
+    Returns
+    -------
+    data : OrderedDict
+        Maps column name to an array of values.  Columns are truncated to the number of
+        complete rows, so a store can be read while a sweep is still writing to it
+    """
+    with open(os.path.join(path, 'header.json')) as f:
+        header = json.load(f)
+
+    data = OrderedDict((name, np.fromfile(os.path.join(path, header['files'][name]),
+                                          dtype=header['dtype']))
+                       for name in header['columns'])
+    num_rows = min(len(col) for col in data.values()) if data else 0
+    return OrderedDict((name, col[:num_rows]) for name, col in data.items())
+
+
+# Problem built by the current worker process, keyed on its factory
+_worker_problem = {}
+
+
+def _get_problem(factory, factory_args):
+    key = (factory, factory_args)
+    if key not in _worker_problem:
+        _worker_problem.clear()
+        prob = factory(*factory_args)
+        prob.setup(check=False)
+        _worker_problem[key] = prob
+    return _worker_problem[key]
+
+
+def read_errors(path):
+    """
+    Reads the failed cases of a sweep.
+
+    Returns
+    -------
+    errors : dict
+        Maps the case number of each failed case to its formatted traceback
+    """
+    file_name = os.path.join(path, 'errors.json')
+    if not os.path.exists(file_name):
+        return {}
+    with open(file_name) as f:
+        return dict((int(case), tb) for case, tb in json.load(f).items())
+
+
+def _run_chunk(factory, factory_args, index, inputs, outputs):
+    """
+    Runs a chunk of cases on this process' Problem. Failed cases give nan outputs, and their
+    formatted tracebacks are returned by case number
+    """
+    prob = _get_problem(factory, factory_args)
+
+    num_cases = len(index)
+    results = OrderedDict((name, np.full(num_cases, np.nan)) for name in outputs)
+    success = np.zeros(num_cases)
+    errors = {}
+
+    for i in range(num_cases):
+        try:
+            for name, vals in inputs.items():
+                prob[name] = vals[i]
+            prob.run()
+        except Exception:
+            errors[int(index[i])] = traceback.format_exc()
+            continue
+        for name in outputs:
+            results[name][i] = prob[name]
+        success[i] = 1.0
+
+    return index, results, success, errors
+
+
+def run_sweep(factory, cases, outputs, path, num_workers=None, chunk_size=16, factory_args=()):
+    """
+    Runs every case of a design of experiments and streams the results to disk.
+
+    Params
+    ------
+    factory : callable
+        Module level function returning a Problem that has not been set up.  It is called once
+        per worker process, with factory_args
+    cases : dict
+        Maps variable path (an IndepVarComp output or unconnected param) to an array of values,
+        one per case
+    outputs : list of str
+        Paths of the scalar variables to record for each case
+    path : str
+        Directory for the columnar store. Columns are 'case', the inputs, the outputs and
+        'success'; rows are in the order cases finish.  The tracebacks of failed cases are
+        written to errors.json in it, see read_errors
+    num_workers : int
+        Number of worker processes. Default is the number of cores. 0 runs the cases in
+        this process
+    chunk_size : int
+        Number of cases sent to a worker at a time
+
+    Returns
+    -------
+    data : OrderedDict
+        Contents of the columnar store, sorted by case
+    """
+    cases = OrderedDict((name, np.asarray(vals, dtype=float)) for name, vals in cases.items())
+    num_cases = len(next(iter(cases.values())))
+    factory_args = tuple(factory_args)
+
+    chunks = []
+    for start in range(0, num_cases, chunk_size):
+        index = np.arange(start, min(start + chunk_size, num_cases))
+        chunks.append((index, OrderedDict((name, vals[index]) for name, vals in cases.items())))
+
+    errors = {}
+
+    def _write(writer, index, results, success, chunk_errors):
+        row = {'case': index, 'success': success}
+        for name, vals in cases.items():
+            row[name] = vals[index]
+        row.update(results)
+        writer.write(row)
+
+        if chunk_errors:
+            errors.update(chunk_errors)
+            with open(os.path.join(path, 'errors.json'), 'w') as f:
+                json.dump(dict((str(case), tb) for case, tb in sorted(errors.items())), f, indent=2)
+
+    columns = ['case'] + list(cases) + list(outputs) + ['success']
+    if os.path.exists(os.path.join(path, 'errors.json')):
+        os.remove(os.path.join(path, 'errors.json'))
+    with ColumnWriter(path, columns) as writer:
+        if num_workers == 0:
+            for index, inputs in chunks:
+                _write(writer, *_run_chunk(factory, factory_args, index, inputs, outputs))
+        else:
+            with ProcessPoolExecutor(max_workers=num_workers) as pool:
+                futures = [pool.submit(_run_chunk, factory, factory_args, index, inputs, outputs)
+                           for index, inputs in chunks]
+                for future in as_completed(futures):
+                    _write(writer, *future.result())
+
+    data = read_columns(path)
+    order = np.argsort(data['case'])
+    return OrderedDict((name, col[order]) for name, col in data.items())
@@ -0,0 +1,172 @@
+"""
+Time domain simulation of a pod launch through a booster section of LIM stator blocks.
+PropulsionMechanics sizes the boost power from an energy balance between the entrance and
+top speeds.  Here the pod speed is integrated in time through a sequence of stator blocks,
+each driven on the optimal slip frequency schedule of lim_map up to its frequency limit,
+against aero drag (pod_drag.pod_drag, as in PodThrustAndDrag) and magnetic levitation drag (as in MagDrag).
+
+Every input may be an array over launch cases, and the block properties arrays over cases x
+blocks, so many pod masses and section layouts are integrated in one pass.
+"""
+from __future__ import print_function
+
+import numpy as np
+
+from hyperloop.Python.lim_map import frequency_schedule
+from hyperloop.Python.mission.pod_drag import pod_drag
+
+
+def boost_forces(x, v, mass, block_start, P1, V1, f_max, S=1.4, p_tube=850.0,
+                 T_ambient=298.0, R=287.0, track_res=3.14e-4, track_ind=3.59023e-6,
+                 lam=0.125658, g=9.81, **lim):
+    """
+    LIM thrust, drag and stator power on pods at positions x and speeds v.
+
+    Params
+    ------
+    x, v : array
+        position in the section (m) and speed (m/s) of each case, shape (n,)
+    mass : array
+        pod mass (kg), shape (n,)
+    block_start : array
+        start position of each stator block, shape (n, n_blocks).  The last entry is the end
+        of the section; no thrust acts beyond it.
+    P1, V1, f_max : array
+        input power (W), voltage (V) and frequency limit (Hz) of each stator block, shape
+        (n, n_blocks - 1)
+
+    Returns
+    -------
+    forces : dict
+        thrust, drag (N), stator power, the air gap power thrust*V_s (W), and slip_ratio,
+        each of shape (n,)
+    """
+    n = x.size
+    block = np.sum(x[:, np.newaxis] >= block_start[:, :-1], axis=1) - 1
+    inside = (block >= 0) & (x < block_start[:, -1])
+    block = np.clip(block, 0, block_start.shape[1] - 2)
+    rows = np.arange(n)
+
+    schedule = frequency_schedule(v, f_max=f_max[rows, block], P1=P1[rows, block],
+                                  V1=V1[rows, block], **lim)
+    thrust = np.where(inside, schedule['thrust'], 0.0)
+
+    # MagDrag with the levitation force equal to the pod weight
+    omega = 2.0 * np.pi * v / lam
+    mag_drag = track_res * mass * g / (omega * track_ind)
+    drag = pod_drag(v, S, p_tube, T_ambient, R, mag_drag)
+
+    return {'thrust': thrust,
+            'drag': drag,
+            'power': thrust * schedule['V_s'],
+            'slip_ratio': schedule['slip_ratio']}
+
+
+def simulate_boost(mass, block_length, P1=180000.0, V1=450.0, f_max=np.inf, v_initial=324.0,
+                   v_final=335.0, dt=1.0e-3, max_time=60.0, **kwargs):
+    """
+    Integrates pod speed through the booster section with Heun's method until each case
+    reaches v_final, leaves the section or max_time elapses.
+
+    Params
+    ------
+    mass : float or array
+        pod mass (kg), one per case
+    block_length : array
+        length of each stator block (m), shape (n_blocks,) or (n_cases, n_blocks)
+    P1, V1, f_max : float or array
+        input power (W), voltage (V) and frequency limit (Hz) of the stator blocks, broadcast
+        to the shape of block_length
+    v_initial, v_final : float or array
+        entrance and top speed (m/s)
+    dt : float
+        time step (s)
+    kwargs
+        drag and LIM parameters of boost_forces and lim_map.DEFAULT_LIM
+
+    Returns
+    -------
+    launch : dict
+        Per case arrays: reached (True if v_final was reached in the section), section_length,
+        the distance to reach v_final (m), launch_time (s), peak_power (W) and energy (J) of
+        the stators, and thrust_work and drag_work (J).  Unreached cases report the values
+        at the end of the section or simulation.
+    """
+    mass = np.atleast_1d(np.asarray(mass, dtype=float))
+    block_length = np.atleast_2d(np.asarray(block_length, dtype=float))
+    n = max(mass.size, block_length.shape[0])
+    shape = (n, block_length.shape[1])
+
+    mass = np.broadcast_to(mass, (n,)).copy()
+    block_start = np.zeros((n, shape[1] + 1))
+    block_start[:, 1:] = np.cumsum(np.broadcast_to(block_length, shape), axis=1)
+    blocks = dict(P1=np.broadcast_to(np.asarray(P1, dtype=float), shape),
+                  V1=np.broadcast_to(np.asarray(V1, dtype=float), shape),
+                  f_max=np.broadcast_to(np.asarray(f_max, dtype=float), shape))
+    v_final = np.broadcast_to(np.asarray(v_final, dtype=float), (n,))
+
+    def forces(x, v):
+        return boost_forces(x, v, mass, block_start, **dict(blocks, **kwargs))
+
+    x = np.zeros(n)
+    v = np.broadcast_to(np.asarray(v_initial, dtype=float), (n,)).copy()
+    t = np.zeros(n)
+    energy = np.zeros(n)
+    thrust_work = np.zeros(n)
+    drag_work = np.zeros(n)
+    peak_power = np.zeros(n)
+    active = v < v_final
+    reached = ~active
+
+    f0 = forces(x, v)
+    for step in range(int(np.ceil(max_time / dt))):
+        if not np.any(active):
+            break
+
+        # Heun: Euler predictor, trapezoidal corrector
+        a0 = (f0['thrust'] - f0['drag']) / mass
+        x1 = x + dt * v
+        v1 = v + dt * a0
+        f1 = forces(x1, v1)
+        a1 = (f1['thrust'] - f1['drag']) / mass
+        x_new = x + 0.5 * dt * (v + v1)
+        v_new = v + 0.5 * dt * (a0 + a1)
+
+        # fraction of the step taken by cases that reach v_final within it
+        frac = np.ones(n)
+        done = active & (v_new >= v_final)
+        frac[done] = (v_final[done] - v[done]) / (v_new[done] - v[done])
+        frac[~active] = 0.0
+
+        h = frac * dt
+        energy += 0.5 * h * (f0['power'] + f1['power'])
+        thrust_work += 0.5 * h * (f0['thrust'] * v + f1['thrust'] * v1)
+        drag_work += 0.5 * h * (f0['drag'] * v + f1['drag'] * v1)
+        peak_power = np.where(active, np.maximum(peak_power, np.maximum(f0['power'], f1['power'])),
+                              peak_power)
+        t += h
+        x += frac * (x_new - x)
+        v += frac * (v_new - v)
+
+        reached |= done
+        active &= ~done & (x < block_start[:, -1]) & (v > 0.0)
+        f0 = forces(x, v)
+
+    return {'reached': reached,
+            'section_length': x,
+            'launch_time': t,
+            'peak_power': peak_power,
+            'energy': energy,
+            'thrust_work': thrust_work,
+            'drag_work': drag_work}
+
+
+if __name__ == '__main__':
+
+    mass = np.linspace(2000.0, 6000.0, 5)
+    launch = simulate_boost(mass, 10.0 * np.ones(80), P1=3000.0)
+
+    for i in range(mass.size):
+        print('%6.0f kg : section length %7.2f m, peak power %10.1f kW, energy %8.1f MJ' %
+              (mass[i], launch['section_length'][i], launch['peak_power'][i] / 1e3,
+               launch['energy'][i] / 1e6))
@@ -0,0 +1,146 @@
+"""
+Grid power demand of the propulsion substations over long operating periods.
+Each substation feeds one or more booster sections, and every launch through a section draws
+the same power pulse, sampled at dt.  The demand of a substation is the superposition of the
+pulses of all its launches, which is the convolution of the pulse with the count of launches
+in each time step
+
+    demand[k] = sum_j count[j]*pulse[k - j]
+
+Launch times between samples are split between the two neighbouring steps.  The period is
+evaluated in chunks, recounting from the launch times the pulses still running at the start
+of each chunk, so memory is set by the chunk and not by the period: a year at 1 s resolution
+only ever holds one chunk.  The 1 s demand is reduced to the mean and maximum over each
+utility demand interval, along with the peak statistics of each substation and of the total.
+"""
+from __future__ import print_function
+
+import numpy as np
+
+# longer pulses are convolved by FFT
+_FFT_PULSE_LENGTH = 64
+
+
+def launch_pulse(launch_time, energy, dt=1.0):
+    """
+    Pulse of a launch of simulate_boost, at its mean power over launch_time, sampled at dt (W)
+    """
+    n = int(np.ceil(launch_time / dt))
+    pulse = energy / launch_time * np.ones(n)
+    pulse[-1] *= (launch_time - (n - 1) * dt) / dt
+    return pulse
+
+
+def _convolve(count, pulse):
+    if pulse.size <= _FFT_PULSE_LENGTH:
+        return np.convolve(count, pulse)
+
+    n = count.size + pulse.size - 1
+    size = 1 << int(np.ceil(np.log2(n)))
+    return np.fft.irfft(np.fft.rfft(count, size) * np.fft.rfft(pulse, size), size)[:n]
+
+
+def grid_demand(substations, t_end, dt=1.0, interval=900.0, chunk=86400.0, base_load=None):
+    """
+    Demand of each substation and of their total from t = 0 to t_end.
+
+    Params
+    ------
+    substations : dict
+        Maps substation name to a list of (launch_times, pulse) pairs: the times launches start
+        (s) and the power pulse of one launch sampled at dt (W)
+    t_end : float
+        end of the period (s)
+    dt : float
+        time resolution of the demand (s)
+    interval : float
+        utility demand interval (s), a multiple of dt
+    chunk : float
+        time evaluated at once (s), rounded to a multiple of interval
+    base_load : dict
+        constant demand of a substation, e.g. vac_power of TubePower (W)
+
+    Returns
+    -------
+    demand : dict
+        time, the start of each interval (s), and for each substation and 'total' a dict of the
+        mean and max demand in each interval (W), peak, the highest demand (W) and peak_time
+        (s), peak_interval, the highest mean over an interval (W), energy (J) and load_factor,
+        the mean over the peak demand
+    """
+    base_load = base_load or {}
+    steps = int(round(interval / dt))
+    num_steps = int(np.ceil(t_end / dt))
+    num_intervals = int(np.ceil(num_steps / float(steps)))
+    chunk_steps = max(int(round(chunk / interval)), 1) * steps
+
+    names = list(substations) + ['total']
+    mean = dict((name, np.zeros(num_intervals)) for name in names)
+    peak = dict((name, np.zeros(num_intervals)) for name in names)
+    peak_time = dict((name, np.zeros(num_intervals)) for name in names)
+
+    launches = dict((name, [(np.sort(np.asarray(times, dtype=float)), np.asarray(pulse, dtype=float))
+                            for times, pulse in pairs]) for name, pairs in substations.items())
+
+    for start in range(0, num_intervals * steps, chunk_steps):
+        n = min(chunk_steps, num_intervals * steps - start)
+        total = np.zeros(n)
+        demand = {}
+
+        for name, pairs in launches.items():
+            demand[name] = base_load.get(name, 0.0) * np.ones(n)
+            for times, pulse in pairs:
+                # launches from one pulse before the chunk, counted from that time on
+                lead = pulse.size
+                first, last = np.searchsorted(times, [(start - lead) * dt, (start + n) * dt])
+                step = times[first:last] / dt - (start - lead)
+                j = np.floor(step).astype(int)
+                frac = step - j
+                count = np.bincount(j, 1.0 - frac, minlength=n + lead + 1) + \
+                    np.bincount(j + 1, frac, minlength=n + lead + 1)
+                demand[name] += _convolve(count[:n + lead], pulse)[lead:lead + n]
+            total += demand[name]
+        demand['total'] = total
+
+        rows = slice(start // steps, (start + n) // steps)
+        for name in names:
+            per_interval = demand[name].reshape(-1, steps)
+            mean[name][rows] = per_interval.mean(axis=1)
+            peak[name][rows] = per_interval.max(axis=1)
+            peak_time[name][rows] = (start + np.arange(0, n, steps) + per_interval.argmax(axis=1)) * dt
+
+    result = {'time': interval * np.arange(num_intervals)}
+    for name in names:
+        i = np.argmax(peak[name])
+        result[name] = {'mean': mean[name],
+                        'max': peak[name],
+                        'peak': peak[name][i],
+                        'peak_time': peak_time[name][i],
+                        'peak_interval': np.max(mean[name]),
+                        'energy': np.sum(mean[name]) * interval,
+                        'load_factor': np.mean(mean[name]) / peak[name][i] if peak[name][i] > 0.0 else 0.0}
+    return result
+
+
+if __name__ == '__main__':
+    import time
+
+    from hyperloop.Python.tube.booster_section import simulate_boost
+
+    launch = simulate_boost(3100.0, 10.0 * np.ones(80), P1=3000.0)
+    pulse = launch_pulse(launch['launch_time'][0], launch['energy'][0])
+
+    # a launch every 30 s in each direction from 6am to midnight, every day of a year
+    rng = np.random.RandomState(0)
+    day = np.arange(6 * 3600.0, 24 * 3600.0, 30.0)
+    year = (day + 86400.0 * np.arange(365)[:, np.newaxis]).ravel()
+    substations = {'north': [(year, pulse), (year + 5.0, pulse)],
+                   'south': [(year + 2000.0 + rng.uniform(-20.0, 20.0, year.size), pulse)]}
+
+    start = time.time()
+    demand = grid_demand(substations, 365 * 86400.0, base_load={'north': 2e5, 'south': 2e5})
+    print('One year at 1 s in %.1f s' % (time.time() - start))
+    for name in ('north', 'south', 'total'):
+        d = demand[name]
+        print('%-5s : peak %7.1f kW, peak 15 min %7.1f kW, %8.1f MWh, load factor %.2f' %
+              (name, d['peak'] / 1e3, d['peak_interval'] / 1e3, d['energy'] / 3.6e9, d['load_factor']))
@@ -24,6 +24,8 @@ from pycycle.components import FlowStart
 from pycycle.constants import AIR_FUEL_MIX, AIR_MIX
 from pycycle.flowstation import FlowIn, PassThrough
 
+from hyperloop.Python.tools.air_thermo import AirFlowStart
+
 
 class TempBalance(Component):
     def __init__(self):
@@ -302,16 +304,29 @@ class TubeWallTemp(Component):
 
 
 class TubeTemp(Group):
-    """An Assembly that computes SS temp"""
+    """An Assembly that computes SS temp
 
-    def __init__(self):
+    Args
+    ----
+    thermo : str
+        'janaf' builds the nozzle and bearing air flow stations with pycycle's chemical
+        equilibrium thermo, 'ideal' uses the closed form ideal gas properties of air
+    """
+
+    def __init__(self, thermo='janaf'):
         super(TubeTemp, self).__init__()
 
         self.add('tm', TubeWallTemp(), promotes=['radius_outer_tube'])
         self.add('tmp_balance', TempBalance())
 
-        self.add('nozzle_air', FlowStart(thermo_data=janaf, elements=AIR_MIX))
-        self.add('bearing_air', FlowStart(thermo_data=janaf, elements=AIR_MIX))
+        if thermo == 'janaf':
+            self.add('nozzle_air', FlowStart(thermo_data=janaf, elements=AIR_MIX))
+            self.add('bearing_air', FlowStart(thermo_data=janaf, elements=AIR_MIX))
+        elif thermo == 'ideal':
+            self.add('nozzle_air', AirFlowStart())
+            self.add('bearing_air', AirFlowStart())
+        else:
+            raise ValueError("thermo must be 'janaf' or 'ideal', not '%s'" % thermo)
 
         self.connect("nozzle_air.Fl_O:tot:T", "tm.nozzle_air_Tt")
         self.connect("nozzle_air.Fl_O:tot:Cp", "tm.nozzle_air_Cp")